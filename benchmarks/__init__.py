@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the scrapbook CLI.
+
+Run from the repository root, e.g. `python -m benchmarks.contention`.
+"""
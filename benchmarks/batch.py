@@ -0,0 +1,91 @@
+"""
+Capture throughput of per-entry commits against storage.batch().
+
+Saves the same seeded corpus entries (see benchmarks.corpus) one
+save_entry call at a time into a fresh scrapbook for each index backend
+and fsync policy, once committing every entry and once inside
+storage.batch(). Checks that every entry got a unique ID, a file and an
+index row, and that the ID counters end at the last ID used; exits with
+status 1 otherwise.
+
+    python -m benchmarks.batch --entries 2000 --backends sqlite json --fsync never batch
+"""
+
+import argparse
+import contextlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import Corpus
+from cli.config import Config
+from cli.storage import FSYNC_POLICIES, INDEX_BACKENDS, StorageManager
+
+
+def make_storage(root: Path, backend: str, fsync: str) -> StorageManager:
+    """Create a storage manager for an isolated scrapbook under root."""
+    config = Config(config_dir=root / 'config')
+    config.config['data_dir'] = str(root / 'docs')
+    config.config['index_backend'] = backend
+    config.config['fsync'] = fsync
+    return StorageManager(config)
+
+
+def run(entries: int, backend: str, fsync: str, batch_size: int, batched: bool, seed: int) -> dict:
+    """Capture `entries` entries and return throughput and consistency checks."""
+    corpus = Corpus(seed)
+    captures = list(corpus.entries(entries))
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        storage = make_storage(root, backend, fsync)
+        storage.index  # open (and create) the index outside the timing
+
+        started = time.perf_counter()
+        with storage.batch(max_entries=batch_size) if batched else contextlib.nullcontext():
+            ids = [storage.save_entry(entry)[0] for entry in captures]
+        elapsed = time.perf_counter() - started
+
+        storage.index.close()
+        reopened = make_storage(root, backend, fsync)
+        reopened._load_counters()
+        index = reopened.index.all()
+        return {
+            'entries_per_sec': entries / elapsed,
+            'duplicate_ids': len(ids) - len(set(ids)),
+            'missing_index_rows': len(set(ids) - set(index)),
+            'missing_files': entries - sum(1 for _ in (root / 'docs').rglob('*.md')),
+            'counters_ok': sum(reopened.counters.values()) == entries
+        }
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=2000)
+    parser.add_argument('--backends', nargs='+', choices=list(INDEX_BACKENDS), default=['sqlite', 'json'])
+    parser.add_argument('--fsync', nargs='+', choices=FSYNC_POLICIES, default=['never', 'batch'])
+    parser.add_argument('--batch-size', type=int, default=100, help='max_entries of storage.batch()')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{args.entries} captures; entries per second")
+    print(f"{'backend':8s} {'fsync':6s} {'per-entry':>10s} {'batched':>10s} {'speedup':>8s}")
+    ok = True
+    for backend in args.backends:
+        for fsync in args.fsync:
+            results = [run(args.entries, backend, fsync, args.batch_size, batched, args.seed)
+                       for batched in (False, True)]
+            for result in results:
+                if (result['duplicate_ids'] or result['missing_index_rows'] or result['missing_files']
+                        or not result['counters_ok']):
+                    ok = False
+                    print(f"FAILED {backend}/{fsync}: {result}", file=sys.stderr)
+            single, batched = (result['entries_per_sec'] for result in results)
+            print(f"{backend:8s} {fsync:6s} {single:10.0f} {batched:10.0f} {batched / single:7.1f}x")
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Contention benchmark: many processes capturing into one scrapbook at once.
+
+Checks that every capture gets a unique ID and an index row, and reports
+sustained throughput.
+
+    python -m benchmarks.contention --writers 16 --entries 50 --backend sqlite
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from cli.config import Config
+from cli.models import ScrapEntry, EntryType
+from cli.storage import StorageManager
+
+
+TYPES = list(EntryType)
+
+
+def make_storage(root: Path, backend: str) -> StorageManager:
+    """Create a storage manager for an isolated scrapbook under root."""
+    config = Config(config_dir=root / 'config')
+    config.config['data_dir'] = str(root / 'docs')
+    config.config['index_backend'] = backend
+    return StorageManager(config)
+
+
+def writer(root: str, backend: str, writer_id: int, count: int, start_event) -> list:
+    """Capture `count` entries and return the IDs that were assigned."""
+    storage = make_storage(Path(root), backend)
+    start_event.wait()
+    ids = []
+    for n in range(count):
+        entry = ScrapEntry(
+            title=f"Writer {writer_id} note {n}",
+            content=f"Captured by writer {writer_id}",
+            context='',
+            tags=['bench', f"writer-{writer_id}"],
+            entry_type=TYPES[n % len(TYPES)],
+            created_date=datetime.now()
+        )
+        entry_id, _ = storage.save_entry(entry)
+        ids.append(entry_id)
+    return ids
+
+
+def run(writers: int, entries: int, backend: str) -> dict:
+    """Run the benchmark and return its results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_storage(root, backend)  # create directories and empty index up front
+
+        manager = multiprocessing.Manager()
+        start_event = manager.Event()
+        with multiprocessing.Pool(writers) as pool:
+            pending = [pool.apply_async(writer, (tmp, backend, w, entries, start_event))
+                       for w in range(writers)]
+            time.sleep(0.5)  # let every worker open its storage before starting the clock
+            started = time.perf_counter()
+            start_event.set()
+            assigned = [id_ for result in pending for id_ in result.get()]
+            elapsed = time.perf_counter() - started
+
+        index = make_storage(root, backend).index.all()
+        expected = writers * entries
+        return {
+            'backend': backend,
+            'writers': writers,
+            'entries': expected,
+            'elapsed_s': round(elapsed, 3),
+            'entries_per_sec': round(expected / elapsed, 1),
+            'duplicate_ids': len(assigned) - len(set(assigned)),
+            'missing_index_rows': len(set(assigned) - set(index)),
+            'files_written': sum(1 for _ in (root / 'docs').rglob('*.md'))
+        }
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--entries', type=int, default=50, help='Entries per writer')
+    parser.add_argument('--backend', choices=['json', 'sharded', 'binary', 'sqlite'], default='sqlite')
+    args = parser.parse_args()
+
+    result = run(args.writers, args.entries, args.backend)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+    ok = (result['duplicate_ids'] == 0 and result['missing_index_rows'] == 0
+          and result['files_written'] == result['entries'])
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
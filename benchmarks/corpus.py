@@ -0,0 +1,182 @@
+"""
+Seeded synthetic scrapbook corpus for benchmarks.
+
+The same seed and size always produce the same entries. Distributions are
+loosely modelled on a real scrapbook:
+
+- more todos and ideas than prompts and workflows
+- short titles mixing common words with a long tail of rare ones
+- Zipf-distributed words and tags, a few very popular tags
+- lognormal body lengths
+- todo status/priority mixes
+- creation dates over two years, denser towards the present
+
+    python -m benchmarks.corpus --entries 1000 --sample 5
+"""
+
+import argparse
+import math
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from cli.models import EntryType, Priority, ScrapEntry, Status
+
+
+# Common words: the head of the word distribution
+COMMON_WORDS = (
+    'add', 'api', 'app', 'auth', 'backup', 'bug', 'build', 'cache', 'check', 'cleanup', 'cli',
+    'config', 'data', 'debug', 'deploy', 'design', 'docs', 'error', 'export', 'feature', 'fix',
+    'flow', 'idea', 'import', 'index', 'issue', 'job', 'limit', 'list', 'log', 'memory', 'meeting',
+    'migrate', 'model', 'note', 'notes', 'page', 'plan', 'prompt', 'query', 'rate', 'refactor',
+    'release', 'report', 'review', 'search', 'server', 'setup', 'slow', 'sync', 'task', 'test',
+    'timeout', 'tool', 'update', 'user', 'web', 'weekly', 'write', 'workflow'
+)
+
+SYLLABLES = ('ka', 're', 'mi', 'to', 'lu', 'sen', 'dor', 'pa', 'vi', 'qua', 'zel', 'no', 'ri', 'tam')
+
+# Share of entries per type
+TYPE_WEIGHTS = {
+    EntryType.TODO: 35,
+    EntryType.IDEA: 25,
+    EntryType.JOURNAL: 20,
+    EntryType.PROMPT: 10,
+    EntryType.WORKFLOW: 10
+}
+
+TITLE_TEMPLATES = {
+    EntryType.TODO: ('{0} {1} {2}', 'Fix {0} in {1}', '{0} the {1} {2} {3}'),
+    EntryType.IDEA: ('{0} {1}', '{0} for {1} {2}', 'What if {0} {1} {2}'),
+    EntryType.JOURNAL: ('{date} notes', '{0} {1} retro', 'Learned about {0} {1}'),
+    EntryType.PROMPT: ('{0} {1} prompt', 'Summarize {0} {1}'),
+    EntryType.WORKFLOW: ('{0} {1} process', 'How to {0} {1} {2}')
+}
+
+CATEGORIES = ('general', 'development', 'automation', 'deployment', 'writing', 'analysis')
+
+# Number of tags per entry and its weight
+TAG_COUNT_WEIGHTS = (5, 30, 35, 20, 7, 3)
+
+STATUS_WEIGHTS = {Status.ACTIVE: 60, Status.COMPLETED: 30, Status.ARCHIVED: 10}
+PRIORITY_WEIGHTS = {Priority.LOW: 20, Priority.MEDIUM: 45, Priority.HIGH: 25, Priority.URGENT: 10}
+
+# Reference "now" so corpora do not depend on the day they are generated
+EPOCH = datetime(2026, 1, 1, 12, 0, 0)
+SPAN_DAYS = 730
+
+
+class Corpus:
+    """Deterministic generator of scrapbook entries."""
+
+    def __init__(self, seed: int = 42, vocabulary_size: int = 20000, tag_pool: int = 2000):
+        """Build the word and tag vocabularies for a seed."""
+        rng = random.Random(seed)
+        self.seed = seed
+        self.words = list(COMMON_WORDS) + self._pseudo_words(rng, vocabulary_size - len(COMMON_WORDS))
+        self.word_weights = self._zipf(len(self.words))
+        self.tags = [f"{word}-{rng.randint(1, 99)}" if n >= 50 else word
+                     for n, word in enumerate(rng.sample(self.words[:tag_pool * 2], tag_pool))]
+        self.tag_weights = self._zipf(len(self.tags), exponent=1.1)
+
+    @staticmethod
+    def _pseudo_words(rng: random.Random, count: int) -> List[str]:
+        """Distinct pronounceable words for the long tail."""
+        words = set(COMMON_WORDS)
+        tail = []
+        while len(tail) < count:
+            word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+            if word not in words:
+                words.add(word)
+                tail.append(word)
+        return tail
+
+    @staticmethod
+    def _zipf(size: int, exponent: float = 1.0) -> List[float]:
+        """Cumulative Zipf weights for random.choices(cum_weights=...)."""
+        total = 0.0
+        cumulative = []
+        for rank in range(1, size + 1):
+            total += 1 / rank ** exponent
+            cumulative.append(total)
+        return cumulative
+
+    def _words(self, rng: random.Random, count: int) -> List[str]:
+        return rng.choices(self.words, cum_weights=self.word_weights, k=count)
+
+    def entry(self, n: int, rng: random.Random) -> ScrapEntry:
+        """Generate the n-th entry from an RNG positioned for it."""
+        entry_type = rng.choices(list(TYPE_WEIGHTS), list(TYPE_WEIGHTS.values()))[0]
+        # Denser towards the present: beta(1, 3) puts most ages near zero
+        created = EPOCH - timedelta(days=SPAN_DAYS * rng.betavariate(1, 3), seconds=n % 86400)
+
+        template = rng.choice(TITLE_TEMPLATES[entry_type])
+        title = template.format(*self._words(rng, 4), date=created.strftime('%Y-%m-%d'))
+        title = title[0].upper() + title[1:]
+
+        length = min(2000, max(3, int(rng.lognormvariate(math.log(50), 0.8))))
+        words = self._words(rng, length)
+        paragraphs = [' '.join(words[i:i + 40]) for i in range(0, len(words), 40)]
+
+        tag_count = rng.choices(range(len(TAG_COUNT_WEIGHTS)), TAG_COUNT_WEIGHTS)[0]
+        tags = list(dict.fromkeys(rng.choices(self.tags, cum_weights=self.tag_weights, k=tag_count)))
+
+        status, priority, category = Status.ACTIVE, None, None
+        if entry_type == EntryType.TODO:
+            status = rng.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()))[0]
+            priority = rng.choices(list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values()))[0]
+        elif rng.random() < 0.05:
+            status = Status.ARCHIVED
+        if entry_type in (EntryType.PROMPT, EntryType.WORKFLOW):
+            category = rng.choice(CATEGORIES)
+
+        return ScrapEntry(
+            title=title,
+            content='\n\n'.join(paragraphs),
+            context=' '.join(self._words(rng, 12)) if rng.random() < 0.3 else '',
+            tags=tags,
+            entry_type=entry_type,
+            created_date=created,
+            status=status,
+            priority=priority,
+            category=category
+        )
+
+    def entries(self, count: int, start: int = 0) -> Iterator[ScrapEntry]:
+        """Entries start..start+count; each depends only on the seed and its number."""
+        for n in range(start, start + count):
+            yield self.entry(n, random.Random(self.seed * 1000003 + n))
+
+    def queries(self, count: int, seed: int = 0) -> List[str]:
+        """Search queries: mostly single words, some pairs, weighted like the corpus."""
+        rng = random.Random(self.seed + seed)
+        return [' '.join(self._words(rng, 1 if rng.random() < 0.7 else 2)) for _ in range(count)]
+
+
+def build(storage, corpus: Corpus, count: int, batch_size: int = 5000) -> None:
+    """Save `count` corpus entries through the storage layer in batches."""
+    for start in range(0, count, batch_size):
+        storage.save_entries(list(corpus.entries(min(batch_size, count - start), start)))
+
+
+def main() -> int:
+    """Command-line entry point: print a sample of a corpus."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sample', type=int, default=5, help='Entries to print')
+    args = parser.parse_args()
+
+    corpus = Corpus(args.seed)
+    counts = {}
+    for entry in corpus.entries(args.entries):
+        counts[entry.entry_type.value] = counts.get(entry.entry_type.value, 0) + 1
+    print(f"{args.entries} entries: " + ', '.join(f"{t} {c}" for t, c in sorted(counts.items())))
+    for entry in corpus.entries(args.sample):
+        print(f"\n[{entry.entry_type.value}] {entry.title}  {entry.tags}  {entry.created_date:%Y-%m-%d}")
+        print(f"  {entry.content[:100]}...")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
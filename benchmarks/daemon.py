@@ -0,0 +1,122 @@
+"""
+Search latency through the `scrap serve` daemon versus cold in-process runs.
+
+Builds a synthetic scrapbook, starts a daemon on it, and reports latency
+percentiles for `scrap search` requests sent over the Unix socket.
+
+    python -m benchmarks.daemon --entries 100000 --queries 500 --budget-ms 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from cli.config import Config
+from cli.daemon import send_request, socket_path
+from cli.models import ScrapEntry, EntryType
+from cli.storage import StorageManager
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SYLLABLES = ('ka', 're', 'mi', 'to', 'lu', 'sen', 'dor', 'pa', 'vi', 'qua', 'zel', 'no', 'ri', 'tam')
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list:
+    """Generate distinct pseudo-words."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def build_corpus(storage: StorageManager, entries: int, vocabulary: list, seed: int = 7) -> None:
+    """Save `entries` synthetic entries in batches, with Zipf-distributed words."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    types = list(EntryType)
+    now = datetime.now()
+    for start in range(0, entries, 2000):
+        batch = []
+        for n in range(start, min(start + 2000, entries)):
+            batch.append(ScrapEntry(
+                title=' '.join(rng.choices(vocabulary, weights, k=3)).capitalize() + f" {n}",
+                content=' '.join(rng.choices(vocabulary, weights, k=40)),
+                context='',
+                tags=rng.sample(vocabulary[:200], 2),
+                entry_type=types[n % len(types)],
+                created_date=now - timedelta(minutes=n)
+            ))
+        storage.save_entries(batch)
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1)]
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--budget-ms', type=float, default=5.0, help='p99 budget for daemon searches')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        env = dict(os.environ, HOME=str(home), PYTHONPATH=str(REPO_ROOT))
+        os.environ['HOME'] = str(home)
+        os.chdir(home)
+
+        started = time.perf_counter()
+        vocabulary = make_vocabulary(5000, random.Random(3))
+        build_corpus(StorageManager(Config()), args.entries, vocabulary)
+        print(f"Built {args.entries} entries in {time.perf_counter() - started:.1f}s")
+
+        path = socket_path(Config())
+        daemon = subprocess.Popen([sys.executable, '-m', 'cli', 'serve'], cwd=home, env=env,
+                                  stdout=subprocess.DEVNULL)
+        try:
+            while not path.exists():
+                time.sleep(0.05)
+
+            rng = random.Random(11)
+            # Query words drawn uniformly from the vocabulary: mostly mid/long-tail terms
+            queries = [rng.choice(vocabulary) for _ in range(args.queries)]
+            send_request(path, ['search', queries[0]])  # warm-up
+
+            latencies = []
+            for query in queries:
+                t0 = time.perf_counter()
+                send_request(path, ['search', query, '--limit', '10'])
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+            cold = []
+            for query in queries[:5]:
+                t0 = time.perf_counter()
+                subprocess.run([sys.executable, '-m', 'cli.cli', 'search', query], cwd=home, env=env,
+                               stdout=subprocess.DEVNULL, check=True)
+                cold.append((time.perf_counter() - t0) * 1000)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    p99 = percentile(latencies, 99)
+    print(f"daemon search   p50 {percentile(latencies, 50):6.2f} ms   "
+          f"p95 {percentile(latencies, 95):6.2f} ms   p99 {p99:6.2f} ms")
+    print(f"cold in-process median {statistics.median(cold):6.1f} ms")
+    print(f"p99 budget {args.budget_ms} ms: {'OK' if p99 <= args.budget_ms else 'EXCEEDED'}")
+    return 0 if p99 <= args.budget_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Frontmatter codec throughput and byte-for-byte agreement with PyYAML.
+
+Renders the frontmatter of seeded corpus entries (see benchmarks.corpus),
+plus entries whose title, context and tags mix in non-ASCII and control
+characters, quotes, YAML indicators and long lines, with cli.frontmatter
+and with yaml.dump as save_entry used to. Checks every output is identical
+and parses back to the same mapping as yaml.safe_load, then times both
+directions per corpus entry. Exits with status 1 on any difference.
+
+    python -m benchmarks.frontmatter --entries 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import yaml
+
+from benchmarks.corpus import Corpus
+from cli.frontmatter import dump_frontmatter, load_frontmatter
+
+
+# Pieces edge-case strings are built from: non-ASCII letters, CJK, emoji,
+# control and line-break characters, quotes and YAML indicators
+EDGE_PIECES = ('naïve', 'résumé', '日本語', '🙂', '\t', '\x07', '\x85', '\u2028', '\n', '\r\n',
+               "'", '"', '\\', ': ', ' #', '- ', '? ', '---', '~', 'null', 'yes', '0x1F', '1e3',
+               '  ', ' ', 'plain', 'words', 'and', 'more')
+
+
+def edge_string(rng: random.Random) -> str:
+    """A string of random pieces, sometimes repeated past the 80-column line width."""
+    text = ''.join(rng.choice(EDGE_PIECES) + (' ' if rng.random() < 0.6 else '')
+                   for _ in range(rng.randint(1, 12)))
+    return text * rng.randint(2, 8) if rng.random() < 0.3 else text
+
+
+def edge_mappings(mappings: list, count: int, seed: int) -> list:
+    """Copies of corpus frontmatter with edge-case titles, contexts and tags."""
+    rng = random.Random(seed)
+    edges = [dict(mappings[0], title='naïve résumé ' * 8)]
+    for n in range(count):
+        data = dict(mappings[n % len(mappings)])
+        data['title'] = edge_string(rng)
+        if rng.random() < 0.5:
+            data['context'] = edge_string(rng)
+        if rng.random() < 0.5:
+            data['tags'] = [edge_string(rng) for _ in range(rng.randint(1, 3))]
+        edges.append(data)
+    return edges
+
+
+def per_entry_us(func, items: list) -> float:
+    """Mean microseconds of func(item) over items."""
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - started) * 1e6 / len(items)
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=20000)
+    parser.add_argument('--edge-cases', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = Corpus(args.seed)
+    mappings = []
+    for n, entry in enumerate(corpus.entries(args.entries)):
+        entry.id = f"{entry.entry_type.value}-{n:03d}"
+        mappings.append(entry.to_dict())
+
+    blocks = [yaml.dump(data, default_flow_style=False) for data in mappings]
+    mismatches = 0
+    checked = mappings + edge_mappings(mappings, args.edge_cases, args.seed)
+    for data in checked:
+        block = yaml.dump(data, default_flow_style=False)
+        if dump_frontmatter(data) != block or load_frontmatter(block) != yaml.safe_load(block):
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"Mismatch for {data!r}:\n{block}", file=sys.stderr)
+    print(f"{len(mappings)} entries and {len(checked) - len(mappings)} edge cases, "
+          f"{mismatches} differ from PyYAML")
+
+    sample = mappings[:min(len(mappings), 5000)]
+    sample_blocks = blocks[:len(sample)]
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    timings = [
+        ('dump  yaml.dump', per_entry_us(lambda data: yaml.dump(data, default_flow_style=False), sample)),
+        ('dump  CSafeDumper', per_entry_us(
+            lambda data: yaml.dump(data, Dumper=dumper, default_flow_style=False), sample)),
+        ('dump  codec', per_entry_us(dump_frontmatter, sample)),
+        ('parse yaml.safe_load', per_entry_us(yaml.safe_load, sample_blocks)),
+        ('parse CSafeLoader', per_entry_us(lambda block: yaml.load(block, Loader=loader), sample_blocks)),
+        ('parse codec', per_entry_us(load_frontmatter, sample_blocks)),
+    ]
+    print("\nMicroseconds per entry")
+    for label, us in timings:
+        print(f"  {label:22s} {us:8.1f}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
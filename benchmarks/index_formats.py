@@ -0,0 +1,88 @@
+"""
+Load time and size of the index file formats.
+
+Writes the same synthetic index rows (see benchmarks.memory.make_rows) with
+each index backend, then times, with a freshly opened backend each run:
+listing the 10 newest journal entries, looking up one ID, loading every row
+and upserting one row. The index files are in the page cache, as they are
+for repeated CLI commands.
+
+    python -m benchmarks.index_formats --entries 100000 --runs 5
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.memory import make_rows
+from cli.locking import FileLock
+from cli.models import EntryType
+from cli.storage import BinaryIndexBackend, JsonIndexBackend, ShardedIndexBackend, SqliteIndexBackend
+
+
+def open_backend(name: str, root: Path):
+    """Open (or create) the index of backend `name` under `root`."""
+    lock = FileLock(root / 'index.lock')
+    if name == 'json':
+        return JsonIndexBackend(root / 'index.json', lock)
+    if name == 'sharded':
+        return ShardedIndexBackend(root / 'shards', lock)
+    if name == 'binary':
+        return BinaryIndexBackend(root / 'index.bin', lock)
+    return SqliteIndexBackend(root / 'index.db')
+
+
+def size_on_disk(root: Path) -> int:
+    """Bytes of every file under `root`."""
+    return sum(path.stat().st_size for path in root.rglob('*') if path.is_file())
+
+
+def cold_ms(name: str, root: Path, operation, runs: int) -> float:
+    """Median milliseconds to open the backend and run `operation` on it."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        backend = open_backend(name, root)
+        operation(backend)
+        timings.append((time.perf_counter() - started) * 1000)
+        backend.close()
+    return statistics.median(timings)
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--backends', nargs='+', choices=['json', 'sharded', 'binary', 'sqlite'],
+                        default=['json', 'sharded', 'binary', 'sqlite'])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.entries)
+    probe = rows[len(rows) // 2]
+    operations = {
+        'list journal': lambda backend: backend.list(EntryType.JOURNAL, 10),
+        'get one': lambda backend: backend.get(probe['id']),
+        'load all': lambda backend: backend.all(),
+        'upsert one': lambda backend: backend.upsert(dict(probe, status='completed')),
+    }
+
+    print(f"{args.entries} index rows; milliseconds, each including opening the index")
+    print(f"{'backend':8s} {'size MB':>8s} " + ' '.join(f"{label:>13s}" for label in operations))
+    for name in args.backends:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            backend = open_backend(name, root)
+            backend.upsert_many(rows)
+            backend.close()
+            size = size_on_disk(root) / (1024 * 1024)
+            timings = [cold_ms(name, root, operation, args.runs) for operation in operations.values()]
+        print(f"{name:8s} {size:8.1f} " + ' '.join(f"{ms:13.1f}" for ms in timings))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Memory footprint of the in-memory index: row dicts versus columns.
+
+Generates synthetic index rows, then measures with tracemalloc the memory
+held by the dict-of-dicts returned by `IndexBackend.all()` and by the
+equivalent `ColumnarIndex`, along with list/search/stats scan times over
+each. Also compares slotted `ScrapEntry` objects with a `__dict__` version.
+
+    python -m benchmarks.memory --entries 500000
+"""
+
+import argparse
+import dataclasses
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from cli.columnar import ColumnarIndex
+from cli.models import EntryType, Priority, ScrapEntry, Status
+
+
+# Statuses the Kanban board writes and a type from a hand-made file, outside the enums
+OTHER_STATUSES = ('in-progress', 'active-secondary', 'in-progress-secondary')
+OTHER_TYPE = 'note'
+
+WORDS = ('alpha', 'build', 'cache', 'daemon', 'entry', 'filter', 'graph', 'index', 'journal',
+         'kernel', 'layout', 'memory', 'notes', 'output', 'parser', 'query', 'render', 'search')
+
+
+def make_rows(entries: int, seed: int = 5) -> list:
+    """Synthetic index rows shaped like the ones the storage layer writes.
+
+    About 1% of rows carry a Kanban status and 0.1% a type outside EntryType.
+    """
+    rng = random.Random(seed)
+    tags = [f"{rng.choice(WORDS)}-{n}" for n in range(300)]
+    types = [t.value for t in EntryType]
+    priorities = [None, None] + [p.value for p in Priority]
+    start = datetime(2023, 1, 1)
+    rows = []
+    for n in range(entries):
+        entry_type = types[n % len(types)] if n % 1000 != 999 else OTHER_TYPE
+        title = ' '.join(rng.choices(WORDS, k=4)).capitalize()
+        row = {
+            'id': f"{entry_type}-{n:06d}",
+            'title': title,
+            'type': entry_type,
+            'file_path': f"{entry_type}s/{title.lower().replace(' ', '_')}_{n}.md",
+            'tags': rng.sample(tags, rng.randint(0, 4)),
+            'created_date': (start + timedelta(seconds=n * 37)).isoformat(),
+            'status': rng.choice([s.value for s in Status]) if n % 100 else rng.choice(OTHER_STATUSES)
+        }
+        priority = rng.choice(priorities)
+        if priority:
+            row['priority'] = priority
+        rows.append(row)
+    return rows
+
+
+def measure(build) -> tuple:
+    """Return (object, bytes still allocated after build())."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def timed(func) -> float:
+    """Wall time of one call in milliseconds."""
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def dict_list(index: dict, entry_type: str, limit: int) -> list:
+    """`list` over row dicts, as the JSON backend does it."""
+    entries = [e for e in index.values() if e['type'] == entry_type]
+    entries.sort(key=lambda x: x['created_date'], reverse=True)
+    return entries[:limit]
+
+
+def dict_search(index: dict, query: str, limit: int) -> list:
+    """Title/tag substring search over row dicts, title matches first."""
+    results = [e for e in index.values()
+               if query in e['title'].lower() or any(query in tag.lower() for tag in e['tags'])]
+    results.sort(key=lambda x: x['created_date'], reverse=True)
+    results.sort(key=lambda x: query not in x['title'].lower())
+    return results[:limit]
+
+
+def dict_stats(index: dict) -> dict:
+    """Type and tag counts over row dicts."""
+    counts = {}
+    for entry in index.values():
+        counts[entry['type']] = counts.get(entry['type'], 0) + 1
+        for tag in entry['tags']:
+            counts[tag] = counts.get(tag, 0) + 1
+    return counts
+
+
+def columns_stats(columns: ColumnarIndex) -> dict:
+    """Type and tag counts over columns."""
+    counts = columns.type_counts()
+    counts.update(columns.tag_counts())
+    return counts
+
+
+def warm(columns: ColumnarIndex) -> ColumnarIndex:
+    """Build the lazily created search text so it is included in the measurement."""
+    columns.search('warm-up', limit=0)
+    return columns
+
+
+def entry_sizes(count: int) -> tuple:
+    """Bytes held by `count` ScrapEntry objects, slotted and with __dict__."""
+    plain = dataclasses.make_dataclass(
+        'PlainEntry', [(f.name, f.type) for f in dataclasses.fields(ScrapEntry)]
+    )
+    now = datetime.now()
+
+    def build(cls):
+        return [cls('Title', 'Content', '', [], EntryType.IDEA, now, Status.ACTIVE, None, None, f"idea-{n}")
+                for n in range(count)]
+
+    _, slotted = measure(lambda: build(ScrapEntry))
+    _, with_dict = measure(lambda: build(plain))
+    return slotted, with_dict
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.entries)
+    index, dict_bytes = measure(lambda: {row['id']: dict(row, tags=list(row['tags'])) for row in rows})
+    columns, column_bytes = measure(lambda: warm(ColumnarIndex(rows)))
+    del rows
+
+    # Rows outside the enums must survive the columns unchanged
+    differing = sum(1 for entry_id, row in columns.all().items() if row != index[entry_id])
+    counted = (columns.type_counts().get(OTHER_TYPE, 0),
+               sum(columns.status_counts().get(status, 0) for status in OTHER_STATUSES))
+    expected = (sum(1 for row in index.values() if row['type'] == OTHER_TYPE),
+                sum(1 for row in index.values() if row['status'] in OTHER_STATUSES))
+    if differing or counted != expected:
+        print(f"FAILED: {differing} rows differ after the columns; other type/status counts "
+              f"{counted}, expected {expected}", file=sys.stderr)
+        return 1
+
+    mb = 1024 * 1024
+    print(f"{args.entries} index rows")
+    print(f"  row dicts    {dict_bytes / mb:8.1f} MB   {dict_bytes / args.entries:6.0f} B/entry")
+    print(f"  columns      {column_bytes / mb:8.1f} MB   {column_bytes / args.entries:6.0f} B/entry"
+          f"   ({dict_bytes / column_bytes:.1f}x smaller)")
+
+    print("\nScan times (ms)          row dicts    columns")
+    scans = [
+        ('list --type todo', lambda: dict_list(index, 'todo', 50),
+         lambda: columns.list(EntryType.TODO, 50)),
+        ('search "cache"', lambda: dict_search(index, 'cache', 50),
+         lambda: columns.search('cache', limit=50)),
+        ('stats', lambda: dict_stats(index), lambda: columns_stats(columns)),
+    ]
+    for label, on_dicts, on_columns in scans:
+        print(f"  {label:20s} {timed(on_dicts):10.1f} {timed(on_columns):10.1f}")
+
+    count = min(args.entries, 100000)
+    slotted, with_dict = entry_sizes(count)
+    print(f"\nScrapEntry x{count}: slotted {slotted / count:.0f} B/entry, "
+          f"with __dict__ {with_dict / count:.0f} B/entry")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
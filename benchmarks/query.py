@@ -0,0 +1,130 @@
+"""
+Structured query planner against a brute-force scan of every index row.
+
+Builds a seeded corpus (see benchmarks.corpus), moves some todos to the
+Kanban board's statuses by editing their frontmatter the way
+website/server.js does, and picks the edits up with `scrap reindex`. Each
+query is then run through the planner and by checking every index row
+directly; the matching IDs must be the same. Exits with status 1 on any
+difference.
+
+    python -m benchmarks.query --entries 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import Corpus, build
+
+
+# Statuses website/server.js writes when a card moves on the Kanban board
+KANBAN_STATUSES = ('in-progress', 'in-progress-secondary', 'active-secondary')
+
+QUERIES = (
+    'status:in-progress',
+    'status:in-progress,completed',
+    'type:todo status:in-progress-secondary',
+    'status:active-secondary priority:>=high',
+    '-status:active type:todo',
+    'NOT status:in-progress type:todo',
+    'status:active OR status:in-progress',
+    'type:todo priority:>=high -status:completed',
+    'status:archived created:<2026-01-01',
+    'category:development status:in-progress',
+    'fix status:in-progress',
+)
+
+
+def move_to_board(storage, share: float, seed: int) -> int:
+    """Give a share of the active todos a Kanban status; returns how many changed."""
+    rng = random.Random(seed)
+    moved = 0
+    for row in storage.index.all().values():
+        if row['type'] != 'todo' or row['status'] != 'active' or rng.random() >= share:
+            continue
+        path = storage.data_dir / row['file_path']
+        text = path.read_text(encoding='utf-8')
+        path.write_text(text.replace('status: active\n', f"status: {rng.choice(KANBAN_STATUSES)}\n", 1),
+                        encoding='utf-8')
+        moved += 1
+    return moved
+
+
+def matches(node, row: dict, text_ids: dict) -> bool:
+    """Evaluate a parsed query against one index row."""
+    from cli.query import And, Not, Or
+
+    if isinstance(node, Not):
+        return not matches(node.child, row, text_ids)
+    if isinstance(node, And):
+        return all(matches(child, row, text_ids) for child in node.children)
+    if isinstance(node, Or):
+        return any(matches(child, row, text_ids) for child in node.children)
+    if node.field == 'text':
+        return row['id'] in text_ids[node.value]
+    if node.field == 'tag':
+        return any(tag in node.values for tag in row['tags'])
+    if node.field == 'category':
+        return (row.get('category') or '').lower() in node.values
+    if node.field == 'created':
+        return (not node.low or row['created_date'] >= node.low) and (not node.high or row['created_date'] < node.high)
+    if node.field == 'status':
+        return (row['status'] or 'active') in node.values
+    return row.get(node.field) in node.values
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--board-share', type=float, default=0.2, help='share of active todos moved on the board')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['HOME'] = tmp
+        os.environ['SCRAP_NO_DAEMON'] = '1'
+        os.chdir(tmp)
+
+        from cli.config import Config
+        from cli.query import QueryPlanner, leaves, parse_query
+        from cli.reindex import Reindexer
+        from cli.storage import StorageManager
+
+        storage = StorageManager(Config())
+        build(storage, Corpus(args.seed), args.entries)
+        moved = move_to_board(storage, args.board_share, args.seed)
+        Reindexer(storage).run()
+        rows = list(storage.index.all().values())
+        print(f"{args.entries} entries, {moved} todos moved to Kanban statuses")
+
+        failed = 0
+        print(f"{'query':48s} {'rows':>6s} {'planner':>9s} {'scan':>9s}")
+        for text in QUERIES:
+            node = parse_query(text)
+            started = time.perf_counter()
+            _, hits, _ = QueryPlanner(storage).rank(node)
+            planner_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            text_ids = {leaf.value: set(storage.fulltext.match_all(leaf.value))
+                        for leaf in leaves(node) if leaf.field == 'text'}
+            expected = {row['id'] for row in rows if matches(node, row, text_ids)}
+            scan_ms = (time.perf_counter() - started) * 1000
+
+            got = {row['id'] for row, _ in hits}
+            status = '' if got == expected else f"  DIFFERS: {len(got - expected)} extra, {len(expected - got)} missing"
+            failed += bool(status)
+            print(f"{text:48s} {len(expected):6d} {planner_ms:7.1f}ms {scan_ms:7.1f}ms{status}")
+
+    print("OK" if not failed else f"FAILED: {failed} queries differ")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
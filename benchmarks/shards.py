@@ -0,0 +1,84 @@
+"""
+Cold latency of type-scoped commands as the corpus grows, per index backend.
+
+Writes synthetic index rows (see benchmarks.memory.make_rows; a steady
+capture rate, so a bigger corpus spans more months) into a fresh scrapbook
+for each backend and size, then times `scrap list --type journal --limit 10`
+and `scrap random-todo` as fresh processes. With the sharded backend both
+only open shards of one type (the listing just the newest of them), so
+they grow with the number of journals or todos rather than the corpus.
+
+    python -m benchmarks.shards --sizes 10000 50000 200000 --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.memory import make_rows
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+BACKENDS = ('json', 'sharded', 'sqlite')
+
+COMMANDS = {
+    'list --type journal': ['list', '--type', 'journal', '--limit', '10'],
+    'random-todo': ['random-todo']
+}
+
+
+def cold_ms(args: list, cwd: Path, env: dict, runs: int) -> float:
+    """Median wall time of `scrap <args>` as a fresh process, in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'cli.cli'] + args, cwd=cwd, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def populate(home: Path, backend: str, rows: list) -> None:
+    """Create a scrapbook in `home` whose index holds `rows`."""
+    os.environ['HOME'] = str(home)
+    os.chdir(home)
+    from cli.config import Config
+    from cli.storage import StorageManager
+
+    config = Config()
+    config.set('index_backend', backend)
+    storage = StorageManager(config)
+    storage.upsert_index_rows(rows)
+    storage.index.close()
+    os.chdir(REPO_ROOT)
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 200000])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8s} {'backend':8s} " + ' '.join(f"{label:>20s}" for label in COMMANDS))
+    for size in args.sizes:
+        rows = make_rows(size)
+        for backend in args.backends:
+            with tempfile.TemporaryDirectory() as tmp:
+                home = Path(tmp)
+                populate(home, backend, rows)
+                env = dict(os.environ, HOME=str(home), PYTHONPATH=str(REPO_ROOT), SCRAP_NO_DAEMON='1')
+                medians = [cold_ms(argv, home, env, args.runs) for argv in COMMANDS.values()]
+            print(f"{size:8d} {backend:8s} " + ' '.join(f"{ms:17.1f} ms" for ms in medians))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Cold CLI startup benchmark.
+
+Times `scrap --help` and `scrap list` as fresh processes and fails when the
+time spent beyond a bare interpreter start exceeds the budget. The bare
+interpreter is subtracted because it varies widely between machines and is
+outside the CLI's control.
+
+    python -m benchmarks.startup --runs 20 --budget-ms 60 --importtime
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    'bare interpreter': [sys.executable, '-c', 'pass'],
+    'scrap --help': [sys.executable, '-m', 'cli.cli', '--help'],
+    'scrap list': [sys.executable, '-m', 'cli.cli', 'list', '--limit', '10'],
+}
+
+
+def time_command(argv: list, cwd: Path, env: dict, runs: int) -> list:
+    """Run a command `runs` times and return wall times in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(argv, cwd=cwd, env=env, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def import_breakdown(cwd: Path, env: dict, top: int = 15) -> list:
+    """Return the slowest cumulative imports for `scrap list`."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'cli.cli', 'list', '--limit', '10'],
+        cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, default=60.0,
+                        help='Allowed `scrap list` time above a bare interpreter start')
+    parser.add_argument('--importtime', action='store_true', help='Show the slowest imports')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        env = dict(os.environ, HOME=str(home), PYTHONPATH=str(REPO_ROOT))
+        # One warm-up run creates the scrapbook and its index
+        subprocess.run(COMMANDS['scrap list'], cwd=home, env=env, stdout=subprocess.DEVNULL, check=True)
+
+        medians = {}
+        for label, argv in COMMANDS.items():
+            timings = time_command(argv, home, env, args.runs)
+            medians[label] = statistics.median(timings)
+            print(f"{label:18s} median {medians[label]:7.1f} ms   min {min(timings):7.1f} ms")
+
+        overhead = medians['scrap list'] - medians['bare interpreter']
+        print(f"\n`scrap list` overhead: {overhead:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+        if args.importtime:
+            print("\nSlowest imports (cumulative / self, microseconds):")
+            for cumulative, self_us, name in import_breakdown(home, env):
+                print(f"  {cumulative:8d} {self_us:8d}  {name}")
+
+    return 0 if overhead <= args.budget_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
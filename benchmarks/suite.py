@@ -0,0 +1,215 @@
+"""
+Benchmark suite: capture, search, list, stats, reindex and cold startup.
+
+Builds a seeded synthetic scrapbook (see benchmarks.corpus), times the main
+operations and writes the results as JSON. With --baseline, the run is
+compared against an earlier results file and the exit status is 1 when any
+metric regressed by more than --threshold.
+
+    python -m benchmarks.suite --entries 10000 --output results.json
+    python -m benchmarks.suite --entries 10000 --baseline results.json --threshold 0.2
+    python -m benchmarks.suite --results new.json --baseline old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.corpus import Corpus, build
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Corpus sizes the suite is usually run at
+SIZES = (1000, 10000, 100000, 1000000)
+
+# Entries saved one at a time for the single-capture metric
+SINGLE_CAPTURES = 200
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1)]
+
+
+def timed_ms(func) -> float:
+    """Wall time of one call in milliseconds."""
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def latencies(func, args: list) -> list:
+    """Milliseconds per call of func(arg) for each arg."""
+    return [timed_ms(lambda: func(arg)) for arg in args]
+
+
+class Results:
+    """Named metrics with their unit and which direction is better."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name: str, value: float, unit: str = 'ms', better: str = 'lower') -> None:
+        self.metrics[name] = {'value': round(value, 3), 'unit': unit, 'better': better}
+        print(f"  {name:32s} {value:12.2f} {unit}", file=sys.stderr)
+
+    def add_percentiles(self, name: str, values: list) -> None:
+        for pct in (50, 95, 99):
+            self.add(f"{name}.p{pct}", percentile(values, pct))
+
+
+def run_suite(entries: int, seed: int, queries: int, startup_runs: int) -> dict:
+    """Build a corpus in a temporary HOME and time every operation."""
+    from cli.config import Config
+    from cli.reindex import Reindexer
+    from cli.search import SearchEngine
+    from cli.storage import StorageManager
+    from cli.models import EntryType
+
+    results = Results()
+    corpus = Corpus(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        os.environ['HOME'] = str(home)
+        os.environ['SCRAP_NO_DAEMON'] = '1'
+        os.chdir(home)
+
+        storage = StorageManager(Config())
+        print(f"Building {entries} entries (seed {seed})...", file=sys.stderr)
+        elapsed = timed_ms(lambda: build(storage, corpus, entries)) / 1000
+        results.add('capture.bulk_throughput', entries / elapsed, 'entries/s', 'higher')
+
+        singles = list(corpus.entries(SINGLE_CAPTURES, start=entries))
+        capture_ms = latencies(storage.save_entry, singles)
+        results.add_percentiles('capture.single', capture_ms)
+        results.add('capture.single_throughput', 1000 * len(singles) / sum(capture_ms), 'entries/s', 'higher')
+
+        search = SearchEngine(storage.config, storage)
+        words = corpus.queries(queries, seed=1)
+        search.search(words[0], limit=10)  # warm-up opens the indexes
+        results.add_percentiles('search', latencies(lambda q: search.search(q, limit=10), words))
+
+        structured = [f"type:todo priority:>=high {word}" for word in words[:max(1, queries // 4)]]
+        results.add_percentiles('search.structured', latencies(lambda q: search.query(q, limit=10), structured))
+
+        types = [None] + list(EntryType)
+        results.add_percentiles('list', latencies(
+            lambda n: storage.list_entries(types[n % len(types)], 10), list(range(queries))
+        ))
+
+        results.add('stats', statistics.median(latencies(
+            lambda _: (search.get_statistics(), search.get_tag_statistics()), range(20)
+        )))
+
+        reindexer = Reindexer(storage)
+        results.add('reindex.full', timed_ms(lambda: reindexer.run(full=True)))
+        results.add('reindex.unchanged', timed_ms(lambda: reindexer.run()))
+        reindexer.close()
+
+        env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+        bare = [timed_ms(lambda: subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True))
+                for _ in range(startup_runs)]
+        cold = [timed_ms(lambda: subprocess.run(
+            [sys.executable, '-m', 'cli.cli', 'list', '--limit', '10'], cwd=home, env=env,
+            stdout=subprocess.DEVNULL, check=True
+        )) for _ in range(startup_runs)]
+        # A bare interpreter start is outside the CLI's control
+        results.add('startup.cold_list', statistics.median(cold) - statistics.median(bare))
+        os.chdir(REPO_ROOT)
+
+    return {
+        'meta': {
+            'entries': entries,
+            'seed': seed,
+            'queries': queries,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds')
+        },
+        'metrics': results.metrics
+    }
+
+
+def git_commit() -> str:
+    """Short commit hash of the working tree, or '' outside git."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Print metric changes against a baseline and return the names that regressed.
+
+    A metric regresses when it is worse than the baseline by more than
+    `threshold` (0.2 = 20%) in the direction that matters for it.
+    """
+    if current['meta'].get('entries') != baseline['meta'].get('entries'):
+        print(f"Warning: comparing {current['meta'].get('entries')} entries against "
+              f"a baseline of {baseline['meta'].get('entries')}")
+
+    regressions = []
+    print(f"\n{'metric':32s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, metric in current['metrics'].items():
+        before = baseline['metrics'].get(name)
+        if before is None or not before['value']:
+            continue
+        change = metric['value'] / before['value'] - 1
+        worse = change > threshold if metric['better'] == 'lower' else change < -threshold / (1 + threshold)
+        if worse:
+            regressions.append(name)
+        print(f"{name:32s} {before['value']:12.2f} {metric['value']:12.2f} {change:+7.1%}"
+              f"{'  REGRESSED' if worse else ''}")
+    return regressions
+
+
+def main() -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000, help=f"Corpus size (usually one of {SIZES})")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--queries', type=int, default=200, help='Search and list calls to time')
+    parser.add_argument('--startup-runs', type=int, default=10)
+    parser.add_argument('--output', type=Path, help='Write results JSON here (default: stdout)')
+    parser.add_argument('--results', type=Path, help='Compare this results file instead of running')
+    parser.add_argument('--baseline', type=Path, help='Results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed regression (0.2 = 20%%)')
+    args = parser.parse_args()
+    # The suite runs inside a temporary directory
+    output, results, baseline = (path.resolve() if path else None
+                                 for path in (args.output, args.results, args.baseline))
+
+    if results:
+        current = json.loads(results.read_text())
+    else:
+        current = run_suite(args.entries, args.seed, args.queries, args.startup_runs)
+        text = json.dumps(current, indent=2)
+        if output:
+            output.write_text(text + '\n')
+        elif not baseline:
+            print(text)
+
+    if baseline:
+        regressions = compare(current, json.loads(baseline.read_text()), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metrics regressed by more than {args.threshold:.0%}: "
+                  + ', '.join(regressions))
+            return 1
+        print(f"\nNo metric regressed by more than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Entry point for `python -m cli` and the `scrap` console script.
+"""
+
+import sys
+try:
+    from .daemon import forward
+    from . import profiling
+except ImportError:
+    from daemon import forward
+    import profiling
+
+
+def run():
+    """Forward the command to a running `scrap serve` daemon, or run it in-process."""
+    settings = profiling.settings_from(sys.argv[1:])
+    if settings:
+        # Profiled commands always run in-process so the report covers the whole command
+        _run_profiled(settings)
+        return
+    
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    
+    try:
+        from .cli import main
+    except ImportError:
+        from cli import main
+    main()
+
+
+def _run_profiled(settings: dict):
+    """Run the command in-process under a profiler, reporting even when it exits early."""
+    profiler = profiling.start(sys.argv[1:], settings.get('output'), settings.get('cprofile'),
+                               settings.get('memory', False))
+    try:
+        with profiling.phase('import'):
+            try:
+                from .cli import main
+            except ImportError:
+                from cli import main
+        with profiling.phase('command'):
+            main()
+    finally:
+        profiling.finish(profiler)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,114 @@
+"""
+Materialized entry counts for `scrap stats`, maintained as deltas on write.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+try:
+    from .db import connect, transaction
+except ImportError:
+    from db import connect, transaction
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counts (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+"""
+
+
+def row_keys(row: Dict) -> List[Tuple[str, str]]:
+    """(dimension, key) buckets an index row is counted in."""
+    entry_type = row['type']
+    status = row.get('status') or 'active'
+    day = str(row.get('created_date') or '')[:10]
+    return [
+        ('total', ''),
+        ('type', entry_type),
+        ('status', status),
+        ('type_status', f"{entry_type}/{status}"),
+        ('priority', row.get('priority') or 'none'),
+        ('day', day),
+        ('type_day', f"{entry_type}/{day}")
+    ]
+
+
+def count_rows(rows: Iterable[Dict]) -> Counter:
+    """Full recount of the buckets for a set of index rows."""
+    return Counter(key for row in rows for key in row_keys(row))
+
+
+class StatsAggregates:
+    """Entry counts by type, status, priority and creation day.
+
+    Writers pass the old and new versions of the rows they change, so each
+    save costs a handful of single-row upserts and reading stats never scans
+    the index. `reindex` compares the stored counts with a full recount.
+    """
+
+    def __init__(self, db_path: Path):
+        """Open (or create) the aggregates database."""
+        self.db_path = db_path
+        self.is_new = not db_path.exists()
+        self.conn = connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def apply(self, old_rows: Iterable[Dict], new_rows: Iterable[Dict]) -> None:
+        """Move counts from the old versions of rows to their new versions."""
+        delta = count_rows(new_rows)
+        delta.subtract(count_rows(old_rows))
+        changes = [(dimension, key, count) for (dimension, key), count in delta.items() if count]
+        if not changes:
+            return
+        with transaction(self.conn):
+            self.conn.executemany(
+                'INSERT INTO counts (dimension, key, count) VALUES (?, ?, ?) '
+                'ON CONFLICT(dimension, key) DO UPDATE SET count = count + excluded.count',
+                changes
+            )
+            self.conn.execute('DELETE FROM counts WHERE count <= 0')
+
+    def replace(self, counts: Counter) -> None:
+        """Overwrite every stored count."""
+        with transaction(self.conn):
+            self.conn.execute('DELETE FROM counts')
+            self.conn.executemany(
+                'INSERT INTO counts (dimension, key, count) VALUES (?, ?, ?)',
+                ((dimension, key, count) for (dimension, key), count in counts.items() if count > 0)
+            )
+
+    def rebuild(self, rows: Iterable[Dict]) -> None:
+        """Recount from scratch."""
+        self.replace(count_rows(rows))
+
+    def verify(self, rows: Iterable[Dict]) -> bool:
+        """Check stored counts against a full recount, repairing them on mismatch.
+
+        Returns True when the stored counts were already correct.
+        """
+        expected = +count_rows(rows)
+        stored = Counter({(dimension, key): count for dimension, key, count
+                          in self.conn.execute('SELECT dimension, key, count FROM counts')})
+        if stored == expected:
+            return True
+        self.replace(expected)
+        return False
+
+    def counts(self, dimension: str) -> Dict[str, int]:
+        """Counts for every key of a dimension."""
+        return dict(self.conn.execute(
+            'SELECT key, count FROM counts WHERE dimension = ? ORDER BY key', (dimension,)
+        ))
+
+    def total(self) -> int:
+        """Number of indexed entries."""
+        row = self.conn.execute("SELECT count FROM counts WHERE dimension = 'total'").fetchone()
+        return row[0] if row else 0
@@ -0,0 +1,256 @@
+"""
+Versioned binary index file (.scrap/index.bin) read through mmap.
+
+The JSON index is parsed in full by every command. This format is mapped
+instead, and rows are decoded one at a time as they are asked for:
+
+    header   magic, format version, record size, row count, CRC-32 of the
+             rest of the file and the offsets of the sections below
+    records  one fixed-width record per row, sorted by (created_date, id):
+             type code, then (offset, length) into the heap of the ID, the
+             created date and the rest of the row as compact JSON
+    ids      record numbers sorted by ID, for binary-search lookups
+    heap     the UTF-8 strings the records point into
+
+Listings seek and filter on the type code, date and ID without touching
+the JSON, so only the rows that are returned get parsed. The ID and date
+are stored JSON-escaped, which lets a row be decoded by splicing them back
+into its JSON bytes, and every row at once with a single parse. Rewrites
+copy the heap bytes of unchanged rows instead of re-encoding them.
+"""
+
+import json
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+try:
+    from .locking import atomic_write_bytes
+    from .models import EntryType
+except ImportError:
+    from locking import atomic_write_bytes
+    from models import EntryType
+
+
+MAGIC = b'SCRAPIDX'
+
+FORMAT_VERSION = 1
+
+# magic, version, record size, row count, checksum, flags (unused),
+# records offset, ids offset, heap offset
+HEADER = struct.Struct('<8sHHIIIQQQ')
+
+# type code, padding, (offset, length) of the ID, created date and row JSON
+RECORD = struct.Struct('<B3xIIIIII')
+
+ID_SLOT = struct.Struct('<I')
+
+TYPE_VALUES = [t.value for t in EntryType]
+TYPE_CODES = {value: code for code, value in enumerate(TYPE_VALUES)}
+
+# Type code of rows whose type is not an EntryType; the type stays in the JSON
+OTHER_TYPE = 255
+
+# JSON that opens a decoded row, per type code, before the ID and date are spliced in
+ROW_PREFIXES = [b'{"type":"' + value.encode('utf-8') + b'","id":"' for value in TYPE_VALUES]
+OTHER_PREFIX = b'{"id":"'
+
+ROW_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+class BinaryIndexError(ValueError):
+    """An index file that is truncated, corrupt or of an unsupported version."""
+
+
+# A row as stored: (created_date, id, type code, JSON of the other fields),
+# with the date and ID JSON-escaped UTF-8
+RawRow = Tuple[bytes, bytes, int, bytes]
+
+
+def _escape(value: str) -> bytes:
+    return ROW_ENCODER.encode(value)[1:-1].encode('utf-8')
+
+
+def _unescape(value: str) -> str:
+    return json.loads(f'"{value}"') if '\\' in value else value
+
+
+def encode_row(row: Dict) -> RawRow:
+    """Split an index row into its record fields and the JSON of the rest."""
+    code = TYPE_CODES.get(row.get('type'), OTHER_TYPE)
+    rest = {key: value for key, value in row.items()
+            if key not in ('id', 'created_date') and (key != 'type' or code == OTHER_TYPE)}
+    return (_escape(row['created_date']), _escape(row['id']), code, ROW_ENCODER.encode(rest).encode('utf-8'))
+
+
+def encode(rows: Iterable[RawRow]) -> bytes:
+    """Binary index file holding `rows` (as from encode_row or BinaryIndex.raw)."""
+    rows = sorted(rows, key=lambda raw: (raw[0], raw[1]))
+    records = bytearray()
+    heap = bytearray()
+    ids = []
+    for date_bytes, id_bytes, code, rest in rows:
+        id_at = len(heap)
+        heap += id_bytes
+        date_at = len(heap)
+        heap += date_bytes
+        rest_at = len(heap)
+        heap += rest
+        records += RECORD.pack(code, id_at, len(id_bytes), date_at, len(date_bytes), rest_at, len(rest))
+        ids.append(id_bytes)
+    id_table = b''.join(ID_SLOT.pack(n) for n in sorted(range(len(rows)), key=ids.__getitem__))
+
+    records_at = HEADER.size
+    ids_at = records_at + len(records)
+    heap_at = ids_at + len(id_table)
+    body = bytes(records) + id_table + bytes(heap)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, len(rows), zlib.crc32(body), 0,
+                         records_at, ids_at, heap_at)
+    return header + body
+
+
+def updated_rows(reader: Optional['BinaryIndex'], upserted: Iterable[Dict] = (),
+                 deleted: Iterable[str] = ()) -> List[RawRow]:
+    """Stored rows of `reader` (None: no file) with rows upserted and IDs deleted."""
+    new = {raw[1]: raw for raw in map(encode_row, upserted)}
+    dropped = set(new).union(map(_escape, deleted))
+    kept = []
+    if reader is not None:
+        kept = [raw for raw in map(reader.raw, range(reader.count)) if raw[1] not in dropped]
+    return kept + list(new.values())
+
+
+def write_index(path: Path, rows: Iterable[RawRow]) -> None:
+    """Atomically replace the index file at `path`."""
+    atomic_write_bytes(path, encode(rows))
+
+
+class BinaryIndex:
+    """Read-only view of an index file, decoding rows on demand."""
+
+    def __init__(self, path: Path, verify: bool = True):
+        """Map the file and check its header (and checksum, if `verify`)."""
+        self.path = path
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+            if size < HEADER.size:
+                raise BinaryIndexError(f"{path.name} is truncated")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, record_size, self.count, checksum, _,
+             self._records_at, self._ids_at, self._heap_at) = HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise BinaryIndexError(f"{path.name} is not a scrap index file")
+            if version != FORMAT_VERSION or record_size != RECORD.size:
+                raise BinaryIndexError(f"{path.name} has unsupported format version {version}")
+            if (self._ids_at != self._records_at + self.count * RECORD.size
+                    or self._heap_at != self._ids_at + self.count * ID_SLOT.size or self._heap_at > size):
+                raise BinaryIndexError(f"{path.name} is truncated")
+            if verify and zlib.crc32(memoryview(self._map)[HEADER.size:]) != checksum:
+                raise BinaryIndexError(f"{path.name} failed its checksum")
+        except BaseException:
+            self._map.close()
+            raise
+        self._rows: Dict[int, Dict] = {}
+
+    def close(self) -> None:
+        """Unmap the file; rows already decoded stay valid."""
+        self._map.close()
+
+    def _record(self, n: int) -> tuple:
+        return RECORD.unpack_from(self._map, self._records_at + n * RECORD.size)
+
+    def _bytes(self, at: int, length: int) -> bytes:
+        start = self._heap_at + at
+        return self._map[start:start + length]
+
+    def type_code(self, n: int) -> int:
+        """Type code of record n."""
+        return self._map[self._records_at + n * RECORD.size]
+
+    def entry_id(self, n: int) -> str:
+        """ID of record n."""
+        _, id_at, id_len, _, _, _, _ = self._record(n)
+        return _unescape(self._bytes(id_at, id_len).decode('utf-8'))
+
+    @staticmethod
+    def _splice(code: int, entry_id: bytes, created_date: bytes, rest: bytes) -> bytes:
+        """JSON of a whole row from its record fields and the JSON of the rest."""
+        prefix = OTHER_PREFIX if code == OTHER_TYPE else ROW_PREFIXES[code]
+        tail = b'",' + rest[1:] if rest != b'{}' else b'"}'
+        return prefix + entry_id + b'","created_date":"' + created_date + tail
+
+    def row(self, n: int) -> Dict:
+        """Index row of record n, decoded on first use.
+
+        The decoded dict is shared between calls, so callers must not modify it.
+        """
+        row = self._rows.get(n)
+        if row is None:
+            code, id_at, id_len, date_at, date_len, rest_at, rest_len = self._record(n)
+            row = self._rows[n] = json.loads(self._splice(
+                code, self._bytes(id_at, id_len), self._bytes(date_at, date_len), self._bytes(rest_at, rest_len)
+            ))
+        return row
+
+    def rows(self) -> Dict[str, Dict]:
+        """Every row keyed by ID, decoded with one JSON parse rather than one per row."""
+        heap = self._map[self._heap_at:]
+        rows = json.loads(b'[' + b','.join(
+            self._splice(code, heap[id_at:id_at + id_len], heap[date_at:date_at + date_len],
+                         heap[rest_at:rest_at + rest_len])
+            for code, id_at, id_len, date_at, date_len, rest_at, rest_len
+            in RECORD.iter_unpack(self._map[self._records_at:self._ids_at])
+        ) + b']')
+        # Keep handing out the dicts already decoded
+        for n, row in self._rows.items():
+            rows[n] = row
+        return {row['id']: row for row in rows}
+
+    def raw(self, n: int) -> RawRow:
+        """Record n as stored, without decoding its JSON."""
+        code, id_at, id_len, date_at, date_len, rest_at, rest_len = self._record(n)
+        return (self._bytes(date_at, date_len), self._bytes(id_at, id_len), code, self._bytes(rest_at, rest_len))
+
+    def find(self, entry_id: str) -> Optional[int]:
+        """Record number of an ID, by binary search over the ID table."""
+        target = _escape(entry_id)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            n = ID_SLOT.unpack_from(self._map, self._ids_at + middle * ID_SLOT.size)[0]
+            _, id_at, id_len, _, _, _, _ = self._record(n)
+            found = self._bytes(id_at, id_len)
+            if found == target:
+                return n
+            if found < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def seek(self, key: Tuple[str, ...]) -> int:
+        """Number of records sorting before `key`, a (created_date,) or (created_date, id) prefix."""
+        key = tuple(_escape(value) for value in key)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found = self.raw(middle)[:len(key)]
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def newest(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+               until: Optional[str] = None, after: Optional[Tuple[str, str]] = None) -> Iterator[int]:
+        """Record numbers newest first, filtered by type, [since, until) and keyset position."""
+        stop = self.seek((until,)) if until else self.count
+        if after is not None:
+            stop = min(stop, self.seek(tuple(after)))
+        start = self.seek((since,)) if since else 0
+        code = TYPE_CODES[entry_type.value] if entry_type else None
+        for n in range(stop - 1, start - 1, -1):
+            if code is None or self.type_code(n) == code:
+                yield n
@@ -3,31 +3,64 @@ Command-line interface for scrapbook.
 """
 
 import click
-from datetime import datetime
+import importlib
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
 from typing import List, Optional
 try:
     from .models import ScrapEntry, EntryType, Status, Priority
     from .config import Config
-    from .storage import StorageManager
-    from .search import SearchEngine
+    from . import profiling
 except ImportError:
     from models import ScrapEntry, EntryType, Status, Priority
     from config import Config
-    from storage import StorageManager
-    from search import SearchEngine
+    import profiling
+
+
+def _load_module(name: str):
+    """Import a sibling module on first use so startup only pays for what a command needs."""
+    with profiling.phase('import'):
+        if __package__:
+            return importlib.import_module(f'.{name}', __package__)
+        return importlib.import_module(name)
+
+
+class AppContext(dict):
+    """Context object that builds config, storage and search on first access."""
+    
+    def __missing__(self, key):
+        if key == 'config':
+            value = Config()
+        elif key == 'storage':
+            value = _load_module('storage').StorageManager(self['config'])
+        elif key == 'search':
+            value = _load_module('search').SearchEngine(self['config'], self['storage'])
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
 
 
 @click.group(invoke_without_command=True)
 @click.option('--config', help='Show configuration')
+@click.option('--profile', is_flag=True, help='Report per-phase time, I/O and memory on stderr')
+@click.option('--profile-output', metavar='PATH', help='Append the profile to a JSONL file instead')
+@click.option('--profile-cprofile', metavar='PATH', help='Also dump cProfile stats (for pstats/snakeviz)')
+@click.option('--profile-memory', is_flag=True, help='Profile per-phase Python heap peaks (slower)')
 @click.pass_context
-def main(ctx, config):
+def main(ctx, config, profile, profile_output, profile_cprofile, profile_memory):
     """Scrapbook - A lightweight CLI tool for capturing ideas, prompts, and todos."""
-    # Initialize config and storage
-    ctx.ensure_object(dict)
-    ctx.obj['config'] = Config()
-    ctx.obj['storage'] = StorageManager(ctx.obj['config'])
-    ctx.obj['search'] = SearchEngine(ctx.obj['config'], ctx.obj['storage'])
+    # Config, storage and search are created lazily by the subcommands that use them
+    ctx.ensure_object(AppContext)
+    
+    # `scrap` starts the profiler before importing the CLI; this covers other entry points such as the daemon
+    if (profile or profile_output or profile_cprofile or profile_memory) and profiling.active() is None:
+        # sys.argv belongs to the daemon there, so only the subcommand is recorded
+        profiler = profiling.start([ctx.invoked_subcommand or ''], profile_output, profile_cprofile,
+                                   profile_memory)
+        ctx.call_on_close(lambda: profiling.finish(profiler))
     
     if config:
         show_config(ctx.obj['config'])
@@ -47,7 +80,7 @@ def main(ctx, config):
 @click.pass_context
 def add_idea(ctx, title, content, context, tags, priority):
     """Add a new idea (-I shortcut)."""
-    _add_entry(ctx, EntryType.IDEA, title, content, context, tags, priority)
+    _add_entry(ctx, EntryType.IDEA, title, content, context, tags, priority=priority)
 
 
 @main.command('prompt')
@@ -74,7 +107,7 @@ def add_prompt(ctx, title, content, context, tags, category):
 @click.pass_context
 def add_todo(ctx, title, content, context, tags, priority, status):
     """Add a new todo (-T shortcut)."""
-    _add_entry(ctx, EntryType.TODO, title, content, context, tags, priority, status=status)
+    _add_entry(ctx, EntryType.TODO, title, content, context, tags, priority=priority, status=status)
 
 
 @main.command('journal')
@@ -87,7 +120,7 @@ def add_todo(ctx, title, content, context, tags, priority, status):
 @click.pass_context
 def add_journal(ctx, title, content, context, tags, priority):
     """Add a new journal entry (-J shortcut)."""
-    _add_entry(ctx, EntryType.JOURNAL, title, content, context, tags, priority)
+    _add_entry(ctx, EntryType.JOURNAL, title, content, context, tags, priority=priority)
 
 
 @main.command('workflow')
@@ -104,46 +137,249 @@ def add_workflow(ctx, title, content, context, tags, category, priority):
     _add_entry(ctx, EntryType.WORKFLOW, title, content, context, tags, category, priority=priority)
 
 
+def _split_tags(tags: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated tag option."""
+    return [t.strip() for t in tags.split(',') if t.strip()] if tags is not None else None
+
+
+def _target_ids(ctx, ids: tuple, query: Optional[str]) -> List[str]:
+    """Entry IDs given on the command line plus those matching a structured query."""
+    targets = list(ids)
+    if query:
+        query_module = _load_module('query')
+        try:
+            results, _ = ctx.obj['search'].query(query, limit=sys.maxsize)
+        except query_module.QueryError as e:
+            raise click.BadParameter(str(e), param_hint='--query')
+        targets.extend(row['id'] for row in results)
+    if not targets:
+        raise click.UsageError("Give entry IDs or --query")
+    return list(dict.fromkeys(targets))
+
+
+def _apply_update(ctx, ids: tuple, query: Optional[str], values: dict, action: str,
+                  add_tags: Optional[List[str]] = None, remove_tags: Optional[List[str]] = None):
+    """Update target entries and report what changed."""
+    targets = _target_ids(ctx, ids, query)
+    updated = ctx.obj['storage'].update_entries(targets, values, add_tags, remove_tags)
+    _report_changes(targets, updated, action)
+
+
+def _report_changes(targets: List[str], changed: List[str], action: str):
+    """Print how many entries changed and which IDs were not found."""
+    done = set(changed)
+    missing = [entry_id for entry_id in targets if entry_id not in done]
+    if changed:
+        noun = 'entry' if len(changed) == 1 else 'entries'
+        click.echo(f"{action} {len(changed)} {noun}: {', '.join(changed[:10])}"
+                   + (f" and {len(changed) - 10} more" if len(changed) > 10 else ''))
+    if missing:
+        click.echo(f"Not found: {', '.join(missing)}")
+    if not changed:
+        raise click.ClickException("No entries changed")
+
+
+ids_argument = click.argument('ids', nargs=-1)
+query_option = click.option('--query', '-q', help='Also apply to entries matching a structured search query')
+
+
+@main.command('update')
+@ids_argument
+@query_option
+@click.option('--status', '-s', type=click.Choice(['active', 'completed', 'archived']), help='New status')
+@click.option('--priority', '-p', type=click.Choice(['low', 'medium', 'high', 'urgent', 'none']),
+              help='New priority (none to clear)')
+@click.option('--category', help='New category')
+@click.option('--tags', '-t', help='Replace tags (comma-separated)')
+@click.option('--add-tags', help='Add tags (comma-separated)')
+@click.option('--remove-tags', help='Remove tags (comma-separated)')
+@click.pass_context
+def update_entries(ctx, ids, query, status, priority, category, tags, add_tags, remove_tags):
+    """Change the status, priority, category or tags of entries."""
+    values = {}
+    if status:
+        values['status'] = status
+    if priority:
+        values['priority'] = None if priority == 'none' else priority
+    if category is not None:
+        values['category'] = category or None
+    if tags is not None:
+        values['tags'] = _split_tags(tags)
+    if not values and not add_tags and not remove_tags:
+        raise click.UsageError("Nothing to change (use --status, --priority, --category or the tag options)")
+    _apply_update(ctx, ids, query, values, "Updated", _split_tags(add_tags), _split_tags(remove_tags))
+
+
+@main.command('done')
+@ids_argument
+@query_option
+@click.pass_context
+def mark_done(ctx, ids, query):
+    """Mark entries completed."""
+    _apply_update(ctx, ids, query, {'status': 'completed'}, "Completed")
+
+
+@main.command('archive')
+@ids_argument
+@query_option
+@click.pass_context
+def archive_entries(ctx, ids, query):
+    """Archive entries."""
+    _apply_update(ctx, ids, query, {'status': 'archived'}, "Archived")
+
+
+@main.command('delete')
+@ids_argument
+@query_option
+@click.option('--yes', '-y', is_flag=True, help='Delete entries matched by --query without listing them first')
+@click.pass_context
+def delete_entries(ctx, ids, query, yes):
+    """Delete entries and their files."""
+    targets = _target_ids(ctx, ids, query)
+    if query and not yes:
+        click.echo(f"{len(targets)} entries match; re-run with --yes to delete them:\n")
+        for row in ctx.obj['storage'].index.get_many(targets[:20]).values():
+            _display_entry_summary(row)
+        return
+    deleted = ctx.obj['storage'].delete_entries(targets)
+    _report_changes(targets, deleted, "Deleted")
+
+
 @main.command('search')
 @click.argument('query')
 @click.option('--type', '-t', type=click.Choice(['idea', 'prompt', 'todo', 'journal', 'workflow']), 
               help='Filter by entry type')
-@click.option('--tags', help='Filter by tags (comma-separated)')
-@click.option('--limit', '-l', type=int, default=10, help='Maximum results')
+@click.option('--tags', help='Filter by tags, matching any (comma-separated)')
+@click.option('--all-tags', help='Only entries with all of these tags (comma-separated)')
+@click.option('--exclude-tags', help='Skip entries with any of these tags (comma-separated)')
+@click.option('--fuzzy', '-f', is_flag=True, help='Match title and tag words despite typos')
+@click.option('--explain', is_flag=True, help='Show the query plan with row counts per step')
+@click.option('--snippets', is_flag=True, help='Show a preview of each entry\'s content')
+@click.option('--format', 'fmt', type=click.Choice(['text', 'jsonl', 'json', 'tsv']), default='text',
+              help='Output format; jsonl, json and tsv are streamed for scripts and agents')
+@click.option('--cursor', help='Continue after the result a previous page\'s cursor points at')
+@click.option('--limit', '-l', type=int, default=10, help='Maximum results (0 for no limit)')
 @click.pass_context
-def search_entries(ctx, query, type, tags, limit):
-    """Search entries by query."""
+def search_entries(ctx, query, type, tags, all_tags, exclude_tags, fuzzy, explain, snippets, fmt, cursor, limit):
+    """Search entries by query.
+    
+    Queries can combine fields, e.g. type:todo priority:>=high tag:infra
+    -tag:done created:>2026-09-01 "rate limit" (also OR, NOT and parentheses).
+    """
     search_engine = ctx.obj['search']
+    query_module = _load_module('query')
     
     entry_type = EntryType(type) if type else None
     tag_list = [t.strip() for t in tags.split(',')] if tags else None
+    all_tag_list = [t.strip() for t in all_tags.split(',')] if all_tags else None
+    exclude_tag_list = [t.strip() for t in exclude_tags.split(',')] if exclude_tags else None
+    structured = explain or (not fuzzy and query_module.is_structured(query))
     
-    results = search_engine.search(query, entry_type, tag_list, limit)
+    if fmt != 'text' or cursor or limit == 0:
+        results_module = _load_module('results')
+        scope = results_module.fingerprint('search', query, type, tag_list, all_tag_list, exclude_tag_list,
+                                           fuzzy, structured)
+        after = _decode_cursor(cursor, scope)
+        filters = dict(entry_type=entry_type, tags=tag_list, all_tags=all_tag_list,
+                       exclude_tags=exclude_tag_list, after=after)
+        try:
+            if structured:
+                order, hits, steps = search_engine.stream_query(query, **filters)
+                if explain:
+                    _display_plan(steps, err=fmt != 'text')
+            else:
+                order, hits = search_engine.stream_search(query, fuzzy=fuzzy or None, **filters)
+        except query_module.QueryError as e:
+            raise click.BadParameter(str(e), param_hint='QUERY')
+        except results_module.CursorError as e:
+            raise click.BadParameter(str(e), param_hint='--cursor')
+        _write_page(ctx, scope, order, hits, fmt, limit, snippets)
+        return
+    
+    filters = dict(entry_type=entry_type, tags=tag_list, limit=limit,
+                   all_tags=all_tag_list, exclude_tags=exclude_tag_list)
+    if structured:
+        try:
+            results, steps = search_engine.query(query, **filters)
+        except query_module.QueryError as e:
+            raise click.BadParameter(str(e), param_hint='QUERY')
+        if explain:
+            _display_plan(steps)
+    elif fuzzy:
+        results = search_engine.search_fuzzy(query, **filters)
+    else:
+        results = search_engine.search(query, fuzzy=False, **filters)
+        if not results and query.strip():
+            results = search_engine.search_fuzzy(query, **filters)
+            if results:
+                click.echo("No exact matches; showing close matches.\n")
     
     if not results:
         click.echo("No results found.")
         return
     
     click.echo(f"Found {len(results)} results:\n")
+    storage = ctx.obj['storage']
     for result in results:
-        _display_entry_summary(result)
+        _display_entry_summary(result, storage.snippet(result) if snippets else None)
 
 
 @main.command('list')
 @click.option('--type', '-t', type=click.Choice(['idea', 'prompt', 'todo', 'journal', 'workflow']), 
               help='Filter by entry type')
 @click.option('--recent', '-r', type=int, help='Show entries from last N days')
-@click.option('--limit', '-l', type=int, default=10, help='Maximum results')
+@click.option('--since', help='Only entries created at or after this time (YYYY-MM-DD, ISO time, or 7d/12h/2w ago)')
+@click.option('--until', help='Only entries created before this time (same formats as --since)')
+@click.option('--window', '-w', multiple=True, metavar='TYPE=SINCE',
+              help='Per-type --since, e.g. todo=30d or journal=2024-01-01 (repeatable)')
+@click.option('--snippets', is_flag=True, help='Show a preview of each entry\'s content')
+@click.option('--format', 'fmt', type=click.Choice(['text', 'jsonl', 'json', 'tsv']), default='text',
+              help='Output format; jsonl, json and tsv are streamed for scripts and agents')
+@click.option('--cursor', help='Continue after the entry a previous page\'s cursor points at')
+@click.option('--limit', '-l', type=int, default=10, help='Maximum results (0 for no limit)')
 @click.pass_context
-def list_entries(ctx, type, recent, limit):
+def list_entries(ctx, type, recent, since, until, window, snippets, fmt, cursor, limit):
     """List entries."""
     search_engine = ctx.obj['search']
+    parse_time_bound = _load_module('search').parse_time_bound
+    
+    entry_type = EntryType(type) if type else None
+    try:
+        since_time = parse_time_bound(since) if since else None
+        until_time = parse_time_bound(until) if until else None
+        windows = {}
+        for item in window:
+            type_name, _, bound = item.partition('=')
+            windows[EntryType(type_name.strip())] = parse_time_bound(bound)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    
+    if fmt != 'text' or cursor or limit == 0:
+        results_module = _load_module('results')
+        # Relative bounds are fingerprinted as given, so later pages keep the same scope
+        scope = results_module.fingerprint('list', type, recent, since, until, sorted(window))
+        if recent:
+            since_time = datetime.now() - timedelta(days=recent)
+        try:
+            rows = search_engine.stream_list(entry_type, since_time, until_time, windows,
+                                             after=_decode_cursor(cursor, scope))
+        except results_module.CursorError as e:
+            raise click.BadParameter(str(e), param_hint='--cursor')
+        _write_page(ctx, scope, results_module.NEWEST, ((row, None) for row in rows), fmt, limit, snippets)
+        return
     
     if recent:
         results = search_engine.list_recent(recent, limit)
         click.echo(f"Entries from last {recent} days:\n")
+    elif since_time or until_time or windows:
+        results = search_engine.list_window(entry_type, since_time, until_time, windows, limit)
+        label = f"{type.title()}s" if type else "Entries"
+        if since_time:
+            label += f" since {since_time:%Y-%m-%d %H:%M}"
+        if until_time:
+            label += f" until {until_time:%Y-%m-%d %H:%M}"
+        click.echo(f"{label}:\n")
     elif type:
-        entry_type = EntryType(type)
         results = search_engine.list_by_type(entry_type, limit)
         click.echo(f"{type.title()}s:\n")
     else:
@@ -155,13 +391,19 @@ def list_entries(ctx, type, recent, limit):
         click.echo("No entries found.")
         return
     
+    storage = ctx.obj['storage']
     for result in results:
-        _display_entry_summary(result)
+        _display_entry_summary(result, storage.snippet(result) if snippets else None)
 
 
 @main.command('stats')
+@click.option('--histogram', type=click.Choice(['day', 'week', 'month']),
+              help='Also show entries created per day, week or month')
+@click.option('--buckets', type=int, default=12, help='Number of histogram buckets (default: 12)')
+@click.option('--type', '-t', type=click.Choice(['idea', 'prompt', 'todo', 'journal', 'workflow']),
+              help='Histogram for one entry type only')
 @click.pass_context
-def show_stats(ctx):
+def show_stats(ctx, histogram, buckets, type):
     """Show statistics about entries."""
     search_engine = ctx.obj['search']
     
@@ -176,10 +418,35 @@ def show_stats(ctx):
     click.echo(f"Journal entries: {stats['journals']}")
     click.echo(f"Workflows: {stats.get('workflows', 0)}")
     
+    priorities = [f"{stats[f'{p}_priority']} {p}" for p in ('urgent', 'high', 'medium', 'low')
+                  if stats.get(f'{p}_priority')]
+    if priorities:
+        click.echo(f"Priorities: {', '.join(priorities)}")
+    
     if tag_stats:
         click.echo(f"\nTop tags:")
         for tag, count in list(tag_stats.items())[:10]:
             click.echo(f"  {tag}: {count}")
+    
+    if histogram:
+        entry_type = EntryType(type) if type else None
+        rows = search_engine.get_histogram(histogram, entry_type, buckets)
+        peak = max((count for _, count in rows), default=0) or 1
+        click.echo(f"\nEntries per {histogram}{f' ({type})' if type else ''}:")
+        for label, count in rows:
+            click.echo(f"  {label:10s} {'#' * round(40 * count / peak):40s} {count}")
+
+
+@main.command('show')
+@click.argument('entry_id')
+@click.pass_context
+def show_entry(ctx, entry_id):
+    """Show an entry with its content."""
+    storage = ctx.obj['storage']
+    entry = storage.index.get(entry_id)
+    if entry is None:
+        raise click.ClickException(f"Entry not found: {entry_id}")
+    _display_entry_detail(storage, entry)
 
 
 @main.command('random-todo')
@@ -191,77 +458,163 @@ def show_stats(ctx):
 def random_todo(ctx, status, priority):
     """Get a random todo entry (useful for LLMs to suggest work)."""
     import random
-    from datetime import datetime
     
     storage = ctx.obj['storage']
     
-    # Get all todos
-    todos = storage.list_entries(entry_type=EntryType.TODO, limit=1000)
-    
-    # Filter by status
-    if status:
-        todos = [t for t in todos if t.get('status', 'active') == status]
-    
-    # Filter by priority if specified
+    # Pick among the matching IDs from the index; only the chosen row is read
+    todo_ids = storage.index.ids_where('status', {status}, entry_type=EntryType.TODO)
     if priority:
-        todos = [t for t in todos if t.get('priority') == priority]
+        todo_ids &= storage.index.ids_where('priority', {priority}, entry_type=EntryType.TODO)
     
-    if not todos:
+    if not todo_ids:
         status_msg = f" with status '{status}'" if status != 'active' else ""
         priority_msg = f" and priority '{priority}'" if priority else ""
         click.echo(f"No todos found{status_msg}{priority_msg}.")
         return
     
     # Select random todo
-    random_todo = random.choice(todos)
+    random_todo = storage.index.get(random.choice(sorted(todo_ids)))
     
     # Display the random todo
     click.echo("🎯 Random Todo Selected:")
-    click.echo(f"Title: {random_todo['title']}")
-    click.echo(f"ID: {random_todo['id']}")
-    click.echo(f"Type: {random_todo['type']}")
-    click.echo(f"Status: {random_todo.get('status', 'active')}")
-    if random_todo.get('priority'):
-        click.echo(f"Priority: {random_todo['priority']}")
-    click.echo(f"Created: {random_todo['created_date'][:10]}")
-    if random_todo.get('tags'):
-        click.echo(f"Tags: {', '.join(random_todo['tags'])}")
-    click.echo()
+    _display_entry_detail(storage, random_todo)
+
+
+@main.command('import')
+@click.argument('source', type=click.Path(exists=True, path_type=Path))
+@click.option('--format', 'fmt', type=click.Choice(['auto', 'jsonl', 'csv', 'markdown']), default='auto',
+              help='Input format (default: detect from source)')
+@click.option('--type', '-t', type=click.Choice(['idea', 'prompt', 'todo', 'journal', 'workflow']),
+              default='idea', help='Entry type for records that do not specify one')
+@click.option('--batch-size', '-b', type=int, default=500, help='Entries committed per batch')
+@click.option('--workers', '-w', type=int, default=8, help='Parallel file writers')
+@click.pass_context
+def import_entries(ctx, source, fmt, type, batch_size, workers):
+    """Bulk import entries from JSONL, CSV or a markdown directory."""
+    importer = _load_module('importer').Importer(ctx.obj['storage'], batch_size=batch_size, workers=workers)
     
-    # Try to read and display the content
+    result = importer.run(importer.read(source, fmt), default_type=EntryType(type))
+    
+    click.echo(f"Imported {result.imported} entries in {result.elapsed:.2f}s "
+               f"({result.rate:.0f} entries/sec)")
+    if result.skipped:
+        click.echo(f"Skipped {result.skipped} invalid records")
+
+
+@main.command('reindex')
+@click.option('--full', is_flag=True, help='Re-read every file, not just changed ones')
+@click.option('--workers', '-w', type=int, help='Parser processes (default: CPU count)')
+@click.pass_context
+def reindex(ctx, full, workers):
+    """Rebuild the index from the markdown files on disk."""
+    reindexer = _load_module('reindex').Reindexer(ctx.obj['storage'], workers=workers)
+    result = reindexer.run(full=full)
+    
+    click.echo(f"Scanned {result.scanned} files in {result.elapsed:.2f}s: "
+               f"{result.changed} updated, {result.unchanged} unchanged, {result.removed} removed")
+    if result.skipped:
+        click.echo(f"Skipped {result.skipped} files without a valid id in their frontmatter")
+    if result.stats_repaired:
+        click.echo("Statistics did not match the index and were recounted")
+
+
+@main.command('export-manifest')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, path_type=Path),
+              help='Manifest path (default: website/src/data/todoManifest.json)')
+@click.option('--incremental', '-i', is_flag=True, help='Apply only the todos changed since the last export')
+@click.option('--reindex', is_flag=True, help='First pick up files edited outside scrap (when not running scrap watch)')
+@click.pass_context
+def export_manifest(ctx, output, incremental, reindex):
+    """Write the Kanban board's todo manifest from the index."""
+    manifest = _load_module('manifest')
+    storage = ctx.obj['storage']
+    path = output or manifest.default_path(storage)
+    if reindex:
+        reindexer = _load_module('reindex').Reindexer(storage)
+        reindexer.run()
+        reindexer.close()
+    result = manifest.export(storage, path, incremental=incremental)
+    
+    if result.incremental:
+        click.echo(f"Updated {path}: {result.updated} changed, {result.removed} removed, "
+                   f"{result.count} todos ({result.elapsed * 1000:.1f} ms)")
+    else:
+        click.echo(f"Wrote {result.count} todos to {path} ({result.elapsed * 1000:.1f} ms)")
+
+
+@main.command('export-index')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, path_type=Path),
+              help='File to write (default: stdout)')
+@click.pass_context
+def export_index(ctx, output):
+    """Write the index as JSON, in the format of the legacy index.json."""
+    import json
+
+    index = ctx.obj['storage'].index.all()
+    text = json.dumps(index, indent=2, ensure_ascii=False)
+    if output:
+        output.write_text(text + '\n', encoding='utf-8')
+        click.echo(f"Wrote {len(index)} index rows to {output}", err=True)
+    else:
+        click.echo(text)
+
+
+@main.command('watch')
+@click.option('--poll', is_flag=True, help='Poll file mtimes instead of using inotify (e.g. network mounts)')
+@click.option('--interval', type=float, default=1.0, help='Seconds between polls with --poll')
+@click.option('--debounce', type=float, default=0.2, help='Seconds of quiet before a burst of changes is applied')
+@click.pass_context
+def watch(ctx, poll, interval, debounce):
+    """Keep the index in sync with markdown files edited outside scrap."""
+    watcher_module = _load_module('watcher')
+    storage = ctx.obj['storage']
+    reindexer = _load_module('reindex').Reindexer(storage)
+    
+    # Start watching before catching up so edits made meanwhile are not missed
+    watcher = watcher_module.open_watcher(storage.data_dir, poll=poll, interval=interval)
+    result = reindexer.run()
+    mode = 'polling' if isinstance(watcher, watcher_module.PollingWatcher) else 'inotify'
+    click.echo(f"Watching {storage.data_dir} ({mode}); index caught up: "
+               f"{result.changed} updated, {result.removed} removed (Ctrl+C to stop)")
+    
+    def report(result, paths):
+        if result.changed or result.removed or result.skipped:
+            click.echo(f"{datetime.now():%H:%M:%S} {paths} changed files: {result.changed} updated, "
+                       f"{result.removed} removed, {result.skipped} skipped ({result.elapsed * 1000:.0f} ms)")
+    
+    import signal
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     try:
-        config = ctx.obj['config']
-        data_dir = config.get_data_dir()
-        file_path = data_dir / random_todo['file_path']
-        
-        if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Extract content between frontmatter and first heading
-            lines = content.split('\n')
-            in_content = False
-            content_lines = []
-            
-            for line in lines:
-                if line.startswith('---') and not in_content:
-                    in_content = True
-                    continue
-                elif line.startswith('---') and in_content:
-                    in_content = False
-                    continue
-                elif not in_content and line.startswith('# '):
-                    continue  # Skip title heading
-                elif not in_content:
-                    content_lines.append(line)
-            
-            content_text = '\n'.join(content_lines).strip()
-            if content_text:
-                click.echo("Content:")
-                click.echo(content_text)
-                
-    except Exception as e:
-        click.echo(f"Could not read todo content: {e}")
+        watcher_module.watch(reindexer, watcher, report, debounce=debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        reindexer.close()
+
+
+@main.command('serve')
+@click.pass_context
+def serve(ctx):
+    """Run a daemon that keeps the index loaded; ./scrap forwards to it."""
+    daemon = _load_module('daemon')
+    path = daemon.socket_path(ctx.obj['config'])
+    
+    # Open the secondary indexes and load the columnar index copy once, up front
+    storage = ctx.obj['storage']
+    storage.index.columns()
+    storage.fulltext
+    storage.tags
+    storage.fuzzy
+    storage.stats
+    ctx.obj['search']
+    
+    try:
+        daemon.prepare_socket_dir(path)
+    except PermissionError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Serving {storage.data_dir} on {path} (Ctrl+C to stop)")
+    daemon.serve(main, ctx.obj, path)
 
 
 @main.command('config')
@@ -320,7 +673,8 @@ def _add_entry(ctx, entry_type: EntryType, title: str, content: str,
     click.echo(f"{entry_type.value.title()} saved as: {path_display}")
 
 
-def _display_entry_summary(entry: dict):
+@profiling.traced('output')
+def _display_entry_summary(entry: dict, snippet: Optional[str] = None):
     """Display a summary of an entry."""
     type_emoji = {'idea': '', 'prompt': '', 'todo': '', 'journal': '', 'workflow': ''}
     emoji = type_emoji.get(entry['type'], '')
@@ -329,9 +683,95 @@ def _display_entry_summary(entry: dict):
     click.echo(f"   Type: {entry['type']} | Created: {entry['created_date'][:10]}")
     if entry.get('tags'):
         click.echo(f"   Tags: {', '.join(entry['tags'])}")
+    if snippet:
+        click.echo(f"   {snippet}")
     click.echo()
 
 
+@profiling.traced('output')
+def _display_entry_detail(storage, entry: dict):
+    """Display an entry's metadata followed by its content."""
+    click.echo(f"Title: {entry['title']}")
+    click.echo(f"ID: {entry['id']}")
+    click.echo(f"Type: {entry['type']}")
+    click.echo(f"Status: {entry.get('status', 'active')}")
+    if entry.get('priority'):
+        click.echo(f"Priority: {entry['priority']}")
+    if entry.get('category'):
+        click.echo(f"Category: {entry['category']}")
+    click.echo(f"Created: {entry['created_date'][:10]}")
+    if entry.get('tags'):
+        click.echo(f"Tags: {', '.join(entry['tags'])}")
+    click.echo()
+    
+    # Only the body's byte range is read, via the offsets in the index
+    try:
+        content_text = storage.read_body(entry).strip()
+    except OSError as e:
+        click.echo(f"Could not read entry content: {e}")
+        return
+    if content_text:
+        click.echo("Content:")
+        click.echo(content_text)
+
+
+@profiling.traced('output')
+def _display_plan(steps: List, err: bool = False) -> None:
+    """Print the steps of an executed query plan (to stderr with `err`)."""
+    click.echo("Query plan:", err=err)
+    click.echo(f"  {'#':>2}  {'step':9s} {'source':14s} {'est':>7s} {'rows':>7s}  predicate", err=err)
+    for number, step in enumerate(steps, 1):
+        estimate = '' if step.estimate is None else step.estimate
+        rows = '' if step.rows is None else step.rows
+        click.echo(f"  {number:>2}  {step.action:9s} {step.source:14s} {estimate:>7} {rows:>7}  {step.predicate}",
+                   err=err)
+    click.echo(err=err)
+
+
+def _decode_cursor(cursor: Optional[str], scope: str):
+    """Decode a --cursor option issued for the query with fingerprint `scope`."""
+    if not cursor:
+        return None
+    results_module = _load_module('results')
+    try:
+        return results_module.decode_cursor(cursor, scope)
+    except results_module.CursorError as e:
+        raise click.BadParameter(str(e), param_hint='--cursor')
+
+
+def _write_page(ctx, scope: str, order: str, hits, fmt: str, limit: int, snippets: bool) -> None:
+    """Print up to `limit` (row, score) hits as they are produced, each with the cursor after it."""
+    results_module = _load_module('results')
+    storage = ctx.obj['storage']
+    # One extra hit is read to tell whether another page follows
+    hits = islice(hits, limit + 1) if limit else hits
+    last = {'cursor': None, 'more': False}
+    
+    def page():
+        for count, (row, score) in enumerate(hits):
+            if limit and count == limit:
+                last['more'] = True
+                return
+            last['cursor'] = results_module.encode_cursor(scope, order, results_module.position(order, row, score))
+            yield row, score, (storage.snippet(row) if snippets else None), last['cursor']
+    
+    if fmt != 'text':
+        results_module.write_records(
+            (results_module.to_record(row, score, snippet, cursor) for row, score, snippet, cursor in page()),
+            fmt, next_cursor=lambda: last['cursor'] if last['more'] else None
+        )
+        return
+    
+    shown = 0
+    for row, _, snippet, _ in page():
+        _display_entry_summary(row, snippet)
+        shown += 1
+    if not shown:
+        click.echo("No results found.")
+    elif last['more']:
+        click.echo(f"More results: --cursor {last['cursor']}")
+
+
 def show_config(config: Config):
     """Display current configuration."""
     click.echo("Scrapbook Configuration\n")
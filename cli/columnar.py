@@ -0,0 +1,370 @@
+"""
+Compact column-oriented copy of the entry index for in-memory scans.
+
+Each index row dict repeats its keys, stores a full ISO date string and a
+list of tag strings. Long-lived processes (`scrap serve`) keep the index in
+memory instead as parallel columns:
+
+- type, status and priority as one-byte enum codes (values outside the
+  enums, such as the Kanban board's "in-progress", are kept as strings
+  beside the code OTHER)
+- created dates as microseconds since the epoch (naive, as stored)
+- tags as IDs into a shared tag table, in one flat array with row offsets
+- categories as IDs into a shared category table
+- body byte offsets (snippets are not kept; they are read from the file)
+
+Rows are only turned back into dicts for the results a caller asks for.
+Updated rows are appended and the old row is tombstoned; the columns are
+compacted once tombstones make up a quarter of the rows.
+"""
+
+import heapq
+import operator
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import accumulate, compress, islice
+from typing import Dict, Iterable, Iterator, List, Optional
+try:
+    from .models import EntryType, Status, Priority
+except ImportError:
+    from models import EntryType, Status, Priority
+
+
+TYPE_VALUES = [t.value for t in EntryType]
+STATUS_VALUES = [s.value for s in Status]
+PRIORITY_VALUES = [p.value for p in Priority]
+
+TYPE_CODES = {value: code for code, value in enumerate(TYPE_VALUES)}
+STATUS_CODES = {value: code for code, value in enumerate(STATUS_VALUES)}
+PRIORITY_CODES = {value: code for code, value in enumerate(PRIORITY_VALUES)}
+
+# Code stored for a missing priority
+NO_PRIORITY = -1
+
+# Code stored for a type, status or priority outside its enum; the raw value
+# is kept per row in ColumnarIndex.other_values
+OTHER = 127
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def date_to_micros(value: str) -> int:
+    """Microseconds between the epoch and a naive ISO timestamp."""
+    delta = datetime.fromisoformat(value).replace(tzinfo=None) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def micros_to_date(value: int) -> str:
+    """Inverse of date_to_micros."""
+    return (EPOCH + timedelta(0, 0, value)).isoformat()
+
+
+class ColumnarIndex:
+    """Entry index held as typed columns, with row dicts built on demand."""
+
+    def __init__(self, rows: Iterable[Dict] = ()):
+        """Build the columns from index row dicts."""
+        self._reset()
+        for row in rows:
+            self._append(row, ordered=False)
+        self._build_order()
+
+    def _reset(self) -> None:
+        """Empty every column."""
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.file_paths: List[str] = []
+        self.types = array('b')
+        self.statuses = array('b')
+        self.priorities = array('b')
+        self.created = array('q')
+        self.tag_offsets = array('l', [0])
+        self.tag_ids = array('i')
+        self.alive = bytearray()
+        self.tag_names: List[str] = []
+        self.tag_lookup: Dict[str, int] = {}
+        self.categories = array('i')
+        self.body_starts = array('q')
+        self.body_ends = array('q')
+        self.category_names: List[str] = []
+        self.category_lookup: Dict[str, int] = {}
+        self.row_of: Dict[str, int] = {}
+        # (column, row) -> raw value, for the rows coded OTHER
+        self.other_values: Dict[tuple, str] = {}
+        self.dead = 0
+        self._title_text = None
+        self._title_starts = None
+        # Per type code: creation times in ascending order and the row at each
+        self._order = {code: (array('q'), array('l')) for code in self._type_codes()}
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    @staticmethod
+    def _type_codes() -> List[int]:
+        """Every type code, OTHER included."""
+        return list(range(len(TYPE_VALUES))) + [OTHER]
+
+    def _code(self, column: str, codes: Dict[str, int], value: str) -> int:
+        """Code of a value in a column of the row being appended, or OTHER (keeping the value)."""
+        code = codes.get(value)
+        if code is None:
+            self.other_values[column, len(self.ids) - 1] = value
+            return OTHER
+        return code
+
+    def _value(self, column: str, values: List[str], code: int, position: int) -> str:
+        """Inverse of _code for the row at a position."""
+        return self.other_values[column, position] if code == OTHER else values[code]
+
+    def _tag_id(self, tag: str) -> int:
+        """ID of a tag in the shared tag table, adding it if new."""
+        tag_id = self.tag_lookup.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tag_names)
+            self.tag_names.append(tag)
+            self.tag_lookup[tag] = tag_id
+        return tag_id
+
+    def _category_id(self, category: str) -> int:
+        """ID of a category in the shared category table, adding it if new."""
+        category_id = self.category_lookup.get(category)
+        if category_id is None:
+            category_id = len(self.category_names)
+            self.category_names.append(category)
+            self.category_lookup[category] = category_id
+        return category_id
+
+    def _append(self, row: Dict, ordered: bool = True) -> None:
+        """Append a row, tombstoning any earlier row with the same ID.
+
+        With `ordered`, the row is also inserted into its type's time order;
+        bulk loads skip that and sort once in _build_order().
+        """
+        previous = self.row_of.get(row['id'])
+        if previous is not None:
+            self.alive[previous] = 0
+            self.dead += 1
+
+        self.row_of[row['id']] = len(self.ids)
+        self.ids.append(row['id'])
+        self.titles.append(row['title'])
+        self._title_text = None
+        self.file_paths.append(row['file_path'])
+        self.types.append(self._code('type', TYPE_CODES, row['type']))
+        self.statuses.append(self._code('status', STATUS_CODES, row.get('status') or 'active'))
+        priority = row.get('priority')
+        self.priorities.append(self._code('priority', PRIORITY_CODES, priority) if priority else NO_PRIORITY)
+        try:
+            self.created.append(date_to_micros(row['created_date']))
+        except (TypeError, ValueError):
+            # Unparseable dates sort as oldest
+            self.created.append(0)
+        category = row.get('category')
+        self.categories.append(self._category_id(category) if category else -1)
+        self.body_starts.append(row.get('body_start', -1))
+        self.body_ends.append(row.get('body_end', -1))
+        self.tag_ids.extend(self._tag_id(tag) for tag in row.get('tags', []))
+        self.tag_offsets.append(len(self.tag_ids))
+        self.alive.append(1)
+
+        if ordered:
+            times, positions = self._order[self.types[-1]]
+            at = bisect_right(times, self.created[-1])
+            times.insert(at, self.created[-1])
+            positions.insert(at, len(self.ids) - 1)
+
+    def _build_order(self) -> None:
+        """Sort the live rows of each type by creation time."""
+        created = self.created
+        for code in self._type_codes():
+            positions = sorted(compress(range(len(self.alive)), self._mask_code(code)),
+                               key=created.__getitem__)
+            self._order[code] = (array('q', map(created.__getitem__, positions)), array('l', positions))
+
+    def upsert_many(self, rows: Iterable[Dict]) -> None:
+        """Apply inserted or replaced index rows."""
+        for row in rows:
+            self._append(row)
+        self._maybe_compact()
+
+    def delete_many(self, entry_ids: Iterable[str]) -> None:
+        """Apply removed index rows."""
+        for entry_id in entry_ids:
+            position = self.row_of.pop(entry_id, None)
+            if position is not None:
+                self.alive[position] = 0
+                self.dead += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Drop tombstoned rows once they make up a quarter of the columns."""
+        if self.dead and self.dead * 4 >= len(self.ids):
+            rows = [self.row(position) for position in self._live_rows()]
+            self._reset()
+            for row in rows:
+                self._append(row, ordered=False)
+            self._build_order()
+
+    def _live_rows(self) -> Iterable[int]:
+        """Positions of rows that have not been replaced or deleted."""
+        return compress(range(len(self.alive)), self.alive)
+
+    def tags_of(self, position: int) -> List[str]:
+        """Tag names of a row."""
+        names = self.tag_names
+        return [names[tag_id] for tag_id in
+                self.tag_ids[self.tag_offsets[position]:self.tag_offsets[position + 1]]]
+
+    def row(self, position: int) -> Dict:
+        """Rebuild the index row dict stored at a position."""
+        row = {
+            'id': self.ids[position],
+            'title': self.titles[position],
+            'type': self._value('type', TYPE_VALUES, self.types[position], position),
+            'file_path': self.file_paths[position],
+            'tags': self.tags_of(position),
+            'created_date': micros_to_date(self.created[position]),
+            'status': self._value('status', STATUS_VALUES, self.statuses[position], position)
+        }
+        if self.priorities[position] != NO_PRIORITY:
+            row['priority'] = self._value('priority', PRIORITY_VALUES, self.priorities[position], position)
+        if self.categories[position] >= 0:
+            row['category'] = self.category_names[self.categories[position]]
+        if self.body_starts[position] >= 0:
+            row['body_start'], row['body_end'] = self.body_starts[position], self.body_ends[position]
+        return row
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        """Index row for an ID, or None."""
+        position = self.row_of.get(entry_id)
+        return None if position is None else self.row(position)
+
+    def all(self) -> Dict[str, Dict]:
+        """Every live row keyed by ID."""
+        return {self.ids[position]: self.row(position) for position in self._live_rows()}
+
+    def _newest_first(self, positions: Iterable[int]) -> List[int]:
+        """Sort row positions by creation date, newest first."""
+        return sorted(positions, key=self.created.__getitem__, reverse=True)
+
+    # Scans below stay in C (compress/map/Counter/str.find) instead of
+    # looping over rows in Python.
+
+    def _mask(self, entry_type: Optional[EntryType] = None) -> Iterable[int]:
+        """Per-row flags: live and, if given, of the entry type."""
+        if entry_type is None:
+            return self.alive
+        return self._mask_code(TYPE_CODES[entry_type.value])
+
+    def _mask_code(self, code: int) -> Iterable[int]:
+        """Per-row flags: live and of the type code."""
+        return map(operator.and_, self.alive, map(code.__eq__, self.types))
+
+    def _time_range(self, code: int, since: Optional[int], until: Optional[int]) -> Iterator[int]:
+        """Live rows of a type created in [since, until), newest first."""
+        times, positions = self._order[code]
+        low = 0 if since is None else bisect_left(times, since)
+        high = len(times) if until is None else bisect_left(times, until)
+        alive = self.alive
+        for i in range(high - 1, low - 1, -1):
+            if alive[positions[i]]:
+                yield positions[i]
+
+    def _rows_with_tags(self, tag_ids: set) -> set:
+        """Positions of rows (live or not) carrying any of the tag IDs."""
+        offsets = self.tag_offsets
+        hits = compress(range(len(self.tag_ids)), map(tag_ids.__contains__, self.tag_ids))
+        return {bisect_right(offsets, i) - 1 for i in hits}
+
+    def _rows_matching_title(self, query_lower: str) -> set:
+        """Positions of rows (live or not) whose lowercased title contains the query."""
+        if self._title_text is None:
+            lowered = [title.lower() for title in self.titles]
+            self._title_text = '\n'.join(lowered)
+            self._title_starts = array('q', accumulate((len(t) + 1 for t in lowered), initial=0))
+
+        text, starts = self._title_text, self._title_starts
+        hits = set()
+        found = text.find(query_lower)
+        while found != -1:
+            position = bisect_right(starts, found) - 1
+            hits.add(position)
+            found = text.find(query_lower, starts[position + 1])
+        return hits
+
+    def _positions(self, entry_type: Optional[EntryType] = None,
+                   tags: Optional[List[str]] = None) -> List[int]:
+        """Live row positions matching a type and any of the given tags."""
+        positions = compress(range(len(self.alive)), self._mask(entry_type))
+        if tags:
+            wanted = {self.tag_lookup[tag] for tag in tags if tag in self.tag_lookup}
+            positions = filter(self._rows_with_tags(wanted).__contains__, positions)
+        return list(positions)
+
+    def list(self, entry_type: Optional[EntryType] = None, limit: int = 50,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        """Rows newest first, optionally filtered by type and a [since, until) date range.
+
+        Walks the per-type time orders from the newest matching row, so the
+        cost is a bisection plus the rows returned.
+        """
+        since_micros = date_to_micros(since) if since else None
+        until_micros = date_to_micros(until) if until else None
+        codes = [TYPE_CODES[entry_type.value]] if entry_type else self._type_codes()
+        newest = heapq.merge(*(self._time_range(code, since_micros, until_micros) for code in codes),
+                             key=self.created.__getitem__, reverse=True)
+        return [self.row(position) for position in islice(newest, limit)]
+
+    def search(self, query: str, entry_type: Optional[EntryType] = None,
+               tags: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Substring search over titles and tags; title matches first, then newest first.
+
+        Only the first `limit` results are turned into row dicts.
+        """
+        positions = self._positions(entry_type, tags)
+        query_lower = query.lower() if query else ""
+        if not query_lower:
+            return [self.row(position) for position in self._newest_first(positions)[:limit]]
+
+        title_rows = self._rows_matching_title(query_lower)
+        # Match each distinct tag once instead of once per row
+        matching_tags = {tag_id for tag_id, name in enumerate(self.tag_names) if query_lower in name.lower()}
+        tag_rows = self._rows_with_tags(matching_tags) - title_rows if matching_tags else set()
+
+        ordered = (self._newest_first(filter(title_rows.__contains__, positions)) +
+                   self._newest_first(filter(tag_rows.__contains__, positions)))
+        return [self.row(position) for position in ordered[:limit]]
+
+    def _counts(self, column: str, codes: array, values: List[str],
+                entry_type: Optional[EntryType] = None) -> Dict[str, int]:
+        """Number of live rows (of a type, if given) per value of a coded column, enum values first."""
+        counts = Counter(compress(codes, self._mask(entry_type)))
+        result = {value: counts[code] for code, value in enumerate(values)}
+        if counts[OTHER]:
+            type_code = TYPE_CODES[entry_type.value] if entry_type else None
+            for (other_column, position), value in self.other_values.items():
+                if (other_column == column and self.alive[position] and codes[position] == OTHER
+                        and type_code in (None, self.types[position])):
+                    result[value] = result.get(value, 0) + 1
+        return result
+
+    def type_counts(self) -> Dict[str, int]:
+        """Number of live entries per type value."""
+        return self._counts('type', self.types, TYPE_VALUES)
+
+    def status_counts(self, entry_type: Optional[EntryType] = None) -> Dict[str, int]:
+        """Number of live entries per status value, optionally for one type."""
+        return self._counts('status', self.statuses, STATUS_VALUES, entry_type)
+
+    def tag_counts(self) -> Dict[str, int]:
+        """Number of live entries per tag, most used first."""
+        counts = Counter(self.tag_ids)
+        offsets, tag_ids = self.tag_offsets, self.tag_ids
+        for position in compress(range(len(self.alive)), map(operator.not_, self.alive)):
+            counts.subtract(tag_ids[offsets[position]:offsets[position + 1]])
+        # Counter keeps first-seen order, so ties stay in index order
+        ranked = sorted((item for item in counts.items() if item[1] > 0), key=lambda x: x[1], reverse=True)
+        return {self.tag_names[tag_id]: count for tag_id, count in ranked}
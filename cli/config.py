@@ -2,10 +2,14 @@
 Configuration management for scrapbook CLI.
 """
 
+import json
 import os
-import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+try:
+    from .profiling import traced
+except ImportError:
+    from profiling import traced
 
 
 DEFAULT_CONFIG = {
@@ -15,10 +19,18 @@ DEFAULT_CONFIG = {
     'date_format': '%Y-%m-%d %H:%M:%S',
     'auto_tag_extraction': True,
     'backup_enabled': True,
-    'backup_count': 5
+    'backup_count': 5,
+    'index_backend': 'sqlite',
+    'fsync': 'never',
+    'batch_max_entries': 100,
+    'batch_max_delay_ms': 1000
 }
 
 
+# Resolved scrapbook roots, memoized per working directory for this process
+_root_cache: Dict[str, Optional[Path]] = {}
+
+
 class Config:
     """Configuration manager for scrapbook CLI."""
     
@@ -29,6 +41,7 @@ class Config:
         
         self.config_dir = config_dir
         self.config_file = config_dir / 'config.yaml'
+        self.roots_file = config_dir / 'roots.json'
         self.config = DEFAULT_CONFIG.copy()
         
         # Ensure config directory exists
@@ -37,18 +50,44 @@ class Config:
         # Load existing config
         self.load()
     
+    @traced('config.load')
     def load(self) -> None:
         """Load configuration from file."""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    user_config = yaml.safe_load(f) or {}
-                    self.config.update(user_config)
-            except Exception as e:
-                print(f"Warning: Could not load config file: {e}")
+        try:
+            stat = self.config_file.stat()
+        except FileNotFoundError:
+            return
+        
+        # Reuse the parsed config while config.yaml is unchanged, avoiding a YAML import
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        cache_file = self.config_dir / 'config.cache.json'
+        try:
+            with open(cache_file, 'r') as f:
+                cached = json.load(f)
+            if cached.get('stamp') == stamp:
+                self.config.update(cached['config'])
+                return
+        except Exception:
+            pass
+        
+        import yaml
+        try:
+            with open(self.config_file, 'r') as f:
+                user_config = yaml.safe_load(f) or {}
+                self.config.update(user_config)
+        except Exception as e:
+            print(f"Warning: Could not load config file: {e}")
+            return
+        
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump({'stamp': stamp, 'config': user_config}, f)
+        except Exception:
+            pass
     
     def save(self) -> None:
         """Save configuration to file."""
+        import yaml
         try:
             with open(self.config_file, 'w') as f:
                 yaml.dump(self.config, f, default_flow_style=False)
@@ -76,7 +115,43 @@ class Config:
                 data_dir = Path.cwd() / data_dir
         return data_dir
     
+    @traced('config.find_root')
     def _find_scrapbook_root(self) -> Path:
+        """Find scrapbook-md root directory, using the per-cwd cache when valid."""
+        cwd = str(Path.cwd())
+        if cwd in _root_cache:
+            return _root_cache[cwd]
+        
+        roots = self._load_roots()
+        cached = roots.get(cwd)
+        if cached and (Path(cached) / 'cli' / 'cli.py').exists():
+            root = Path(cached)
+        else:
+            root = self._search_scrapbook_root()
+            if root is not None:
+                roots[cwd] = str(root)
+                self._save_roots(roots)
+        
+        _root_cache[cwd] = root
+        return root
+    
+    def _load_roots(self) -> Dict[str, str]:
+        """Load the cwd -> scrapbook root cache."""
+        try:
+            with open(self.roots_file, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def _save_roots(self, roots: Dict[str, str]) -> None:
+        """Save the cwd -> scrapbook root cache (best effort)."""
+        try:
+            with open(self.roots_file, 'w') as f:
+                json.dump(roots, f, indent=2)
+        except Exception:
+            pass
+    
+    def _search_scrapbook_root(self) -> Path:
         """Find scrapbook-md root directory by searching upwards."""
         current = Path.cwd()
         
@@ -87,12 +162,12 @@ class Config:
         # Search upwards for scrapbook-md directory
         for parent in current.parents:
             scrapbook_dir = parent / 'scrapbook-md'
-            if scrapbook_dir.exists() and (scrapbook_dir / 'cli' / 'cli.py').exists():
+            if (scrapbook_dir / 'cli' / 'cli.py').exists():
                 return scrapbook_dir
                 
         # Also check if scrapbook-md is a sibling directory
-        for sibling in current.parent.iterdir():
-            if sibling.is_dir() and sibling.name == 'scrapbook-md' and (sibling / 'cli' / 'cli.py').exists():
-                return sibling
+        sibling = current.parent / 'scrapbook-md'
+        if (sibling / 'cli' / 'cli.py').exists():
+            return sibling
                 
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,309 @@
+"""
+Long-running `scrap serve` daemon and the thin client that forwards to it.
+
+The daemon keeps one AppContext (config, storage, search engine and their
+open index connections) alive and runs CLI commands against it. Clients send
+one JSON request per connection over a Unix domain socket, and the daemon
+streams the command's output back as JSON lines while it runs:
+
+    {"argv": [...], "cwd": "..."}  ->  {"stdout": "..."}
+                                       {"stderr": "..."}
+                                       ...
+                                       {"exit_code": 0}
+
+The socket lives in the scrapbook's .scrap directory, or, when that path is
+too long for a socket, in a private per-user directory. Clients only
+connect to a socket owned by the same user.
+
+The client side only imports the standard library and `config`, so a
+forwarded command never pays for click or the storage modules.
+"""
+
+import hashlib
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+try:
+    from .config import Config
+except ImportError:
+    from config import Config
+
+
+# Long-running commands that must always run in the calling process
+LOCAL_COMMANDS = {'serve', 'watch'}
+
+# Unix socket paths are limited to ~108 bytes on Linux
+MAX_SOCKET_PATH = 100
+
+# Output is sent to the client once this much is buffered, or this long after
+# the last send, so streamed results arrive promptly without a send per line
+STREAM_CHUNK = 65536
+STREAM_INTERVAL = 0.05
+
+
+def _runtime_dir() -> Path:
+    """Per-user directory for sockets whose scrapbook path is too long."""
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime and os.path.isabs(runtime):
+        return Path(runtime) / 'scrap'
+    return Path(tempfile.gettempdir()) / f"scrap-{os.getuid()}"
+
+
+def socket_path(config: Config) -> Path:
+    """Socket path for the scrapbook the config points at."""
+    path = config.get_data_dir().resolve() / '.scrap' / 'daemon.sock'
+    if len(str(path)) > MAX_SOCKET_PATH:
+        digest = hashlib.sha1(str(path).encode()).hexdigest()[:16]
+        path = _runtime_dir() / f"{digest}.sock"
+    return path
+
+
+def _owned(path: Path, kind: int) -> bool:
+    """Whether `path` is (not a symlink to) a file of `kind` owned by the current user."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_IFMT(st.st_mode) == kind and st.st_uid == os.getuid()
+
+
+def _trusted_socket(path: Path) -> bool:
+    """Whether a socket and its directory belong to the current user and others cannot replace it."""
+    if not _owned(path, stat.S_IFSOCK) or not _owned(path.parent, stat.S_IFDIR):
+        return False
+    # In a world-writable directory the socket could be swapped for someone else's
+    return not os.lstat(path.parent).st_mode & stat.S_IWOTH
+
+
+def prepare_socket_dir(path: Path) -> None:
+    """Create the socket's directory (private if it is the shared fallback) and check it is safe.
+
+    Raises PermissionError if the directory belongs to someone else or is world-writable.
+    """
+    directory = path.parent
+    if directory == _runtime_dir():
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    else:
+        directory.mkdir(parents=True, exist_ok=True)
+    if not _owned(directory, stat.S_IFDIR) or os.lstat(directory).st_mode & stat.S_IWOTH:
+        raise PermissionError(f"{directory} must be a directory owned by you and not world-writable")
+
+
+def _recv_all(conn: socket.socket) -> bytes:
+    """Read from a socket until the peer shuts down its write side."""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def stream_request(path: Path, argv: List[str]) -> Iterator[dict]:
+    """Send one command to the daemon listening on `path` and yield its output messages as they arrive."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(str(path))
+        conn.sendall(json.dumps({'argv': argv, 'cwd': os.getcwd()}).encode('utf-8'))
+        conn.shutdown(socket.SHUT_WR)
+        with conn.makefile('rb') as lines:
+            for line in lines:
+                yield json.loads(line)
+
+
+def send_request(path: Path, argv: List[str]) -> dict:
+    """Send one command to the daemon and return its whole response.
+
+    The result has the "stdout" and "stderr" text and the "exit_code".
+    """
+    response = {'stdout': '', 'stderr': '', 'exit_code': None}
+    for message in stream_request(path, argv):
+        for key in ('stdout', 'stderr'):
+            response[key] += message.get(key, '')
+        if 'exit_code' in message:
+            response['exit_code'] = message['exit_code']
+    return response
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """Run a command through the daemon; returns None when no daemon is reachable."""
+    if not hasattr(socket, 'AF_UNIX') or os.environ.get('SCRAP_NO_DAEMON'):
+        return None
+    if argv and argv[0] in LOCAL_COMMANDS:
+        return None
+
+    path = socket_path(Config())
+    if not _trusted_socket(path):
+        return None
+
+    started = False
+    try:
+        for message in stream_request(path, argv):
+            started = True
+            try:
+                if 'stdout' in message:
+                    sys.stdout.write(message['stdout'])
+                    sys.stdout.flush()
+                if 'stderr' in message:
+                    sys.stderr.write(message['stderr'])
+            except BrokenPipeError:
+                # Our reader went away (e.g. piped into head); closing the
+                # connection stops the command in the daemon
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                return 1
+            if 'exit_code' in message:
+                return message['exit_code']
+    except (OSError, ValueError):
+        if not started:
+            # Stale socket or daemon went away: fall back to in-process execution
+            return None
+    # The command ran (at least in part), so it must not be run again here
+    print("Error: Lost the connection to `scrap serve` before the command finished", file=sys.stderr)
+    return 1
+
+
+class _Client:
+    """Connection to the client a request came from, shared by its output streams."""
+
+    def __init__(self, conn: socket.socket):
+        self.conn = conn
+        self.gone = False
+
+    def send(self, message: dict) -> None:
+        """Send one JSON-line message; raises BrokenPipeError the first time the client is found gone."""
+        if self.gone:
+            return
+        try:
+            self.conn.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        except OSError:
+            # The client stopped reading (e.g. piped into head): stop the
+            # command once, then drop whatever it still writes
+            self.gone = True
+            raise BrokenPipeError("scrap client disconnected")
+
+
+class _SocketStream(io.TextIOBase):
+    """Text stream that sends what is written to the client as JSON lines, in chunks.
+
+    click.echo flushes after every line, so flush() only sends once a chunk
+    is full or STREAM_INTERVAL has passed; drain() sends the rest.
+    """
+
+    def __init__(self, client: _Client, name: str):
+        self.client = client
+        self.name = name
+        self._buffer: List[str] = []
+        self._size = 0
+        # The first write is sent straight away
+        self._sent_at = 0.0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text) -> int:
+        # click.echo writes bytes to streams without a binary buffer
+        if isinstance(text, (bytes, bytearray)):
+            text = text.decode('utf-8', 'replace')
+        self._buffer.append(text)
+        self._size += len(text)
+        self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._size >= STREAM_CHUNK or time.monotonic() - self._sent_at >= STREAM_INTERVAL:
+            self.drain()
+
+    def drain(self) -> None:
+        """Send everything buffered."""
+        if not self._buffer:
+            return
+        text = ''.join(self._buffer)
+        self._buffer, self._size = [], 0
+        self._sent_at = time.monotonic()
+        self.client.send({self.name: text})
+
+
+def execute(command, obj, argv: List[str], stdout: Optional[io.TextIOBase] = None,
+            stderr: Optional[io.TextIOBase] = None) -> dict:
+    """Run a click command in-process against a shared context.
+
+    Output goes to the given streams, or is captured and returned as
+    "stdout" and "stderr" with the "exit_code".
+    """
+    import contextlib
+    import traceback
+    import click
+
+    captured = stdout is None
+    if captured:
+        stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            command.main(args=argv, obj=obj, prog_name='scrap', standalone_mode=False)
+            exit_code = 0
+        except click.exceptions.Exit as e:
+            exit_code = e.exit_code
+        except click.ClickException as e:
+            e.show()
+            exit_code = e.exit_code
+        except click.exceptions.Abort:
+            print("Aborted!", file=sys.stderr)
+            exit_code = 1
+        except Exception:
+            traceback.print_exc()
+            exit_code = 1
+    if captured:
+        return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(), 'exit_code': exit_code}
+    return {'exit_code': exit_code}
+
+
+def serve(command, obj, path: Path) -> None:
+    """Serve requests on a Unix socket until interrupted.
+
+    Requests are handled one at a time, which keeps the shared storage
+    connections and stdout capture single-threaded.
+    """
+    import signal
+    import socketserver
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            request = json.loads(_recv_all(self.request).decode('utf-8'))
+            client = _Client(self.request)
+            stdout = _SocketStream(client, 'stdout')
+            stderr = _SocketStream(client, 'stderr')
+            previous_cwd = os.getcwd()
+            try:
+                os.chdir(request.get('cwd') or previous_cwd)
+                response = execute(command, obj, request.get('argv', []), stdout, stderr)
+            finally:
+                os.chdir(previous_cwd)
+            try:
+                stdout.drain()
+                stderr.drain()
+                client.send(response)
+            except OSError:
+                pass
+
+    prepare_socket_dir(path)
+    if path.is_socket() and _owned(path, stat.S_IFSOCK):
+        path.unlink()
+
+    server = socketserver.UnixStreamServer(str(path), Handler)
+    os.chmod(path, 0o600)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if path.exists():
+            path.unlink()
@@ -0,0 +1,249 @@
+"""
+Frontmatter codec: YAML for entry frontmatter without going through PyYAML.
+
+Entry frontmatter is a flat mapping of strings, nulls and lists of strings
+(ScrapEntry.to_dict). The emitter writes those directly, reproducing what
+yaml.dump(data, default_flow_style=False) writes byte for byte: sorted
+keys, plain scalars where PyYAML would use them, single quotes where a
+string would otherwise read back as another type or contains an indicator,
+and PyYAML's folding of long scalars at 80 columns.
+
+The parser reads the same subset back. Anything outside it (non-ASCII or
+control characters when emitting; double quotes, comments, nested
+mappings, non-string scalars or other hand-edited YAML when parsing) is
+handed to PyYAML: emitted with its default pure-Python Dumper, as
+save_entry always has (libyaml folds long double-quoted scalars
+differently), and parsed with the libyaml-based CSafeLoader when available.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# Scalars PyYAML resolves to something other than a string when unquoted
+# (the implicit resolvers of yaml.resolver.Resolver)
+IMPLICIT = re.compile(r'''^(?:
+    yes|Yes|YES|no|No|NO|true|True|TRUE|false|False|FALSE|on|On|ON|off|Off|OFF
+    |[-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+][0-9]+)?
+    |\.[0-9][0-9_]*(?:[eE][-+][0-9]+)?
+    |[-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\.[0-9_]*
+    |[-+]?\.(?:inf|Inf|INF)
+    |\.(?:nan|NaN|NAN)
+    |[-+]?0b[0-1_]+
+    |[-+]?0[0-7_]+
+    |[-+]?(?:0|[1-9][0-9_]*)
+    |[-+]?0x[0-9a-fA-F_]+
+    |[-+]?[1-9][0-9_]*(?::[0-5]?[0-9])+
+    |<<
+    |~|null|Null|NULL|
+    |[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]
+    |[0-9][0-9][0-9][0-9]-[0-9][0-9]?-[0-9][0-9]?
+     (?:[Tt]|[\ \t]+)[0-9][0-9]?
+     :[0-9][0-9]:[0-9][0-9](?:\.[0-9]*)?
+     (?:[\ \t]*(?:Z|[-+][0-9][0-9]?(?::[0-9][0-9])?))?
+    |=
+    )$''', re.X)
+
+# Printable ASCII: the only characters the emitter writes itself
+EMITTABLE = re.compile(r'[\x20-\x7e]*\Z')
+
+KEY = re.compile(r'[A-Za-z_][A-Za-z0-9_-]*\Z')
+
+KEY_LINE = re.compile(r'([A-Za-z_][A-Za-z0-9_-]*):(?: (.*))?\Z')
+
+# PyYAML's preferred line width and the indent of folded continuation lines
+BEST_WIDTH = 80
+INDENT = 2
+
+NULL_VALUES = ('null', 'Null', 'NULL', '~')
+
+_yaml = None
+
+
+def _pyyaml():
+    """The yaml module, imported on first fallback."""
+    global _yaml
+    if _yaml is None:
+        import yaml
+        _yaml = yaml
+    return _yaml
+
+
+def _allows_plain(text: str) -> bool:
+    """Whether PyYAML's emitter writes `text` (printable ASCII, non-empty) as a block plain scalar."""
+    if text[0] == ' ' or text[-1] == ' ' or text.startswith(('---', '...')):
+        return False
+    first = text[0]
+    if first in '#,[]{}&*!|>\'"%@`':
+        return False
+    if first in '?:-' and (len(text) == 1 or text[1] == ' '):
+        return False
+    return ': ' not in text and not text.endswith(':') and ' #' not in text and not IMPLICIT.match(text)
+
+
+def _fold_plain(text: str, column: int) -> str:
+    """A plain scalar as PyYAML writes it from `column`, breaking lines at single spaces past the width."""
+    out = []
+    spaces = False
+    start = end = 0
+    while end <= len(text):
+        ch = text[end] if end < len(text) else None
+        if spaces:
+            if ch != ' ':
+                if start + 1 == end and column > BEST_WIDTH:
+                    out.append('\n' + ' ' * INDENT)
+                    column = INDENT
+                else:
+                    out.append(text[start:end])
+                    column += end - start
+                start = end
+        elif ch is None or ch == ' ':
+            out.append(text[start:end])
+            column += end - start
+            start = end
+        if ch is not None:
+            spaces = ch == ' '
+        end += 1
+    return ''.join(out)
+
+
+def _fold_single_quoted(text: str, column: int) -> str:
+    """A single-quoted scalar as PyYAML writes it, with `column` just past the opening quote."""
+    out = ["'"]
+    spaces = False
+    start = end = 0
+    while end <= len(text):
+        ch = text[end] if end < len(text) else None
+        if spaces:
+            if ch is None or ch != ' ':
+                if start + 1 == end and column > BEST_WIDTH and start != 0 and end != len(text):
+                    out.append('\n' + ' ' * INDENT)
+                    column = INDENT
+                else:
+                    out.append(text[start:end])
+                    column += end - start
+                start = end
+        elif ch is None or ch == ' ' or ch == "'":
+            if start < end:
+                out.append(text[start:end])
+                column += end - start
+                start = end
+        if ch == "'":
+            out.append("''")
+            column += 2
+            start = end + 1
+        if ch is not None:
+            spaces = ch == ' '
+        end += 1
+    out.append("'")
+    return ''.join(out)
+
+
+def _scalar(value, column: int) -> Optional[str]:
+    """YAML for a scalar written from `column` (after "key: " or "- "), or None if PyYAML must write it."""
+    if value is None:
+        return 'null'
+    if not isinstance(value, str) or not EMITTABLE.match(value):
+        return None
+    if value and _allows_plain(value):
+        return _fold_plain(value, column)
+    return _fold_single_quoted(value, column + 1)
+
+
+def _dump_key(key: str, value) -> Optional[str]:
+    """YAML for one top-level key, or None if PyYAML must write it."""
+    if not KEY.match(key) or IMPLICIT.match(key):
+        return None
+    if isinstance(value, list):
+        if not value:
+            return f"{key}: []\n"
+        items = [_scalar(item, INDENT) for item in value]
+        if None in items:
+            return None
+        return f"{key}:\n" + ''.join(f"- {item}\n" for item in items)
+    scalar = _scalar(value, len(key) + 2)
+    return None if scalar is None else f"{key}: {scalar}\n"
+
+
+def _yaml_dump(data: Dict) -> str:
+    return _pyyaml().dump(data, default_flow_style=False)
+
+
+def dump_frontmatter(data: Dict) -> str:
+    """YAML for a frontmatter mapping, identical to yaml.dump(data, default_flow_style=False)."""
+    if not data:
+        return _yaml_dump(data)
+    parts = []
+    for key in sorted(data):
+        if not isinstance(key, str):
+            return _yaml_dump(data)
+        part = _dump_key(key, data[key])
+        parts.append(part if part is not None else _yaml_dump({key: data[key]}))
+    return ''.join(parts)
+
+
+def _parse_scalar(lines: List[str]) -> Tuple[bool, object]:
+    """Value of a scalar spread over `lines` (continuation lines stripped); (False, None) if unsupported."""
+    if any(not line or '\t' in line for line in lines):
+        return False, None
+    text = ' '.join(lines)
+    if text[0] == "'":
+        inner = text[1:-1]
+        if len(text) < 2 or text[-1] != "'" or "'" in inner.replace("''", ''):
+            return False, None
+        return True, inner.replace("''", "'")
+    if len(lines) == 1 and text in NULL_VALUES:
+        return True, None
+    if not text.isprintable() or not _allows_plain(text):
+        return False, None
+    return True, text
+
+
+def load_frontmatter(block: str) -> Dict:
+    """Mapping in a frontmatter block (the text between the --- lines), as yaml.safe_load reads it."""
+    data = {}
+    lines = block.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    i = 0
+    while i < len(lines):
+        match = KEY_LINE.match(lines[i])
+        if not match or IMPLICIT.match(match.group(1)):
+            return _yaml_load(block)
+        key, rest = match.groups()
+        i += 1
+        if rest == '[]':
+            data[key] = []
+            continue
+        if rest is not None:
+            value_lines = [rest.rstrip(' ')]
+            while i < len(lines) and lines[i].startswith(' '):
+                value_lines.append(lines[i].strip(' '))
+                i += 1
+            ok, value = _parse_scalar(value_lines)
+            if not ok:
+                return _yaml_load(block)
+            data[key] = value
+            continue
+        items = []
+        while i < len(lines) and lines[i].startswith('- '):
+            item_lines = [lines[i][2:].rstrip(' ')]
+            i += 1
+            while i < len(lines) and lines[i].startswith('  '):
+                item_lines.append(lines[i].strip(' '))
+                i += 1
+            ok, value = _parse_scalar(item_lines)
+            if not ok:
+                return _yaml_load(block)
+            items.append(value)
+        if i < len(lines) and lines[i].startswith(' '):
+            # A nested mapping or other indented content
+            return _yaml_load(block)
+        data[key] = items if items else None
+    return data
+
+
+def _yaml_load(block: str) -> Dict:
+    yaml = _pyyaml()
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return yaml.load(block, Loader=loader) or {}
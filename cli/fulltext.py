@@ -0,0 +1,278 @@
+"""
+Persistent full-text index for scrapbook entries.
+"""
+
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+try:
+    from .db import connect, transaction
+except ImportError:
+    from db import connect, transaction
+
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Term frequency multipliers per indexed field
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'tags': 2.0,
+    'category': 1.0,
+    'context': 1.0,
+    'content': 1.0
+}
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Postings read per term for top-k queries (champion lists)
+CHAMPION_LIST_SIZE = 300
+
+# Bump when the table layout changes; older databases are rebuilt
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    entry_id TEXT PRIMARY KEY,
+    length REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    tf REAL NOT NULL,
+    length REAL NOT NULL,
+    impact REAL NOT NULL,
+    PRIMARY KEY (term, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_entry ON postings (entry_id);
+CREATE INDEX IF NOT EXISTS postings_impact ON postings (term, impact DESC, entry_id, tf, length);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def bm25_term_score(tf: float, length: float, avg_length: float) -> float:
+    """BM25 term-frequency component (everything but idf)."""
+    return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+
+
+class FullTextIndex:
+    """Inverted index of entry terms stored in SQLite, ranked with BM25."""
+
+    def __init__(self, db_path: Path):
+        """Open (or create) the index database."""
+        self.db_path = db_path
+        self.is_new = not db_path.exists()
+        self.conn = connect(db_path)
+
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Index layout changed: drop the old tables and let the caller backfill
+            for table in ('postings', 'terms', 'docs', 'meta'):
+                self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self.is_new = True
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def _get_meta(self, key: str) -> float:
+        """Read a numeric value from the meta table."""
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0.0
+
+    def _add_meta(self, key: str, delta: float) -> None:
+        """Apply a delta to a numeric value in the meta table."""
+        self.conn.execute(
+            'INSERT INTO meta (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = value + excluded.value',
+            (key, delta)
+        )
+
+    def _term_frequencies(self, fields: Dict[str, object]) -> Counter:
+        """Compute weighted term frequencies across entry fields."""
+        frequencies = Counter()
+        for field, value in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            if isinstance(value, (list, tuple)):
+                value = ' '.join(value)
+            for term in tokenize(value or ''):
+                frequencies[term] += weight
+        return frequencies
+
+    def _remove(self, entry_id: str) -> None:
+        """Remove postings for an entry without committing."""
+        row = self.conn.execute('SELECT length FROM docs WHERE entry_id = ?', (entry_id,)).fetchone()
+        if row is None:
+            return
+        self.conn.execute(
+            'UPDATE terms SET df = df - 1 WHERE term IN (SELECT term FROM postings WHERE entry_id = ?)',
+            (entry_id,)
+        )
+        self.conn.execute('DELETE FROM postings WHERE entry_id = ?', (entry_id,))
+        self.conn.execute('DELETE FROM docs WHERE entry_id = ?', (entry_id,))
+        self._add_meta('doc_count', -1)
+        self._add_meta('total_length', -row[0])
+
+    def _add(self, entry_id: str, fields: Dict[str, object]) -> None:
+        """Replace postings for an entry without committing."""
+        frequencies = self._term_frequencies(fields)
+        # Re-indexing unchanged text (e.g. a status change) leaves the postings alone
+        current = self.conn.execute('SELECT term, tf FROM postings WHERE entry_id = ?', (entry_id,)).fetchall()
+        if current and dict(current) == frequencies:
+            return
+        self._remove(entry_id)
+        length = sum(frequencies.values())
+
+        # Impacts use the corpus average length at indexing time; they only
+        # order champion lists; final scores are computed exactly at query time.
+        doc_count = self._get_meta('doc_count')
+        avg_length = ((self._get_meta('total_length') + length) / (doc_count + 1)) or 1.0
+
+        self.conn.execute('INSERT INTO docs (entry_id, length) VALUES (?, ?)', (entry_id, length))
+        self.conn.executemany(
+            'INSERT INTO postings (term, entry_id, tf, length, impact) VALUES (?, ?, ?, ?, ?)',
+            ((term, entry_id, tf, length, bm25_term_score(tf, length, avg_length))
+             for term, tf in frequencies.items())
+        )
+        self.conn.executemany(
+            'INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1',
+            ((term,) for term in frequencies)
+        )
+        self._add_meta('doc_count', 1)
+        self._add_meta('total_length', length)
+
+    def add(self, entry_id: str, fields: Dict[str, object]) -> None:
+        """Index (or re-index) a single entry."""
+        with transaction(self.conn):
+            self._add(entry_id, fields)
+
+    def add_many(self, documents: Iterable[Tuple[str, Dict[str, object]]]) -> None:
+        """Index several entries in one transaction."""
+        with transaction(self.conn):
+            for entry_id, fields in documents:
+                self._add(entry_id, fields)
+
+    def remove(self, entry_id: str) -> None:
+        """Remove an entry from the index."""
+        self.remove_many([entry_id])
+
+    def remove_many(self, entry_ids: Iterable[str]) -> None:
+        """Remove several entries in one transaction."""
+        with transaction(self.conn):
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+
+    def _prefix_terms(self, token: str) -> List[Tuple[str, int]]:
+        """Indexed (term, df) pairs that a query token is a prefix of."""
+        return self.conn.execute(
+            'SELECT term, df FROM terms WHERE term >= ? AND term < ? AND df > 0',
+            (token, token + '\U0010ffff')
+        ).fetchall()
+
+    def estimate(self, query: str) -> int:
+        """Upper bound on the number of entries containing every query token."""
+        doc_count = int(self._get_meta('doc_count'))
+        tokens = set(tokenize(query))
+        if not tokens:
+            return doc_count
+        return min(min(doc_count, sum(df for _, df in self._prefix_terms(token))) for token in tokens)
+
+    def match_all(self, query: str) -> Dict[str, float]:
+        """BM25 scores of every entry containing all query tokens (as prefixes).
+
+        Unlike search(), no champion lists are used: every posting of the
+        matching terms is read, rarest token first, and later tokens only
+        keep entries the earlier ones matched.
+        """
+        doc_count = self._get_meta('doc_count')
+        tokens = set(tokenize(query))
+        if not tokens or doc_count <= 0:
+            return {}
+        avg_length = (self._get_meta('total_length') / doc_count) or 1.0
+
+        expanded = sorted((self._prefix_terms(token) for token in tokens),
+                          key=lambda terms: sum(df for _, df in terms))
+        scores: Optional[Dict[str, float]] = None
+        for terms in expanded:
+            token_scores: Dict[str, float] = {}
+            for term, df in terms:
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for entry_id, tf, length in self.conn.execute(
+                    'SELECT entry_id, tf, length FROM postings WHERE term = ?', (term,)
+                ):
+                    if scores is None or entry_id in scores:
+                        token_scores[entry_id] = (token_scores.get(entry_id, 0.0) +
+                                                  idf * bm25_term_score(tf, length, avg_length))
+            if scores is not None:
+                for entry_id, score in token_scores.items():
+                    token_scores[entry_id] = score + scores[entry_id]
+            scores = token_scores
+            if not scores:
+                break
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> Tuple[List[Tuple[str, float]], bool]:
+        """Return ((entry_id, score) pairs ranked by BM25, truncated flag).
+
+        Each query token also matches indexed terms it is a prefix of, so
+        "dev" still finds "development" as the old substring search did.
+
+        With a `limit`, only the highest-impact postings of each term are read
+        (champion lists), so frequent terms cost a bounded amount of work. The
+        flag is True when any term had more postings than were read, in which
+        case callers needing deeper results can search again without a limit.
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return [], False
+
+        doc_count = self._get_meta('doc_count')
+        if doc_count <= 0:
+            return [], False
+        avg_length = (self._get_meta('total_length') / doc_count) or 1.0
+        per_term = max(CHAMPION_LIST_SIZE, limit * 4) if limit else None
+
+        scores: Dict[str, float] = {}
+        truncated = False
+        for token in tokens:
+            matching = self._prefix_terms(token)
+
+            for term, df in matching:
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                # Prefix expansions share one champion budget across their terms
+                budget = per_term if term == token else per_term and max(limit, per_term // len(matching))
+                if budget is not None and df > budget:
+                    truncated = True
+                    postings = self.conn.execute(
+                        'SELECT entry_id, tf, length FROM postings INDEXED BY postings_impact '
+                        'WHERE term = ? ORDER BY impact DESC LIMIT ?', (term, budget)
+                    )
+                else:
+                    postings = self.conn.execute(
+                        'SELECT entry_id, tf, length FROM postings WHERE term = ?', (term,)
+                    )
+                for entry_id, tf, length in postings:
+                    scores[entry_id] = scores.get(entry_id, 0.0) + idf * bm25_term_score(tf, length, avg_length)
+
+        # Ties are broken by ID so result order (and paging through it) is stable
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return ranked, truncated
@@ -0,0 +1,210 @@
+"""
+Typo-tolerant title and tag search over a character-trigram index.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+try:
+    from .db import connect, transaction
+    from .fulltext import tokenize
+except ImportError:
+    from db import connect, transaction
+    from fulltext import tokenize
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (
+    word_id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE,
+    grams INTEGER NOT NULL,
+    df INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS word_grams (
+    gram TEXT NOT NULL,
+    word_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, word_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS entry_words (
+    word_id INTEGER NOT NULL,
+    entry_id TEXT NOT NULL,
+    PRIMARY KEY (word_id, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_words_entry ON entry_words (entry_id);
+"""
+
+# Query words shorter than this only match exactly
+MIN_FUZZY_LENGTH = 3
+
+# Vocabulary words re-ranked per query word, best trigram overlap first
+CANDIDATES_PER_WORD = 50
+
+# Minimum similarity (0..1) for a vocabulary word to count as a match
+MIN_SIMILARITY = 0.75
+
+
+def trigrams(word: str) -> Set[str]:
+    """Character trigrams of a word padded with boundary markers."""
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance (insertions, deletions, substitutions)."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity (0..1), favouring a shared prefix."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    window = max(len(a), len(b)) // 2 - 1
+    matched_b = [False] * len(b)
+    matches_a = []
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_b[j] = True
+                matches_a.append(char)
+                break
+    if not matches_a:
+        return 0.0
+
+    matches_b = [char for char, matched in zip(b, matched_b) if matched]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    m = len(matches_a)
+    jaro = (m / len(a) + m / len(b) + (m - transpositions) / m) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def similarity(query: str, word: str) -> float:
+    """Blend of Jaro-Winkler and normalized edit distance."""
+    edit = 1 - levenshtein(query, word) / max(len(query), len(word))
+    return (jaro_winkler(query, word) + edit) / 2
+
+
+class FuzzyIndex:
+    """Trigram index over the distinct words of entry titles and tags.
+
+    Candidates are found through the trigram postings of the vocabulary,
+    whose size grows far slower than the number of entries, and only the
+    best-overlapping few words per query word are re-ranked by edit
+    distance. Matching words are then mapped back to entries.
+    """
+
+    def __init__(self, db_path: Path):
+        """Open (or create) the trigram index database."""
+        self.db_path = db_path
+        self.is_new = not db_path.exists()
+        self.conn = connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def _words(self, title: str, tags: List[str]) -> Set[str]:
+        """Distinct words of a title and its tags."""
+        return set(tokenize(title)) | set(tokenize(' '.join(tags)))
+
+    def _word_id(self, word: str) -> int:
+        """ID of a vocabulary word, adding it and its trigrams if new (inside a transaction)."""
+        row = self.conn.execute('SELECT word_id FROM words WHERE word = ?', (word,)).fetchone()
+        if row:
+            return row[0]
+        grams = trigrams(word)
+        word_id = self.conn.execute(
+            'INSERT INTO words (word, grams, df) VALUES (?, ?, 0)', (word, len(grams))
+        ).lastrowid
+        self.conn.executemany('INSERT INTO word_grams (gram, word_id) VALUES (?, ?)',
+                              ((gram, word_id) for gram in grams))
+        return word_id
+
+    def _remove(self, entry_id: str) -> None:
+        """Drop an entry's words, pruning words no entry uses any more (inside a transaction)."""
+        word_ids = [row[0] for row in self.conn.execute(
+            'SELECT word_id FROM entry_words INDEXED BY entry_words_entry WHERE entry_id = ?', (entry_id,)
+        )]
+        if not word_ids:
+            return
+        self.conn.execute('DELETE FROM entry_words WHERE entry_id = ?', (entry_id,))
+        self.conn.executemany('UPDATE words SET df = df - 1 WHERE word_id = ?', ((w,) for w in word_ids))
+
+        for word_id in word_ids:
+            row = self.conn.execute('SELECT word FROM words WHERE word_id = ? AND df <= 0', (word_id,)).fetchone()
+            if row:
+                self.conn.executemany('DELETE FROM word_grams WHERE gram = ? AND word_id = ?',
+                                      ((gram, word_id) for gram in trigrams(row[0])))
+                self.conn.execute('DELETE FROM words WHERE word_id = ?', (word_id,))
+
+    def update_many(self, items: Iterable[Tuple[str, str, List[str]]]) -> None:
+        """Index several entries, given as (entry_id, title, tags)."""
+        with transaction(self.conn):
+            for entry_id, title, tags in items:
+                self._remove(entry_id)
+                word_ids = [self._word_id(word) for word in self._words(title, tags)]
+                self.conn.executemany('INSERT INTO entry_words (word_id, entry_id) VALUES (?, ?)',
+                                      ((w, entry_id) for w in word_ids))
+                self.conn.executemany('UPDATE words SET df = df + 1 WHERE word_id = ?',
+                                      ((w,) for w in word_ids))
+
+    def remove_many(self, entry_ids: Iterable[str]) -> None:
+        """Remove several entries."""
+        with transaction(self.conn):
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+
+    def similar_words(self, query_word: str) -> List[Tuple[int, str, float]]:
+        """Vocabulary words close to a query word as (word_id, word, similarity)."""
+        if len(query_word) < MIN_FUZZY_LENGTH:
+            row = self.conn.execute('SELECT word_id FROM words WHERE word = ?', (query_word,)).fetchone()
+            return [(row[0], query_word, 1.0)] if row else []
+
+        grams = sorted(trigrams(query_word))
+        placeholders = ','.join('?' * len(grams))
+        # Dice coefficient of the trigram sets picks the candidates to re-rank
+        candidates = self.conn.execute(
+            f'SELECT w.word_id, w.word FROM word_grams g JOIN words w ON w.word_id = g.word_id '
+            f'WHERE g.gram IN ({placeholders}) GROUP BY g.word_id '
+            f'ORDER BY COUNT(*) * 2.0 / (? + w.grams) DESC LIMIT ?',
+            grams + [len(grams), CANDIDATES_PER_WORD]
+        ).fetchall()
+
+        scored = [(word_id, word, similarity(query_word, word)) for word_id, word in candidates]
+        return sorted((item for item in scored if item[2] >= MIN_SIMILARITY),
+                      key=lambda x: x[2], reverse=True)
+
+    def search(self, query: str) -> List[Tuple[str, float]]:
+        """Return (entry_id, score) pairs, best first.
+
+        An entry scores the best similarity of its words to each query word,
+        summed over query words.
+        """
+        scores: Dict[str, float] = {}
+        for query_word in set(tokenize(query)):
+            best: Dict[str, float] = {}
+            for word_id, word, score in self.similar_words(query_word):
+                for (entry_id,) in self.conn.execute(
+                    'SELECT entry_id FROM entry_words WHERE word_id = ?', (word_id,)
+                ):
+                    if score > best.get(entry_id, 0.0):
+                        best[entry_id] = score
+            for entry_id, score in best.items():
+                scores[entry_id] = scores.get(entry_id, 0.0) + score
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
@@ -0,0 +1,205 @@
+"""
+Bulk import of entries from JSONL, CSV or directories of markdown files.
+"""
+
+import csv
+import json
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Union
+try:
+    from .models import ScrapEntry, EntryType, Status, Priority
+    from .storage import StorageManager, TYPE_DIRECTORIES
+except ImportError:
+    from models import ScrapEntry, EntryType, Status, Priority
+    from storage import StorageManager, TYPE_DIRECTORIES
+
+
+FORMATS = ('jsonl', 'csv', 'markdown')
+
+SECTION_PATTERN = re.compile(r'^## (Context|Tags)\s*$', re.MULTILINE)
+
+# What the readers yield: a record, a JSONL line or a markdown file, parsed
+# one at a time by Importer.run so a bad one is skipped rather than fatal
+RawRecord = Union[Dict, bytes, Path]
+
+
+@dataclass
+class ImportResult:
+    """Summary of an import run."""
+    imported: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Imported entries per second."""
+        return self.imported / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def detect_format(source: Path) -> str:
+    """Guess the import format from the source path."""
+    if source.is_dir():
+        return 'markdown'
+    if source.suffix.lower() == '.csv':
+        return 'csv'
+    return 'jsonl'
+
+
+def _parse_tags(value) -> List[str]:
+    """Normalize tags given as a list or a comma-separated string."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(tag).strip() for tag in value if str(tag).strip()]
+
+
+def _parse_date(value) -> datetime:
+    """Parse a record date, defaulting to now."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if value:
+        return datetime.fromisoformat(str(value))
+    return datetime.now()
+
+
+def record_to_entry(record: Dict, default_type: EntryType) -> ScrapEntry:
+    """Build an entry from an import record; raises ValueError if invalid."""
+    title = record.get('title') or ''
+    if not isinstance(title, str):
+        raise ValueError("record title is not a string")
+    title = title.strip()
+    if not title:
+        raise ValueError("record has no title")
+
+    entry_type = EntryType(record['type']) if record.get('type') else default_type
+    return ScrapEntry(
+        title=title,
+        content=record.get('content') or '',
+        context=record.get('context') or '',
+        tags=_parse_tags(record.get('tags')),
+        entry_type=entry_type,
+        created_date=_parse_date(record.get('date') or record.get('created_date')),
+        status=Status(record.get('status') or 'active'),
+        priority=Priority(record['priority']) if record.get('priority') else None,
+        category=record.get('category') or None
+    )
+
+
+class Importer:
+    """Streams records into storage in batches."""
+
+    def __init__(self, storage: StorageManager, batch_size: int = 500, workers: int = 8):
+        """Initialize importer."""
+        self.storage = storage
+        self.batch_size = max(1, batch_size)
+        self.workers = workers
+
+    def read(self, source: Path, fmt: str = 'auto') -> Iterator[RawRecord]:
+        """Yield raw records from a JSONL file, CSV file or markdown directory."""
+        if fmt == 'auto':
+            fmt = detect_format(source)
+        if fmt == 'jsonl':
+            return self._read_jsonl(source)
+        if fmt == 'csv':
+            return self._read_csv(source)
+        if fmt == 'markdown':
+            return self._read_markdown(source)
+        raise ValueError(f"Unknown import format: {fmt}")
+
+    def _read_jsonl(self, path: Path) -> Iterator[bytes]:
+        """Yield each non-empty JSONL line, undecoded."""
+        with open(path, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+    def _read_csv(self, path: Path) -> Iterator[Dict]:
+        """Yield one record per CSV row (header row required)."""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            yield from csv.DictReader(f)
+
+    def _read_markdown(self, directory: Path) -> Iterator[Path]:
+        """Yield the markdown files under a directory."""
+        for file_path in sorted(directory.rglob('*.md')):
+            if not file_path.name.startswith('_'):
+                yield file_path
+
+    def _load(self, raw: RawRecord) -> Dict:
+        """Parse a raw record; raises ValueError (or a YAML error) if it is unreadable."""
+        if isinstance(raw, bytes):
+            raw = json.loads(raw.decode('utf-8'))
+        elif isinstance(raw, Path):
+            frontmatter, body = self.storage._read_entry_file(raw)
+            if not isinstance(frontmatter, dict):
+                raise ValueError(f"{raw.name}: frontmatter is not a mapping")
+            raw = self._markdown_record(raw, frontmatter, body)
+        if not isinstance(raw, dict):
+            raise ValueError(f"record is a JSON {type(raw).__name__}, not an object")
+        return raw
+
+    def _markdown_record(self, file_path: Path, frontmatter: Dict, body: str) -> Dict:
+        """Turn frontmatter and body into a record, stripping generated sections."""
+        lines = body.strip().split('\n')
+        heading = None
+        if lines and lines[0].startswith('# '):
+            heading = lines[0][2:].strip()
+            lines = lines[1:]
+        text = '\n'.join(lines)
+
+        # Bodies written by scrap end with "## Context" / "## Tags" sections
+        sections = {}
+        match = SECTION_PATTERN.search(text)
+        content = text[:match.start()] if match else text
+        while match:
+            following = SECTION_PATTERN.search(text, match.end())
+            sections[match.group(1)] = text[match.end():following.start() if following else len(text)].strip()
+            match = following
+
+        record = dict(frontmatter)
+        record.setdefault('title', heading or file_path.stem.replace('_', ' '))
+        record['content'] = content.strip()
+        if not record.get('context') and 'Context' in sections:
+            record['context'] = sections['Context']
+        if not record.get('type') and file_path.parent.name in TYPE_DIRECTORIES:
+            record['type'] = TYPE_DIRECTORIES[file_path.parent.name].value
+        return record
+
+    def run(self, records: Iterable[RawRecord], default_type: EntryType = EntryType.IDEA) -> ImportResult:
+        """Import records, committing counters and the index once per batch.
+
+        Records that cannot be parsed or are invalid are skipped with a warning.
+        """
+        import yaml
+        invalid = (ValueError, KeyError, TypeError, AttributeError, OSError, yaml.YAMLError)
+        result = ImportResult()
+        started = time.perf_counter()
+        records = iter(records)
+
+        while True:
+            chunk = list(islice(records, self.batch_size))
+            if not chunk:
+                break
+
+            batch = []
+            for record in chunk:
+                try:
+                    batch.append(record_to_entry(self._load(record), default_type))
+                except invalid as e:
+                    result.skipped += 1
+                    print(f"Warning: Skipping record: {e}")
+
+            if batch:
+                self.storage.save_entries(batch, workers=self.workers)
+                result.imported += len(batch)
+
+        result.elapsed = time.perf_counter() - started
+        return result
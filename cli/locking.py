@@ -0,0 +1,124 @@
+"""
+Inter-process file locking for shared scrapbook state.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive advisory lock held on a sidecar lock file.
+
+    The lock is re-entrant within a process, so code that already holds it
+    can call helpers that take it again.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize lock for the given lock file path."""
+        self.path = path
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self) -> None:
+        """Block until the lock is held."""
+        if self._depth == 0:
+            fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            except Exception:
+                os.close(fd)
+                raise
+            self._fd = fd
+        self._depth += 1
+
+    def release(self) -> None:
+        """Release one level of the lock."""
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+def atomic_write_text(path: Path, text: str, sync: bool = False) -> None:
+    """Write a file via a temporary file and rename so readers never see partial data.
+
+    With `sync`, the file and the rename are flushed to disk before returning.
+    """
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    if sync:
+        _fsync_directory(path.parent)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Binary counterpart of atomic_write_text."""
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a directory's entries (new and renamed names) to disk; a no-op on Windows."""
+    if os.name != 'posix':
+        return
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_paths(paths: Iterable[Path]) -> None:
+    """Flush files already written and closed, and the directories naming them, to disk."""
+    directories = set()
+    for path in paths:
+        fd = os.open(str(path), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(path.parent)
+    for directory in directories:
+        _fsync_directory(directory)
@@ -0,0 +1,149 @@
+"""
+Todo manifest (website/src/data/todoManifest.json) built from the index.
+
+The Kanban board reads this file. It used to be regenerated by
+website/scripts/generate-todo-manifest.js, which re-reads every todo file;
+here it comes straight from the index rows. An incremental export loads the
+previous manifest and applies only the rows written or deleted since the
+index revision recorded in it, falling back to a full export when that
+revision is unknown (another index, or the JSON backend).
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+try:
+    from .locking import atomic_write_text
+    from .models import EntryType
+    from .profiling import traced
+    from .storage import StorageManager, split_frontmatter
+except ImportError:
+    from locking import atomic_write_text
+    from models import EntryType
+    from profiling import traced
+    from storage import StorageManager, split_frontmatter
+
+
+# Board order: priority first (as the Node generator ranked it), then newest
+PRIORITY_ORDER = {'urgent': 4, 'critical': 4, 'high': 3, 'medium': 2, 'low': 1}
+
+# Shared so each item is not encoded by a freshly built encoder
+ITEM_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+@dataclass
+class ExportResult:
+    """Summary of a manifest export."""
+    count: int = 0
+    updated: int = 0
+    removed: int = 0
+    incremental: bool = False
+    elapsed: float = 0.0
+
+
+def default_path(storage: StorageManager) -> Path:
+    """Where the website expects the manifest: src/data next to the docs directory."""
+    return storage.data_dir.parent / 'src' / 'data' / 'todoManifest.json'
+
+
+def manifest_item(row: Dict) -> Dict:
+    """Manifest item for a todo index row, with the fields the Node generator wrote."""
+    return {
+        'filename': os.path.basename(row['file_path']),
+        'title': row['title'],
+        'status': row.get('status') or 'active',
+        'priority': row.get('priority') or 'medium',
+        'tags': list(row.get('tags') or []),
+        'id': row['id'],
+        'date': row['created_date'],
+        'context': row.get('context') or ''
+    }
+
+
+def _sort_key(item: Dict):
+    # Stable sorts: newest first, then by priority (highest first)
+    return -PRIORITY_ORDER.get(item['priority'], 0)
+
+
+def _backfill_context(storage: StorageManager, rows: List[Dict]) -> None:
+    """Read the context of rows indexed before it was stored, and store it."""
+    missing = [row for row in rows if 'context' not in row]
+    for row in missing:
+        try:
+            with open(storage.data_dir / row['file_path'], 'r', encoding='utf-8') as f:
+                frontmatter, _ = split_frontmatter(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read context of {row['id']}: {e}")
+            frontmatter = {}
+        row['context'] = str(frontmatter.get('context') or '')
+    if missing:
+        storage.index.upsert_many(missing)
+
+
+def render(generated: str, items: List[Dict], revision: Optional[str]) -> str:
+    """Manifest JSON with one item per line.
+
+    json.dumps(indent=...) falls back to the pure-Python encoder, which
+    dominated incremental exports; items are encoded by the C encoder instead.
+    """
+    body = ',\n'.join('    ' + ITEM_ENCODER.encode(item) for item in items)
+    items_json = f"[\n{body}\n  ]" if items else '[]'
+    return (f'{{\n  "generated": {json.dumps(generated)},\n  "count": {len(items)},\n'
+            f'  "items": {items_json},\n  "revision": {json.dumps(revision)}\n}}\n')
+
+
+def _load(path: Path) -> Optional[Dict]:
+    """A previous manifest, or None if missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) and isinstance(manifest.get('items'), list) else None
+
+
+@traced('manifest.export')
+def export(storage: StorageManager, path: Path, incremental: bool = False) -> ExportResult:
+    """Write the todo manifest to `path`; `incremental` applies only changes since the last export."""
+    result = ExportResult()
+    started = time.perf_counter()
+    # Read before the changes, so a write in between is applied again next time rather than lost
+    revision = storage.index.revision()
+
+    previous = _load(path) if incremental else None
+    changes = None
+    if previous is not None and previous.get('revision'):
+        changes = storage.index.changes_since(previous['revision'], EntryType.TODO)
+
+    if changes is None:
+        rows = [row for row in storage.index.all().values() if row['type'] == EntryType.TODO.value]
+        _backfill_context(storage, rows)
+        items = {row['id']: manifest_item(row) for row in rows}
+        result.updated = len(items)
+    else:
+        rows, deleted = changes
+        result.incremental = True
+        if not rows and not deleted:
+            result.count = len(previous['items'])
+            result.elapsed = time.perf_counter() - started
+            return result
+        _backfill_context(storage, rows)
+        items = {item['id']: item for item in previous['items']}
+        for entry_id in deleted:
+            result.removed += items.pop(entry_id, None) is not None
+        items.update((row['id'], manifest_item(row)) for row in rows)
+        result.updated = len(rows)
+
+    ordered = sorted(items.values(), key=lambda item: (item['date'], item['id']), reverse=True)
+    ordered.sort(key=_sort_key)
+    generated = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, render(generated, ordered, revision))
+
+    result.count = len(ordered)
+    result.elapsed = time.perf_counter() - started
+    return result
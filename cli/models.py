@@ -2,6 +2,7 @@
 Data models and validation for scrapbook entries.
 """
 
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -32,7 +33,11 @@ class Priority(Enum):
     URGENT = "urgent"
 
 
-@dataclass
+# Slotted dataclasses need Python 3.10+; older versions fall back to __dict__
+SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**SLOTS)
 class ScrapEntry:
     """Data model for a scrapbook entry."""
     title: str
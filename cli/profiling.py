@@ -0,0 +1,354 @@
+"""
+Per-phase timing, I/O and memory tracing for CLI commands.
+
+Enabled with the global `--profile` options or the SCRAP_TRACE environment
+variable. Hot paths mark phases with the `traced` decorator or the `phase`
+context manager; while no profiler is running both cost one global lookup.
+
+    scrap --profile search "cache"                 # table on stderr
+    scrap --profile-output trace.jsonl list        # one JSON line per command
+    scrap --profile-cprofile search.prof search x  # plus a cProfile dump
+    scrap --profile-memory search x                # per-phase Python heap peaks
+    SCRAP_TRACE=1 scrap list                       # same as --profile
+    SCRAP_TRACE=trace.jsonl scrap list             # same as --profile-output
+
+Each phase records wall and CPU time, bytes read and written by the process
+(from /proc/self/io, where available) and peak memory. Peak memory is the
+process's maximum resident set size unless memory tracing is requested
+(--profile-memory or SCRAP_TRACE_MEMORY=1): tracemalloc then gives the peak
+Python heap within each phase, at the cost of several times slower imports
+and allocation-heavy code. Phases nest; repeated calls of the same phase are
+summed into one row.
+"""
+
+import contextlib
+import functools
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+# Global options that turn profiling on, and whether they take a value
+PROFILE_OPTIONS = {'--profile': False, '--profile-memory': False, '--profile-output': True,
+                   '--profile-cprofile': True}
+
+# Other global options that take a value, skipped while scanning argv
+VALUE_OPTIONS = {'--config'}
+
+# SCRAP_TRACE values meaning "table on stderr" rather than a JSONL path
+TABLE_VALUES = {'1', 'true', 'yes', 'table', 'stderr'}
+
+IO_COUNTERS = '/proc/self/io'
+
+_NULL_PHASE = contextlib.nullcontext()
+
+# The running profiler, if any
+_active: Optional['Profiler'] = None
+
+
+def settings_from(argv: List[str], environ=os.environ) -> Optional[Dict]:
+    """Profiling settings from the global options in argv and SCRAP_TRACE, or None if off.
+
+    Only options before the subcommand are considered, so a search for
+    "--profile" is not mistaken for the option.
+    """
+    settings = {}
+    trace = environ.get('SCRAP_TRACE', '').strip()
+    if trace and trace.lower() not in ('0', 'false', 'no'):
+        settings['output'] = None if trace.lower() in TABLE_VALUES else trace
+    if environ.get('SCRAP_TRACE_CPROFILE'):
+        settings.setdefault('output', None)
+        settings['cprofile'] = environ['SCRAP_TRACE_CPROFILE']
+    if environ.get('SCRAP_TRACE_MEMORY', '').strip().lower() in TABLE_VALUES:
+        settings.setdefault('output', None)
+        settings['memory'] = True
+
+    args = iter(argv)
+    for arg in args:
+        name, has_value, value = arg.partition('=')
+        if name in PROFILE_OPTIONS:
+            if PROFILE_OPTIONS[name] and not has_value:
+                value = next(args, '')
+            settings.setdefault('output', None)
+            if name == '--profile-output':
+                settings['output'] = value
+            elif name == '--profile-cprofile':
+                settings['cprofile'] = value
+            elif name == '--profile-memory':
+                settings['memory'] = True
+        elif name in VALUE_OPTIONS:
+            if not has_value:
+                next(args, None)
+        elif not arg.startswith('-'):
+            break
+    return settings or None
+
+
+def _io_counters() -> Optional[tuple]:
+    """Bytes read and written by this process so far, or None where unsupported."""
+    try:
+        with open(IO_COUNTERS, 'rb') as f:
+            fields = dict(line.split(b':', 1) for line in f.read().splitlines())
+        return int(fields[b'rchar']), int(fields[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _max_rss() -> int:
+    """Peak resident set size of this process in bytes, or 0 where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PhaseStats:
+    """Totals for one phase path across all of its calls."""
+
+    def __init__(self, path: tuple):
+        self.path = path
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.read_bytes: Optional[int] = 0
+        self.write_bytes: Optional[int] = 0
+        self.peak_bytes = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'phase': '/'.join(self.path),
+            'depth': len(self.path) - 1,
+            'calls': self.calls,
+            'wall_ms': round(self.wall * 1000, 3),
+            'cpu_ms': round(self.cpu * 1000, 3),
+            'read_bytes': self.read_bytes,
+            'write_bytes': self.write_bytes,
+            'peak_bytes': self.peak_bytes
+        }
+
+
+class _Frame:
+    """An open phase on the profiler's stack."""
+
+    __slots__ = ('path', 'wall', 'cpu', 'io', 'peak')
+
+    def __init__(self, path: tuple, peak: int):
+        self.path = path
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.io = _io_counters()
+        self.peak = peak
+
+
+class Profiler:
+    """Collects phase statistics between start() and stop()."""
+
+    def __init__(self, argv: List[str], output: Optional[str] = None, cprofile: Optional[str] = None,
+                 memory: bool = False):
+        self.argv = list(argv)
+        self.output = output
+        self.cprofile = cprofile
+        self.memory = memory
+        self.phases: Dict[tuple, PhaseStats] = {}
+        self.stack: List[_Frame] = []
+        self.total: Optional[PhaseStats] = None
+        self._root: Optional[_Frame] = None
+        self._cprofile = None
+        self._owns_tracemalloc = False
+
+    def start(self) -> None:
+        """Begin tracing and make this the active profiler."""
+        global _active
+        if self.memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracemalloc = True
+        self._root = _Frame((), self._peak(reset=True))
+        if self.cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        _active = self
+
+    def stop(self) -> None:
+        """Close any open phases, stop tracing and deactivate."""
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        while self.stack:
+            self.exit_phase()
+        self.total = self._close(self._root, PhaseStats(('total',)))
+        if self._owns_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+        if _active is self:
+            _active = None
+
+    def _peak(self, reset: bool = False) -> int:
+        """Peak traced memory since the last reset, or the process's peak RSS.
+
+        Only tracemalloc can be reset (Python 3.9+; 3.8 keeps the run peak).
+        """
+        if not self.memory:
+            return _max_rss()
+        import tracemalloc
+        peak = tracemalloc.get_traced_memory()[1]
+        if reset and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        return peak
+
+    def _fold_peak(self) -> None:
+        """Carry the traced peak since the last reset into every open phase before resetting it."""
+        if not self.memory:
+            return
+        peak = self._peak(reset=True)
+        for frame in self.stack:
+            frame.peak = max(frame.peak, peak)
+        self._root.peak = max(self._root.peak, peak)
+
+    def enter_phase(self, name: str) -> None:
+        parent = self.stack[-1].path if self.stack else ()
+        self._fold_peak()
+        self.stack.append(_Frame(parent + (name,), 0))
+
+    def exit_phase(self) -> None:
+        frame = self.stack.pop()
+        self._fold_peak()
+        stats = self.phases.get(frame.path)
+        if stats is None:
+            stats = self.phases[frame.path] = PhaseStats(frame.path)
+        self._close(frame, stats)
+
+    def _close(self, frame: _Frame, stats: PhaseStats) -> PhaseStats:
+        """Add a finished frame's measurements to its stats."""
+        stats.calls += 1
+        stats.wall += time.perf_counter() - frame.wall
+        stats.cpu += time.process_time() - frame.cpu
+        stats.peak_bytes = max(stats.peak_bytes, frame.peak, self._peak())
+        io = _io_counters()
+        if frame.io is None or io is None:
+            stats.read_bytes = stats.write_bytes = None
+        elif stats.read_bytes is not None:
+            stats.read_bytes += io[0] - frame.io[0]
+            stats.write_bytes += io[1] - frame.io[1]
+        return stats
+
+    def record(self) -> Dict:
+        """The finished profile as a JSON-serializable dict."""
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'argv': self.argv,
+            'pid': os.getpid(),
+            'memory': 'tracemalloc' if self.memory else 'rss',
+            'total': self.total.to_dict(),
+            'phases': [self.phases[path].to_dict() for path in self._ordered_paths()]
+        }
+
+    def _ordered_paths(self) -> List[tuple]:
+        """Phase paths depth-first, children after their parent in first-seen order."""
+        children: Dict[tuple, List[tuple]] = {}
+        for path in self.phases:
+            children.setdefault(path[:-1], []).append(path)
+        ordered = []
+        pending = list(reversed(children.get((), [])))
+        while pending:
+            path = pending.pop()
+            ordered.append(path)
+            pending.extend(reversed(children.get(path, [])))
+        return ordered
+
+    def report(self) -> None:
+        """Write the profile to the JSONL output, or as a table to stderr."""
+        if self._cprofile is not None:
+            try:
+                self._cprofile.dump_stats(self.cprofile)
+            except OSError as e:
+                print(f"Warning: Could not write cProfile stats: {e}", file=sys.stderr)
+
+        if self.output:
+            import json
+            try:
+                with open(self.output, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(self.record()) + '\n')
+            except OSError as e:
+                print(f"Warning: Could not write profile: {e}", file=sys.stderr)
+            return
+        print(format_table(self.record()), file=sys.stderr)
+
+
+def _kb(value: Optional[int]) -> str:
+    return '-' if value is None else f"{value / 1024:.1f}"
+
+
+def format_table(record: Dict) -> str:
+    """Render a profile record as an indented text table."""
+    peak = 'heap KB' if record.get('memory') == 'tracemalloc' else 'rss KB'
+    lines = [f"{'phase':36s} {'calls':>6s} {'wall ms':>10s} {'cpu ms':>10s} "
+             f"{'read KB':>10s} {'write KB':>10s} {peak:>10s}"]
+    for row in record['phases'] + [record['total']]:
+        name = '  ' * row['depth'] + row['phase'].rsplit('/', 1)[-1]
+        lines.append(f"{name:36s} {row['calls']:6d} {row['wall_ms']:10.2f} {row['cpu_ms']:10.2f} "
+                     f"{_kb(row['read_bytes']):>10s} {_kb(row['write_bytes']):>10s} {_kb(row['peak_bytes']):>10s}")
+    return '\n'.join(lines)
+
+
+def active() -> Optional[Profiler]:
+    """The running profiler, or None."""
+    return _active
+
+
+class _Phase:
+    """Context manager for one phase of the active profiler."""
+
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.enter_phase(self.name)
+
+    def __exit__(self, *exc_info):
+        # A phase left open by an inner error is closed by stop()
+        if self.profiler.stack and self.profiler.stack[-1].path[-1] == self.name:
+            self.profiler.exit_phase()
+
+
+def phase(name: str):
+    """Context manager timing a named phase while profiling; a no-op otherwise."""
+    if _active is None:
+        return _NULL_PHASE
+    return _Phase(_active, name)
+
+
+def traced(name: str):
+    """Decorator timing every call of a function as a named phase while profiling."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _Phase(_active, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start(argv: List[str], output: Optional[str] = None, cprofile: Optional[str] = None,
+          memory: bool = False) -> Profiler:
+    """Start and return a profiler for one command."""
+    profiler = Profiler(argv, output, cprofile, memory)
+    profiler.start()
+    return profiler
+
+
+def finish(profiler: Profiler) -> None:
+    """Stop a profiler and write its report."""
+    profiler.stop()
+    profiler.report()
@@ -0,0 +1,520 @@
+"""
+Structured search queries: parsing and cost-based execution.
+
+    type:todo priority:>=high tag:infra -tag:done created:>2026-09-01 "rate limit"
+
+Terms are ANDed unless joined with OR; `-term` or NOT negates, parentheses
+group. Bare words and "quoted phrases" are full-text terms.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+try:
+    from .fulltext import tokenize
+    from .models import EntryType, Priority
+    from .results import NEWEST, RANK, cursor_key, is_after, position
+except ImportError:
+    from fulltext import tokenize
+    from models import EntryType, Priority
+    from results import NEWEST, RANK, cursor_key, is_after, position
+
+
+# Units accepted in relative times such as 7d or 12h
+RELATIVE_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+FIELDS = ('type', 'status', 'priority', 'tag', 'category', 'created', 'text')
+FIELD_ALIASES = {'tags': 'tag', 'date': 'created'}
+
+# Fields whose values are ordered and accept >, >=, < and <=
+ORDERED_FIELDS = ('priority', 'created')
+
+PRIORITY_ORDER = [p.value for p in Priority]
+
+# Where each field's matching IDs come from; category has no index
+FIELD_SOURCES = {
+    'type': 'index',
+    'status': 'index',
+    'priority': 'index',
+    'created': 'index',
+    'tag': 'tags',
+    'text': 'fulltext'
+}
+
+# Another index is intersected only while its estimated size is within this
+# factor of the current candidates; larger ones are cheaper as row filters
+INTERSECT_RATIO = 8
+
+TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) |
+        (?P<neg>-)(?=[^\s)]) |
+        (?P<field>[A-Za-z]+):(?P<op>>=|<=|>|<|=)?(?:"(?P<quoted_value>[^"]*)"?|(?P<value>[^\s()]*)) |
+        "(?P<phrase>[^"]*)"? |
+        (?P<word>[^\s()"]+)
+    )''', re.VERBOSE)
+
+STRUCTURED_PATTERN = re.compile(
+    r'(?:^|[\s(])(?:-[^\s-]|(?:%s):)|\b(?:OR|AND|NOT)\b|[()]'
+    % '|'.join(FIELDS + tuple(FIELD_ALIASES))
+)
+
+DATE_ONLY = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+class QueryError(ValueError):
+    """Raised for malformed structured queries."""
+
+
+def parse_time_bound(value: str, now: Optional[datetime] = None) -> datetime:
+    """Parse an ISO date/time or a relative time ago such as 30m, 12h, 7d or 2w."""
+    value = value.strip()
+    if len(value) > 1 and value[-1] in RELATIVE_UNITS and value[:-1].isdigit():
+        return (now or datetime.now()) - timedelta(**{RELATIVE_UNITS[value[-1]]: int(value[:-1])})
+    parsed = datetime.fromisoformat(value)
+    # Index dates are naive local times
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+@dataclass(frozen=True)
+class Term:
+    """A single predicate such as tag:infra or priority:>=high.
+
+    Equality-style fields resolve to a set of accepted `values` (None meaning
+    "no value"); `created` resolves to an ISO [low, high) range.
+    """
+    field: str
+    op: str
+    value: str
+    values: Optional[FrozenSet] = None
+    low: Optional[str] = None
+    high: Optional[str] = None
+
+    def __str__(self) -> str:
+        value = f'"{self.value}"' if re.search(r'[\s()"]', self.value) or not self.value else self.value
+        if self.field == 'text':
+            return value
+        return f"{self.field}:{self.op}{value}"
+
+
+@dataclass(frozen=True)
+class Not:
+    """Negation of a query node."""
+    child: object
+
+    def __str__(self) -> str:
+        return f"-{_grouped(self.child)}"
+
+
+@dataclass(frozen=True)
+class And:
+    """Conjunction of query nodes; empty matches everything."""
+    children: Tuple = ()
+
+    def __str__(self) -> str:
+        return ' '.join(_grouped(child) for child in self.children)
+
+
+@dataclass(frozen=True)
+class Or:
+    """Disjunction of query nodes."""
+    children: Tuple = ()
+
+    def __str__(self) -> str:
+        return ' OR '.join(_grouped(child) for child in self.children)
+
+
+def _grouped(node) -> str:
+    """String form of a child node, parenthesized if it is a compound."""
+    return f"({node})" if isinstance(node, (And, Or)) else str(node)
+
+
+def is_structured(text: str) -> bool:
+    """Whether a search string uses fields, negation, OR/AND/NOT or parentheses."""
+    return bool(STRUCTURED_PATTERN.search(text or ''))
+
+
+def _choices(field: str, value: str, allowed: List[str]) -> FrozenSet:
+    """Resolve a comma-separated value list against the allowed values."""
+    values = set()
+    for item in value.lower().split(','):
+        item = item.strip()
+        if field == 'type' and item not in allowed and item.endswith('s'):
+            item = item[:-1]
+        if item not in allowed:
+            raise QueryError(f"Unknown {field} '{item}' (expected one of: {', '.join(allowed)})")
+        values.add(item)
+    return frozenset(values)
+
+
+def _priority_values(op: str, value: str) -> FrozenSet:
+    """Priorities selected by a comparison such as >=high; 'none' means no priority."""
+    if op in ('', '='):
+        values = _choices('priority', value, PRIORITY_ORDER + ['none'])
+        return frozenset(None if v == 'none' else v for v in values)
+    if value.lower() not in PRIORITY_ORDER:
+        raise QueryError(f"Cannot compare priority with '{value}' (expected one of: {', '.join(PRIORITY_ORDER)})")
+    rank = PRIORITY_ORDER.index(value.lower())
+    selected = {
+        '>': PRIORITY_ORDER[rank + 1:],
+        '>=': PRIORITY_ORDER[rank:],
+        '<': PRIORITY_ORDER[:rank],
+        '<=': PRIORITY_ORDER[:rank + 1]
+    }[op]
+    return frozenset(selected)
+
+
+def _created_range(op: str, value: str, now: Optional[datetime] = None) -> Tuple[Optional[str], Optional[str]]:
+    """ISO [low, high) range for a creation-time comparison.
+
+    A bare date covers the whole day, so created:>2026-09-01 starts the next
+    day. Relative times and full timestamps are instants; without an
+    operator they mean "since".
+    """
+    try:
+        start = parse_time_bound(value, now)
+    except ValueError:
+        raise QueryError(f"Invalid time '{value}' (use YYYY-MM-DD, an ISO time, or 7d/12h/2w ago)")
+
+    if DATE_ONLY.fullmatch(value):
+        day_after = start + timedelta(days=1)
+        low, high = {
+            '': (start, day_after),
+            '=': (start, day_after),
+            '>': (day_after, None),
+            '>=': (start, None),
+            '<': (None, start),
+            '<=': (None, day_after)
+        }[op]
+    elif op in ('<', '<='):
+        low, high = None, start
+    else:
+        low, high = start, None
+    return (low.isoformat() if low else None, high.isoformat() if high else None)
+
+
+def make_term(field: str, op: str, value: str, now: Optional[datetime] = None) -> Term:
+    """Validate a field predicate and resolve it to a Term."""
+    name = FIELD_ALIASES.get(field.lower(), field.lower())
+    if name not in FIELDS:
+        raise QueryError(f"Unknown field '{field}' (expected one of: {', '.join(FIELDS)})")
+    if op not in ('', '=') and name not in ORDERED_FIELDS:
+        raise QueryError(f"Field '{name}' does not support '{op}'")
+    if not value:
+        raise QueryError(f"Missing value for '{name}:'")
+
+    if name == 'type':
+        return Term(name, op, value, values=_choices(name, value, [t.value for t in EntryType]))
+    if name == 'status':
+        # Open like category: the Kanban board also writes in-progress and in-progress-secondary
+        return Term(name, op, value, values=frozenset(s.strip() for s in value.lower().split(',') if s.strip()))
+    if name == 'priority':
+        return Term(name, op, value, values=_priority_values(op, value))
+    if name == 'tag':
+        return Term(name, op, value, values=frozenset(t.strip() for t in value.split(',') if t.strip()))
+    if name == 'category':
+        return Term(name, op, value, values=frozenset([value.lower()]))
+    if name == 'created':
+        low, high = _created_range(op, value, now)
+        return Term(name, op, value, low=low, high=high)
+    return Term(name, op, value)
+
+
+class _Parser:
+    """Recursive-descent parser over the token stream of a query."""
+
+    def __init__(self, text: str, now: Optional[datetime] = None):
+        self.tokens = self._tokenize(text)
+        self.position = 0
+        self.now = now
+
+    def _tokenize(self, text: str) -> List[Tuple[str, object]]:
+        """Split a query into (kind, payload) tokens."""
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+            position = match.end()
+            if match.group('field') is not None:
+                name = match.group('field')
+                value = match.group('quoted_value')
+                if value is None:
+                    value = match.group('value')
+                if FIELD_ALIASES.get(name.lower(), name.lower()) in FIELDS:
+                    tokens.append(('field', (name, match.group('op') or '', value)))
+                else:
+                    # Not a known field: keep "word:rest" as plain text
+                    tokens.append(('text', match.group(0).strip()))
+            elif match.group('phrase') is not None:
+                tokens.append(('text', match.group('phrase')))
+            elif match.group('word') in ('OR', 'AND', 'NOT'):
+                tokens.append((match.group('word'), None))
+            elif match.group('word') is not None:
+                tokens.append(('text', match.group('word')))
+            else:
+                tokens.append((match.lastgroup, None))
+        return tokens
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def _take(self) -> Tuple[str, object]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        """Parse the whole query into an AST."""
+        node = self._or()
+        if self._peek() is not None:
+            raise QueryError("Unbalanced ')' in query")
+        return node
+
+    def _or(self):
+        children = [self._and()]
+        while self._peek() == 'OR':
+            self._take()
+            children.append(self._and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def _and(self):
+        children = []
+        while self._peek() not in (None, 'OR', 'rparen'):
+            if self._peek() == 'AND':
+                self._take()
+                continue
+            node = self._unary()
+            if node is not None:
+                children.append(node)
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def _unary(self):
+        kind, payload = self._take()
+        if kind in ('neg', 'NOT'):
+            if self._peek() in (None, 'OR', 'AND', 'rparen'):
+                raise QueryError("Nothing to negate after '-' or NOT")
+            child = self._unary()
+            return Not(child) if child is not None else None
+        if kind == 'lparen':
+            node = self._or()
+            if self._peek() != 'rparen':
+                raise QueryError("Missing ')' in query")
+            self._take()
+            return node
+        if kind == 'rparen':
+            raise QueryError("Unbalanced ')' in query")
+        if kind == 'field':
+            return make_term(*payload, now=self.now)
+        # Text without any indexable word (e.g. punctuation) matches everything
+        return Term('text', '', payload) if tokenize(payload) else None
+
+
+def parse_query(text: str, now: Optional[datetime] = None):
+    """Parse a structured query into an AST of Term, Not, And and Or nodes."""
+    return _Parser(text or '', now).parse()
+
+
+def conjuncts(node) -> List:
+    """Top-level AND-ed parts of a query."""
+    if isinstance(node, And):
+        return [part for child in node.children for part in conjuncts(child)]
+    return [node]
+
+
+def leaves(node) -> List[Term]:
+    """Every Term in a query."""
+    if isinstance(node, Term):
+        return [node]
+    if isinstance(node, Not):
+        return leaves(node.child)
+    return [leaf for child in node.children for leaf in leaves(child)]
+
+
+@dataclass
+class PlanStep:
+    """One step of an executed plan, for --explain."""
+    action: str
+    source: str
+    predicate: str
+    estimate: Optional[int] = None
+    rows: Optional[int] = None
+
+
+class QueryPlanner:
+    """Cost-based execution of parsed queries over the entry sidecar indexes.
+
+    The top-level conjuncts are costed from counts the indexes already keep
+    (tag counts, stats aggregates, term document frequencies). The cheapest
+    indexed one seeds the candidate IDs; the others are intersected or
+    subtracted cheapest first while their estimated size stays close to the
+    candidate count, and the rest are checked against the fetched rows.
+    """
+
+    def __init__(self, storage):
+        """Plan against a StorageManager's indexes."""
+        self.storage = storage
+        self._text_scores: Dict[str, Dict[str, float]] = {}
+        self._id_sets: Dict[Term, Set[str]] = {}
+        self._tag_counts = None
+
+    def execute(self, node, limit: int) -> Tuple[List[Dict], List[PlanStep]]:
+        """Run a query, returning up to `limit` rows in rank order and the plan steps."""
+        _, hits, steps = self.rank(node)
+        steps[-1].rows = min(len(hits), limit)
+        return [row for row, _ in hits[:limit]], steps
+
+    def rank(self, node, after: Optional[Tuple[str, Tuple]] = None
+             ) -> Tuple[str, List[Tuple[Dict, Optional[float]]], List[PlanStep]]:
+        """Run a query, returning its order, every (row, score) hit in that order, and the plan steps.
+
+        Hits are ranked by BM25 when the query has text terms, otherwise
+        newest first. `after` is a decoded cursor; only hits after it are
+        sorted and returned.
+        """
+        steps = []
+        parts = sorted(conjuncts(node), key=self._cost)
+        seeds = [part for part in parts if not isinstance(part, Not) and self._indexed(part)]
+
+        rows = None
+        if seeds:
+            seed = seeds[0]
+            parts.remove(seed)
+            candidates = self._ids(seed)
+            steps.append(PlanStep('seek', self._source(seed), str(seed), self._estimate(seed), len(candidates)))
+        else:
+            rows = list(self.storage.index.all().values())
+            candidates = {row['id'] for row in rows}
+            steps.append(PlanStep('scan', 'index', '*', len(candidates), len(candidates)))
+
+        filters = []
+        for part in parts:
+            negated = isinstance(part, Not)
+            target = part.child if negated else part
+            estimate = self._estimate(target)
+            if candidates and self._indexed(target) and estimate <= INTERSECT_RATIO * len(candidates):
+                if negated:
+                    candidates = candidates - self._ids(target)
+                else:
+                    candidates = candidates & self._ids(target)
+                action = 'subtract' if negated else 'intersect'
+                steps.append(PlanStep(action, self._source(target), str(target), estimate, len(candidates)))
+            else:
+                filters.append((part, estimate))
+
+        if rows is None:
+            rows = list(self.storage.index.get_many(list(candidates)).values()) if candidates else []
+            steps.append(PlanStep('fetch', 'index', f"{len(candidates)} ids", len(candidates), len(rows)))
+        else:
+            rows = [row for row in rows if row['id'] in candidates]
+
+        for part, estimate in filters:
+            rows = [row for row in rows if self._test(part, row)]
+            steps.append(PlanStep('filter', self._source(part), str(part), estimate, len(rows)))
+
+        ranking = [part for part in conjuncts(node) if isinstance(part, Term) and part.field == 'text']
+        order = RANK if ranking else NEWEST
+        hits = [(row, sum(self._text_scores[part.value].get(row['id'], 0.0) for part in ranking)
+                 if ranking else None) for row in rows]
+        resume = cursor_key(order, after)
+        if resume is not None:
+            hits = [hit for hit in hits if is_after(order, position(order, *hit), resume)]
+        if ranking:
+            hits.sort(key=lambda hit: (-hit[1], hit[0]['id']))
+        else:
+            hits.sort(key=lambda hit: (hit[0]['created_date'], hit[0]['id']), reverse=True)
+        steps.append(PlanStep('rank', 'fulltext' if ranking else 'index',
+                              'bm25' if ranking else 'newest first', None, len(hits)))
+        return order, hits, steps
+
+    def _indexed(self, node) -> bool:
+        """Whether a node's matching IDs can be read from indexes alone."""
+        return all(leaf.field in FIELD_SOURCES for leaf in leaves(node))
+
+    def _source(self, node) -> str:
+        """Index(es) a node reads from, or 'rows' when it is checked per row."""
+        if not self._indexed(node):
+            return 'rows'
+        return '+'.join(sorted({FIELD_SOURCES[leaf.field] for leaf in leaves(node)}))
+
+    def _cost(self, node) -> Tuple[int, int]:
+        """Sort key putting indexed, then selective, conjuncts first."""
+        return (0 if self._indexed(node) else 1, self._estimate(node))
+
+    def _estimate(self, node) -> int:
+        """Estimated number of entries a node matches."""
+        total = self.storage.stats.total()
+        if isinstance(node, Not):
+            return max(0, total - self._estimate(node.child))
+        if isinstance(node, And):
+            return min((self._estimate(child) for child in node.children), default=total)
+        if isinstance(node, Or):
+            return min(total, sum(self._estimate(child) for child in node.children))
+
+        if node.field == 'tag':
+            if self._tag_counts is None:
+                self._tag_counts = self.storage.tags.counts()
+            return min(total, sum(self._tag_counts.get(tag, 0) for tag in node.values))
+        if node.field == 'text':
+            return self.storage.fulltext.estimate(node.value)
+        if node.field in ('type', 'status', 'priority'):
+            counts = self.storage.stats.counts(node.field)
+            return sum(counts.get('none' if value is None else value, 0) for value in node.values)
+        if node.field == 'created':
+            days = self.storage.stats.counts('day')
+            return sum(count for day, count in days.items()
+                       if (not node.low or day >= node.low[:10]) and (not node.high or day <= node.high[:10]))
+        return total
+
+    def _ids(self, node) -> Set[str]:
+        """IDs matching an indexed node."""
+        if isinstance(node, Not):
+            return self.storage.tags.match() - self._ids(node.child)
+        if isinstance(node, And):
+            ids = self._ids(node.children[0]) if node.children else self.storage.tags.match()
+            for child in node.children[1:]:
+                ids = ids & self._ids(child)
+            return ids
+        if isinstance(node, Or):
+            return set().union(*(self._ids(child) for child in node.children))
+
+        if node not in self._id_sets:
+            if node.field == 'tag':
+                ids = self.storage.tags.match(any_of=sorted(node.values))
+            elif node.field == 'text':
+                ids = set(self._scores(node.value))
+            elif node.field == 'created':
+                ids = self.storage.index.ids_where('created_date', low=node.low, high=node.high)
+            else:
+                ids = self.storage.index.ids_where(node.field, values=set(node.values))
+            self._id_sets[node] = ids
+        return self._id_sets[node]
+
+    def _scores(self, text: str) -> Dict[str, float]:
+        """BM25 scores of entries matching a text term, read once per query."""
+        if text not in self._text_scores:
+            self._text_scores[text] = self.storage.fulltext.match_all(text)
+        return self._text_scores[text]
+
+    def _test(self, node, row: Dict) -> bool:
+        """Check a node against a fetched index row."""
+        if isinstance(node, Not):
+            return not self._test(node.child, row)
+        if isinstance(node, And):
+            return all(self._test(child, row) for child in node.children)
+        if isinstance(node, Or):
+            return any(self._test(child, row) for child in node.children)
+
+        if node.field == 'text':
+            return row['id'] in self._scores(node.value)
+        if node.field == 'tag':
+            return not node.values.isdisjoint(row.get('tags', []))
+        if node.field == 'category':
+            return (row.get('category') or '').lower() in node.values
+        if node.field == 'created':
+            created = row.get('created_date') or ''
+            return (node.low is None or created >= node.low) and (node.high is None or created < node.high)
+        if node.field == 'status':
+            return (row.get('status') or 'active') in node.values
+        return row.get(node.field) in node.values
@@ -0,0 +1,328 @@
+"""
+Incremental rebuild of the entry index from the markdown files on disk.
+"""
+
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+try:
+    from .db import connect, transaction
+    from .profiling import phase, traced
+    from .storage import SQLITE_BATCH_SIZE, StorageManager, TYPE_DIRECTORIES, set_body_fields, split_frontmatter
+except ImportError:
+    from db import connect, transaction
+    from profiling import phase, traced
+    from storage import SQLITE_BATCH_SIZE, StorageManager, TYPE_DIRECTORIES, set_body_fields, split_frontmatter
+
+
+ID_PATTERN = re.compile(r'^([a-z]+)-(\d+)$')
+
+# Below this many changed files, parsing inline beats process pool startup
+PARALLEL_THRESHOLD = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    entry_id TEXT
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class ReindexResult:
+    """Summary of a reindex run."""
+    scanned: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    skipped: int = 0
+    stats_repaired: bool = False
+    elapsed: float = 0.0
+
+
+def is_entry_path(rel_path: str) -> bool:
+    """Whether a path relative to the data directory names an entry file."""
+    dir_name, _, name = rel_path.partition('/')
+    return dir_name in TYPE_DIRECTORIES and name.endswith('.md') and not name.startswith('_') and '/' not in name
+
+
+def parse_entry_file(job: Tuple[str, str, Optional[str]]) -> Dict:
+    """Hash and parse one entry file (runs in a worker process).
+
+    Frontmatter is only parsed when the content hash differs from the one
+    recorded on the previous run.
+    """
+    path, rel_path, known_hash = job
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == known_hash:
+        return {'path': rel_path, 'hash': digest, 'unchanged': True}
+
+    try:
+        frontmatter, body = split_frontmatter(data.decode('utf-8'))
+    except Exception as e:
+        return {'path': rel_path, 'hash': digest, 'error': str(e)}
+    body_fields = {}
+    set_body_fields(body_fields, data)
+    return {'path': rel_path, 'hash': digest, 'frontmatter': frontmatter, 'body': body,
+            'body_fields': body_fields}
+
+
+def _isoformat(value, fallback: float) -> str:
+    """Normalize a frontmatter date to an ISO string."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).isoformat()
+    if value:
+        return str(value)
+    return datetime.fromtimestamp(fallback).isoformat()
+
+
+class Reindexer:
+    """Brings the index, full-text postings and counters in line with the files."""
+
+    def __init__(self, storage: StorageManager, workers: Optional[int] = None):
+        """Initialize reindexer."""
+        self.storage = storage
+        self.workers = workers
+        self.conn = connect(storage.scrap_dir / 'files.db')
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the file state database."""
+        self.conn.close()
+
+    def _scan(self) -> Dict[str, Tuple[str, int, int]]:
+        """Stat every entry file: rel_path -> (abs_path, mtime_ns, size)."""
+        found = {}
+        for dir_name in TYPE_DIRECTORIES:
+            dir_path = self.storage.data_dir / dir_name
+            if not dir_path.is_dir():
+                continue
+            with os.scandir(dir_path) as it:
+                for item in it:
+                    if not is_entry_path(f"{dir_name}/{item.name}"):
+                        continue
+                    st = item.stat()
+                    found[f"{dir_name}/{item.name}"] = (item.path, st.st_mtime_ns, st.st_size)
+        return found
+
+    def _build_row(self, rel_path: str, frontmatter: Dict, body: str,
+                   mtime_ns: int) -> Optional[Tuple[Dict, Dict]]:
+        """Build the index row and full-text fields for a parsed file."""
+        entry_id = str(frontmatter.get('id') or '')
+        if not ID_PATTERN.match(entry_id):
+            return None
+
+        dir_name = rel_path.split('/', 1)[0]
+        entry_type = frontmatter.get('type') or TYPE_DIRECTORIES[dir_name].value
+        title = frontmatter.get('title')
+        if not title:
+            heading = re.search(r'^# (.+)$', body, re.MULTILINE)
+            title = heading.group(1).strip() if heading else Path(rel_path).stem
+        tags = [str(tag) for tag in (frontmatter.get('tags') or [])]
+
+        row = {
+            'id': entry_id,
+            'title': str(title),
+            'type': entry_type,
+            'file_path': rel_path,
+            'tags': tags,
+            'created_date': _isoformat(frontmatter.get('date'), mtime_ns / 1e9),
+            'status': frontmatter.get('status') or 'active',
+            'context': str(frontmatter.get('context') or '')
+        }
+        if frontmatter.get('priority'):
+            row['priority'] = frontmatter['priority']
+        if frontmatter.get('category'):
+            row['category'] = str(frontmatter['category'])
+
+        fields = {
+            'title': row['title'],
+            'content': body,
+            'context': frontmatter.get('context') or '',
+            'tags': tags,
+            'category': frontmatter.get('category') or ''
+        }
+        return row, fields
+
+    def _known(self, rel_paths: Optional[List[str]] = None) -> Dict[str, Tuple[int, int, str, Optional[str]]]:
+        """Recorded file states: rel_path -> (mtime_ns, size, hash, entry_id), for all or some paths."""
+        query = 'SELECT path, mtime_ns, size, hash, entry_id FROM files'
+        if rel_paths is None:
+            return {path: tuple(state) for path, *state in self.conn.execute(query)}
+        known = {}
+        for i in range(0, len(rel_paths), SQLITE_BATCH_SIZE):
+            chunk = rel_paths[i:i + SQLITE_BATCH_SIZE]
+            known.update((path, tuple(state)) for path, *state in self.conn.execute(
+                f"{query} WHERE path IN ({','.join('?' * len(chunk))})", chunk))
+        return known
+
+    def run(self, full: bool = False) -> ReindexResult:
+        """Reindex changed files; `full` also re-reads unchanged files."""
+        result = ReindexResult()
+        started = time.perf_counter()
+
+        known = self._known()
+        full = full or not known
+        with phase('reindex.scan'):
+            found = self._scan()
+        result.scanned = len(found)
+        deleted_paths = [path for path in known if path not in found]
+
+        rows, documents, states, stale_ids = self._reconcile(found, known, full, result)
+        stale_ids.extend(known[path][3] for path in deleted_paths if known[path][3])
+
+        final_ids = {path: state[3] for path, state in known.items() if path in found}
+        final_ids.update((state[0], state[4]) for state in states)
+        current_ids = {entry_id for entry_id in final_ids.values() if entry_id}
+        if full:
+            stale_ids.extend(entry_id for entry_id in self.storage.index.all() if entry_id not in current_ids)
+        stale_ids = sorted(set(stale_ids) - current_ids)
+        result.removed = len(stale_ids)
+
+        self._apply(rows, documents, states, stale_ids, deleted_paths)
+        if rows or full:
+            self._rebuild_counters(current_ids)
+        
+        # Check the incrementally maintained stats against a full recount
+        if rows or stale_ids or full:
+            with phase('reindex.verify'):
+                result.stats_repaired = not self.storage.stats.verify(self.storage.index.all().values())
+
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def sync(self, rel_paths) -> ReindexResult:
+        """Reindex just the given files (paths relative to the data directory), e.g. after change events.
+
+        Paths that no longer exist are removed from the index. Nothing else is
+        scanned, and the statistics are not recounted.
+        """
+        result = ReindexResult()
+        started = time.perf_counter()
+
+        rel_paths = sorted({path for path in rel_paths if is_entry_path(path)})
+        known = self._known(rel_paths)
+        found = {}
+        for rel_path in rel_paths:
+            abs_path = self.storage.data_dir / rel_path
+            try:
+                st = abs_path.stat()
+            except OSError:
+                continue
+            found[rel_path] = (str(abs_path), st.st_mtime_ns, st.st_size)
+        result.scanned = len(found)
+        deleted_paths = [path for path in known if path not in found]
+
+        rows, documents, states, stale_ids = self._reconcile(found, known, False, result)
+        stale_ids.extend(known[path][3] for path in deleted_paths if known[path][3])
+
+        # An ID whose row now points at a file outside this batch moved there and stays
+        current_ids = {row['id'] for row in rows}
+        touched = set(rel_paths)
+        stale_ids = sorted(entry_id for entry_id, row in self.storage.index.get_many(
+            sorted(set(stale_ids) - current_ids)).items() if row.get('file_path') in touched)
+        result.removed = len(stale_ids)
+
+        self._apply(rows, documents, states, stale_ids, deleted_paths)
+        if rows:
+            self._rebuild_counters(current_ids)
+
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _reconcile(self, found: Dict[str, Tuple[str, int, int]], known: Dict, full: bool,
+                   result: ReindexResult) -> Tuple[List[Dict], List[Tuple], List[Tuple], List[str]]:
+        """Parse found files whose state changed into (rows, documents, file states, stale IDs)."""
+        jobs = []
+        for rel_path, (abs_path, mtime_ns, size) in found.items():
+            state = known.get(rel_path)
+            if not full and state and state[0] == mtime_ns and state[1] == size:
+                continue
+            jobs.append((abs_path, rel_path, None if full or not state else state[2]))
+
+        with phase('reindex.parse'):
+            if len(jobs) >= PARALLEL_THRESHOLD and self.workers != 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    parsed = list(pool.map(parse_entry_file, jobs, chunksize=64))
+            else:
+                parsed = [parse_entry_file(job) for job in jobs]
+
+        rows, documents, states, stale_ids = [], [], [], []
+        for item in parsed:
+            rel_path = item['path']
+            _, mtime_ns, size = found[rel_path]
+            previous_id = known.get(rel_path, (None, None, None, None))[3]
+
+            if item.get('unchanged'):
+                states.append((rel_path, mtime_ns, size, item['hash'], previous_id))
+                continue
+
+            built = None
+            if 'frontmatter' in item and isinstance(item['frontmatter'], dict):
+                built = self._build_row(rel_path, item['frontmatter'], item['body'], mtime_ns)
+            if built is None:
+                result.skipped += 1
+                states.append((rel_path, mtime_ns, size, item['hash'], None))
+                if previous_id:
+                    stale_ids.append(previous_id)
+                continue
+
+            row, fields = built
+            row.update(item['body_fields'])
+            rows.append(row)
+            documents.append((row['id'], fields))
+            states.append((rel_path, mtime_ns, size, item['hash'], row['id']))
+            if previous_id and previous_id != row['id']:
+                stale_ids.append(previous_id)
+
+        result.changed = len(rows)
+        result.unchanged = result.scanned - len(jobs) + sum(1 for item in parsed if item.get('unchanged'))
+        return rows, documents, states, stale_ids
+
+    def _apply(self, rows: List[Dict], documents: List[Tuple], states: List[Tuple], stale_ids: List[str],
+               deleted_paths: List[str]) -> None:
+        """Apply parsed rows and removals to the index as batched deltas and record the file states."""
+        if stale_ids:
+            self.storage.delete_index_rows(stale_ids)
+            self.storage.fulltext.remove_many(stale_ids)
+        if rows:
+            self.storage.upsert_index_rows(rows)
+            with phase('fulltext.add'):
+                self.storage.fulltext.add_many(documents)
+        with transaction(self.conn):
+            self.conn.executemany('DELETE FROM files WHERE path = ?', ((p,) for p in deleted_paths))
+            self.conn.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)', states)
+
+    @traced('reindex.counters')
+    def _rebuild_counters(self, entry_ids) -> None:
+        """Raise ID counters to the highest ID seen on disk."""
+        highest = {}
+        for entry_id in entry_ids:
+            match = ID_PATTERN.match(entry_id)
+            if match:
+                type_name, number = match.group(1), int(match.group(2))
+                highest[type_name] = max(highest.get(type_name, 0), number)
+
+        storage = self.storage
+        with storage.counters_lock:
+            storage._load_counters()
+            changed = False
+            for type_name, number in highest.items():
+                if number > storage.counters.get(type_name, 0):
+                    storage.counters[type_name] = number
+                    changed = True
+            if changed:
+                storage._save_counters()
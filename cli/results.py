@@ -0,0 +1,150 @@
+"""
+Machine-readable result output and opaque paging cursors for search and list.
+
+Records are written one at a time as the result pipeline produces them, so
+the first lines appear before a long scan finishes and memory stays flat:
+
+    jsonl  one JSON object per line
+    json   {"results": [...], "next_cursor": ...}, written incrementally
+    tsv    a header line, then one tab-separated line per entry
+
+Every record carries the cursor that resumes right after it. A cursor holds
+the result order, the sort key of that entry and a fingerprint of the
+command and its filters, so paging is a keyset seek rather than an offset
+and a cursor cannot be replayed against a different query.
+"""
+
+import base64
+import hashlib
+import json
+import sys
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+FORMATS = ('text', 'jsonl', 'json', 'tsv')
+
+# Fields of every record, in TSV column order (score, snippet and cursor follow)
+RECORD_FIELDS = ('id', 'type', 'title', 'status', 'priority', 'category', 'created_date', 'tags', 'file_path')
+
+# Result orders: newest first by (created_date, id), or by (score desc, id)
+NEWEST = 'newest'
+RANK = 'rank'
+
+CURSOR_VERSION = 1
+
+# Records written between flushes; the first record is flushed at once
+FLUSH_EVERY = 256
+
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+class CursorError(ValueError):
+    """A cursor that is malformed or was issued for a different query."""
+
+
+def fingerprint(*parts) -> str:
+    """Short stable digest of a command and its filters."""
+    return hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()[:12]
+
+
+def encode_cursor(scope: str, order: str, key: Tuple) -> str:
+    """Opaque token resuming `order` after `key` for the query with fingerprint `scope`."""
+    payload = json.dumps([CURSOR_VERSION, scope, order, list(key)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, scope: str) -> Tuple[str, Tuple]:
+    """Return the (order, key) of a cursor issued for `scope`."""
+    try:
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        version, token_scope, order, key = json.loads(payload)
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor") from None
+    if version != CURSOR_VERSION or order not in (NEWEST, RANK) or not isinstance(key, list) or len(key) != 2:
+        raise CursorError("Invalid cursor")
+    if token_scope != scope:
+        raise CursorError("Cursor was issued for a different query or filters")
+    return order, tuple(key)
+
+
+def position(order: str, row: Dict, score: Optional[float]) -> Tuple:
+    """Sort key of a result in `order`, as stored in cursors."""
+    if order == RANK:
+        return (score, row['id'])
+    return (row['created_date'], row['id'])
+
+
+def is_after(order: str, key: Tuple, cursor_key: Tuple) -> bool:
+    """Whether a result with sort key `key` comes after the cursor position."""
+    if order == RANK:
+        return key[0] < cursor_key[0] or (key[0] == cursor_key[0] and key[1] > cursor_key[1])
+    return key < cursor_key
+
+
+def cursor_key(order: str, after: Optional[Tuple[str, Tuple]]) -> Optional[Tuple]:
+    """Key to resume after from a decoded cursor, checking it was issued for `order`."""
+    if after is None:
+        return None
+    if after[0] != order:
+        raise CursorError("Cursor was issued for a different query or filters")
+    return after[1]
+
+
+def to_record(row: Dict, score: Optional[float] = None, snippet: Optional[str] = None,
+              cursor: Optional[str] = None) -> Dict:
+    """Public fields of an index row as a flat record."""
+    record = {field: row.get(field) for field in RECORD_FIELDS}
+    record['status'] = record['status'] or 'active'
+    record['tags'] = list(row.get('tags') or [])
+    if score is not None:
+        record['score'] = round(score, 6)
+    if snippet is not None:
+        record['snippet'] = snippet
+    record['cursor'] = cursor
+    return record
+
+
+def _tsv_value(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        value = ','.join(value)
+    return str(value).translate(TSV_ESCAPES)
+
+
+def write_records(records: Iterable[Dict], fmt: str, out=None,
+                  next_cursor: Optional[Callable[[], Optional[str]]] = None) -> int:
+    """Write records as they arrive in jsonl, json or tsv; returns the number written.
+
+    `next_cursor` is called once the records are exhausted for the json
+    document's "next_cursor" (default: the last record's cursor).
+    """
+    out = out or sys.stdout
+    count = 0
+    last_cursor = None
+    columns = None
+    if fmt == 'json':
+        out.write('{"results": [')
+
+    for record in records:
+        if fmt == 'jsonl':
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        elif fmt == 'json':
+            out.write(('\n  ' if count == 0 else ',\n  ') + json.dumps(record, ensure_ascii=False))
+        else:
+            if columns is None:
+                columns = list(record)
+                out.write('\t'.join(columns) + '\n')
+            out.write('\t'.join(_tsv_value(record.get(column)) for column in columns) + '\n')
+        count += 1
+        last_cursor = record.get('cursor')
+        if count == 1 or count % FLUSH_EVERY == 0:
+            out.flush()
+
+    if fmt == 'json':
+        last_cursor = next_cursor() if next_cursor else last_cursor
+        out.write(('\n' if count else '') + '], "next_cursor": ' + json.dumps(last_cursor) + '}\n')
+    elif fmt == 'tsv' and columns is None:
+        out.write('\t'.join(RECORD_FIELDS + ('cursor',)) + '\n')
+    out.flush()
+    return count
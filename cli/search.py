@@ -2,15 +2,24 @@
 Search and listing functionality for scrapbook entries.
 """
 
-from typing import List, Dict, Optional
+import heapq
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import List, Dict, Iterator, Optional, Set, Tuple
 try:
     from .models import EntryType
     from .storage import StorageManager
     from .config import Config
+    from .profiling import traced
+    from .query import And, Not, PlanStep, QueryPlanner, make_term, parse_query, parse_time_bound
+    from .results import NEWEST, RANK, cursor_key, is_after
 except ImportError:
     from models import EntryType
     from storage import StorageManager
     from config import Config
+    from profiling import traced
+    from query import And, Not, PlanStep, QueryPlanner, make_term, parse_query, parse_time_bound
+    from results import NEWEST, RANK, cursor_key, is_after
 
 
 class SearchEngine:
@@ -21,15 +30,178 @@ class SearchEngine:
         self.config = config
         self.storage = storage
     
+    @traced('search.match')
     def search(self, query: str, entry_type: Optional[EntryType] = None,
-               tags: Optional[List[str]] = None, limit: int = None) -> List[Dict]:
-        """Search entries with query and filters."""
+               tags: Optional[List[str]] = None, limit: int = None,
+               all_tags: Optional[List[str]] = None,
+               exclude_tags: Optional[List[str]] = None,
+               fuzzy: Optional[bool] = None) -> List[Dict]:
+        """Search entries with query and filters.
+        
+        `tags` keeps entries having any of the tags, `all_tags` those having
+        every tag and `exclude_tags` drops entries having any of them.
+        `fuzzy=True` matches title and tag words with typos, `False` only
+        exact terms; the default falls back to fuzzy matching when there
+        are no exact hits.
+        """
+        if fuzzy:
+            return self.search_fuzzy(query, entry_type, tags, limit, all_tags, exclude_tags)
+        
+        results = self._search_exact(query, entry_type, tags, limit, all_tags, exclude_tags)
+        if not results and fuzzy is None and query and query.strip():
+            results = self.search_fuzzy(query, entry_type, tags, limit, all_tags, exclude_tags)
+        return results
+    
+    @traced('search.query')
+    def query(self, text: str, entry_type: Optional[EntryType] = None,
+              tags: Optional[List[str]] = None, limit: int = None,
+              all_tags: Optional[List[str]] = None,
+              exclude_tags: Optional[List[str]] = None) -> Tuple[List[Dict], List[PlanStep]]:
+        """Run a structured query such as `type:todo tag:infra -tag:done "rate limit"`.
+        
+        The type and tag options are added as extra conjuncts. Returns the
+        results and the executed plan; raises QueryError for bad syntax.
+        """
         if limit is None:
             limit = self.config.get('max_search_results', 50)
         
-        results = self.storage.search_entries(query, entry_type, tags)
-        return results[:limit]
+        node = self._query_node(text, entry_type, tags, all_tags, exclude_tags)
+        return QueryPlanner(self.storage).execute(node, limit)
+    
+    def _query_node(self, text: str, entry_type: Optional[EntryType], tags: Optional[List[str]],
+                    all_tags: Optional[List[str]], exclude_tags: Optional[List[str]]) -> And:
+        """Parse a structured query and add the type and tag options as conjuncts."""
+        parts = [parse_query(text)]
+        if entry_type:
+            parts.append(make_term('type', '', entry_type.value))
+        if tags:
+            parts.append(make_term('tag', '', ','.join(tags)))
+        parts.extend(make_term('tag', '', tag) for tag in all_tags or [])
+        if exclude_tags:
+            parts.append(Not(make_term('tag', '', ','.join(exclude_tags))))
+        return And(tuple(parts))
+    
+    @traced('search.query')
+    def stream_query(self, text: str, entry_type: Optional[EntryType] = None,
+                     tags: Optional[List[str]] = None, all_tags: Optional[List[str]] = None,
+                     exclude_tags: Optional[List[str]] = None, after: Optional[Tuple[str, Tuple]] = None
+                     ) -> Tuple[str, Iterator[Tuple[Dict, Optional[float]]], List[PlanStep]]:
+        """Run a structured query for paging: (order, iterator of (row, score), plan steps).
+        
+        `after` is a decoded cursor; only results after it are produced.
+        """
+        node = self._query_node(text, entry_type, tags, all_tags, exclude_tags)
+        order, hits, steps = QueryPlanner(self.storage).rank(node, after)
+        return order, iter(hits), steps
+    
+    def stream_search(self, query: str, entry_type: Optional[EntryType] = None,
+                      tags: Optional[List[str]] = None, all_tags: Optional[List[str]] = None,
+                      exclude_tags: Optional[List[str]] = None, fuzzy: Optional[bool] = None,
+                      after: Optional[Tuple[str, Tuple]] = None
+                      ) -> Tuple[str, Iterator[Tuple[Dict, Optional[float]]]]:
+        """Search results as a lazy stream: (order, iterator of (row, score)).
+        
+        Takes the same filters as search(), without a limit. Unlike search(),
+        every match is ranked (no champion lists) so deep pages are exact,
+        and rows are loaded in chunks as the iterator is consumed. `after` is
+        a decoded cursor; only results after it are produced.
+        """
+        allowed = self._allowed_ids(tags, all_tags, exclude_tags)
+        
+        if not query or not query.strip():
+            resume = cursor_key(NEWEST, after)
+            if allowed is None:
+                rows = self.storage.iter_entries(entry_type, after=resume)
+            else:
+                rows = [row for row in self.storage.index.get_many(list(allowed)).values()
+                        if (not entry_type or row['type'] == entry_type.value)
+                        and (resume is None or (row['created_date'], row['id']) < resume)]
+                rows.sort(key=lambda row: (row['created_date'], row['id']), reverse=True)
+            return NEWEST, ((row, None) for row in rows)
+        
+        resume = cursor_key(RANK, after)
+        ranked = [] if fuzzy else self.storage.fulltext.search(query)[0]
+        # Fall back to fuzzy matching, as search() does, when no exact hit passes the filters
+        if fuzzy or (fuzzy is None and next(self._iter_ranked(ranked, entry_type, allowed), None) is None):
+            ranked = self.storage.fuzzy.search(query)
+        if resume is not None:
+            ranked = [(entry_id, score) for entry_id, score in ranked
+                      if is_after(RANK, (score, entry_id), resume)]
+        return RANK, self._iter_ranked(ranked, entry_type, allowed)
+    
+    @traced('search.fuzzy')
+    def search_fuzzy(self, query: str, entry_type: Optional[EntryType] = None,
+                     tags: Optional[List[str]] = None, limit: int = None,
+                     all_tags: Optional[List[str]] = None,
+                     exclude_tags: Optional[List[str]] = None) -> List[Dict]:
+        """Typo-tolerant search over title and tag words via the trigram index."""
+        if limit is None:
+            limit = self.config.get('max_search_results', 50)
+        
+        allowed = self._allowed_ids(tags, all_tags, exclude_tags)
+        return self._filter_ranked(self.storage.fuzzy.search(query), entry_type, allowed, limit)
+    
+    def _allowed_ids(self, tags: Optional[List[str]], all_tags: Optional[List[str]],
+                     exclude_tags: Optional[List[str]]) -> Optional[Set[str]]:
+        """IDs passing the tag filters, or None when there are no tag filters."""
+        if tags or all_tags or exclude_tags:
+            return self.storage.tags.match(any_of=tags, all_of=all_tags, none_of=exclude_tags)
+        return None
     
+    def _search_exact(self, query: str, entry_type: Optional[EntryType],
+                      tags: Optional[List[str]], limit: Optional[int],
+                      all_tags: Optional[List[str]], exclude_tags: Optional[List[str]]) -> List[Dict]:
+        """BM25 search over exact and prefix term matches."""
+        if limit is None:
+            limit = self.config.get('max_search_results', 50)
+        
+        # Resolve tag filters to a set of IDs once, from the tag posting lists
+        allowed = self._allowed_ids(tags, all_tags, exclude_tags)
+        
+        if not query or not query.strip():
+            if allowed is None:
+                return self.storage.search_entries(query, entry_type, None, limit)
+            entries = [e for e in self.storage.index.get_many(list(allowed)).values()
+                       if not entry_type or e['type'] == entry_type.value]
+            entries.sort(key=lambda x: x['created_date'], reverse=True)
+            return entries[:limit]
+        
+        # Rank with BM25 over the full-text postings, then apply filters
+        ranked, truncated = self.storage.fulltext.search(query, limit)
+        results = self._filter_ranked(ranked, entry_type, allowed, limit)
+        
+        # Champion lists can miss deeper hits that selective filters need
+        if truncated and len(results) < limit:
+            ranked, _ = self.storage.fulltext.search(query)
+            results = self._filter_ranked(ranked, entry_type, allowed, limit)
+        
+        return results
+    
+    def _filter_ranked(self, ranked: List, entry_type: Optional[EntryType],
+                       allowed: Optional[Set[str]], limit: int) -> List[Dict]:
+        """Load index rows for ranked IDs and apply type/tag filters, up to limit."""
+        hits = self._iter_ranked(ranked, entry_type, allowed, chunk_size=max(limit * 2, 50))
+        return [entry for entry, _ in islice(hits, limit)]
+    
+    def _iter_ranked(self, ranked: List, entry_type: Optional[EntryType], allowed: Optional[Set[str]],
+                     chunk_size: int = 200) -> Iterator[Tuple[Dict, float]]:
+        """Yield (row, score) for ranked (id, score) pairs in order, applying type/tag filters."""
+        ranked = [(entry_id, score) for entry_id, score in ranked
+                  if allowed is None or entry_id in allowed]
+        
+        # Fetch rows in ranked chunks so only the hits consumed are ever loaded
+        for start in range(0, len(ranked), chunk_size):
+            chunk = ranked[start:start + chunk_size]
+            index = self.storage.index.get_many([entry_id for entry_id, _ in chunk])
+            for entry_id, score in chunk:
+                entry = index.get(entry_id)
+                if entry is None:
+                    continue
+                if entry_type and entry['type'] != entry_type.value:
+                    continue
+                yield entry, score
+    
+    @traced('search.list')
     def list_by_type(self, entry_type: EntryType, limit: int = None) -> List[Dict]:
         """List entries by type."""
         if limit is None:
@@ -37,37 +209,70 @@ class SearchEngine:
         
         return self.storage.list_entries(entry_type, limit)
     
+    @traced('search.list')
     def list_recent(self, days: int = 7, limit: int = None) -> List[Dict]:
         """List recent entries from the last N days."""
+        return self.list_window(since=datetime.now() - timedelta(days=days), limit=limit)
+    
+    @traced('search.list')
+    def list_window(self, entry_type: Optional[EntryType] = None, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, windows: Optional[Dict[EntryType, datetime]] = None,
+                    limit: int = None) -> List[Dict]:
+        """List entries newest first, created in [since, until).
+        
+        `windows` maps entry types to their own `since`, overriding the shared
+        one for that type (e.g. todos from the last 30 days, journal entries
+        from the last 7).
+        """
         if limit is None:
             limit = self.config.get('max_search_results', 50)
         
-        from datetime import datetime, timedelta
-        cutoff_date = datetime.now() - timedelta(days=days)
+        until_iso = until.isoformat() if until else None
+        if not windows:
+            return self.storage.list_entries(entry_type, limit, since.isoformat() if since else None, until_iso)
+        
+        # One range query per type, merged newest first
+        results = []
+        for each_type in ([entry_type] if entry_type else list(EntryType)):
+            type_since = windows.get(each_type, since)
+            results.extend(self.storage.list_entries(
+                each_type, limit, type_since.isoformat() if type_since else None, until_iso
+            ))
+        results.sort(key=lambda x: x['created_date'], reverse=True)
+        return results[:limit]
+    
+    def stream_list(self, entry_type: Optional[EntryType] = None, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, windows: Optional[Dict[EntryType, datetime]] = None,
+                    after: Optional[Tuple[str, Tuple]] = None) -> Iterator[Dict]:
+        """Lazy, unlimited list_window(), resuming after a decoded cursor.
         
-        all_entries = self.storage.list_entries(limit=1000)  # Get more to filter
-        recent = [e for e in all_entries 
-                 if datetime.fromisoformat(e['created_date']) > cutoff_date]
+        Per-type windows are merged from one ordered index scan per type.
+        """
+        resume = cursor_key(NEWEST, after)
+        until_iso = until.isoformat() if until else None
+        if not windows:
+            return self.storage.iter_entries(entry_type, since.isoformat() if since else None, until_iso, resume)
         
-        return recent[:limit]
+        scans = []
+        for each_type in ([entry_type] if entry_type else list(EntryType)):
+            type_since = windows.get(each_type, since)
+            scans.append(self.storage.iter_entries(
+                each_type, type_since.isoformat() if type_since else None, until_iso, resume
+            ))
+        return heapq.merge(*scans, key=lambda row: (row['created_date'], row['id']), reverse=True)
     
+    @traced('search.tag_stats')
     def get_tag_statistics(self) -> Dict[str, int]:
         """Get tag usage statistics."""
-        index = self.storage._load_index()
-        tag_counts = {}
-        
-        for entry in index.values():
-            for tag in entry.get('tags', []):
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # Sort by frequency
-        return dict(sorted(tag_counts.items(), key=lambda x: x[1], reverse=True))
+        # Sorted by frequency, maintained incrementally by the tag index
+        return self.storage.tags.counts()
     
+    @traced('search.stats')
     def get_statistics(self) -> Dict[str, int]:
         """Get general statistics about entries."""
-        index = self.storage._load_index()
+        aggregates = self.storage.stats
         stats = {
-            'total_entries': len(index),
+            'total_entries': aggregates.total(),
             'ideas': 0,
             'prompts': 0,
             'todos': 0,
@@ -77,12 +282,54 @@ class SearchEngine:
             'completed_todos': 0
         }
         
-        for entry in index.values():
-            entry_type = entry['type']
-            stats[entry_type + 's'] = stats.get(entry_type + 's', 0) + 1
-            
+        for entry_type, count in aggregates.counts('type').items():
+            stats[entry_type + 's'] = count
+        
+        for key, count in aggregates.counts('type_status').items():
+            entry_type, status = key.split('/', 1)
             if entry_type == 'todo':
-                status = entry.get('status', 'active')
-                stats[f"{status}_todos"] = stats.get(f"{status}_todos", 0) + 1
+                stats[f"{status}_todos"] = count
+        
+        for priority, count in aggregates.counts('priority').items():
+            stats[f"{priority}_priority"] = count
+        
+        return stats
+    
+    @traced('search.histogram')
+    def get_histogram(self, bucket: str = 'day', entry_type: Optional[EntryType] = None,
+                      buckets: int = 12) -> List[Tuple[str, int]]:
+        """Entries created per day, week or month for the last N buckets up to now."""
+        if entry_type:
+            prefix = entry_type.value + '/'
+            days = {key[len(prefix):]: count for key, count
+                    in self.storage.stats.counts('type_day').items() if key.startswith(prefix)}
+        else:
+            days = self.storage.stats.counts('day')
+        
+        totals = {}
+        for day, count in days.items():
+            try:
+                label = _bucket_label(date.fromisoformat(day), bucket)
+            except ValueError:
+                continue
+            totals[label] = totals.get(label, 0) + count
+        
+        labels = []
+        current = date.today()
+        while len(labels) < buckets:
+            label = _bucket_label(current, bucket)
+            if not labels or labels[-1] != label:
+                labels.append(label)
+            current -= timedelta(days=1)
         
-        return stats
\ No newline at end of file
+        return [(label, totals.get(label, 0)) for label in reversed(labels)]
+
+
+def _bucket_label(day: date, bucket: str) -> str:
+    """Histogram label of the day, ISO week or month containing a date."""
+    if bucket == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if bucket == 'month':
+        return f"{day:%Y-%m}"
+    return day.isoformat()
@@ -0,0 +1,64 @@
+"""
+Registry of the next free filename suffix per directory and base slug.
+"""
+
+from pathlib import Path
+try:
+    from .db import connect, transaction
+except ImportError:
+    from db import connect, transaction
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slugs (
+    directory TEXT NOT NULL,
+    base TEXT NOT NULL,
+    next_suffix INTEGER NOT NULL,
+    PRIMARY KEY (directory, base)
+) WITHOUT ROWID;
+"""
+
+
+def slug_filename(base: str, suffix: int) -> str:
+    """Markdown filename for a base slug and suffix (0 means no suffix)."""
+    return f"{base}.md" if suffix == 0 else f"{base}_{suffix}.md"
+
+
+class SlugRegistry:
+    """Hands out unique entry filenames without probing every earlier duplicate.
+
+    For each (directory, base slug) the registry remembers the next suffix to
+    try. A claim checks that one candidate and only advances further when a
+    file was created outside the CLI, so duplicates cost a single stat.
+    """
+
+    def __init__(self, db_path: Path):
+        """Open (or create) the registry database."""
+        self.db_path = db_path
+        self.conn = connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def claim(self, dir_path: Path, base: str) -> Path:
+        """Reserve and return a free file path for `base` in `dir_path`."""
+        directory = dir_path.name
+        with transaction(self.conn):
+            row = self.conn.execute(
+                'SELECT next_suffix FROM slugs WHERE directory = ? AND base = ?',
+                (directory, base)
+            ).fetchone()
+            suffix = row[0] if row else 0
+
+            file_path = dir_path / slug_filename(base, suffix)
+            while file_path.exists():
+                suffix += 1
+                file_path = dir_path / slug_filename(base, suffix)
+
+            self.conn.execute(
+                'INSERT OR REPLACE INTO slugs (directory, base, next_suffix) VALUES (?, ?, ?)',
+                (directory, base, suffix + 1)
+            )
+        return file_path
@@ -2,34 +2,331 @@
 File storage management for scrapbook entries.
 """
 
+import atexit
 import json
-import yaml
+import mmap
+import os
 import re
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 try:
     from .models import ScrapEntry, EntryType
     from .config import Config
+    from .aggregates import StatsAggregates
+    from .binindex import BinaryIndex, BinaryIndexError, updated_rows, write_index
+    from .columnar import ColumnarIndex
+    from .db import connect, transaction
+    from .frontmatter import dump_frontmatter, load_frontmatter
+    from .fulltext import FullTextIndex
+    from .fuzzy import FuzzyIndex
+    from .locking import FileLock, atomic_write_text, fsync_paths
+    from .profiling import phase, traced
+    from .slugs import SlugRegistry
+    from .tags import TagIndex
 except ImportError:
     from models import ScrapEntry, EntryType
     from config import Config
+    from aggregates import StatsAggregates
+    from binindex import BinaryIndex, BinaryIndexError, updated_rows, write_index
+    from columnar import ColumnarIndex
+    from db import connect, transaction
+    from frontmatter import dump_frontmatter, load_frontmatter
+    from fulltext import FullTextIndex
+    from fuzzy import FuzzyIndex
+    from locking import FileLock, atomic_write_text, fsync_paths
+    from profiling import phase, traced
+    from slugs import SlugRegistry
+    from tags import TagIndex
+
+
+# Index columns usable in IndexBackend.ids_where(), with the value assumed when missing
+FILTER_COLUMNS = {
+    'type': None,
+    'status': 'active',
+    'priority': None,
+    'created_date': None
+}
+
+# Blank lines and the "# Title" heading that open an entry body
+BODY_HEADING = re.compile(rb'(?:[ \t]*\n)*# [^\n]*\n(?:[ \t]*\n)*')
+
+# Characters kept in the snippet stored with each index row
+SNIPPET_LENGTH = 160
+
+# A top-level "key:" line in a YAML frontmatter block
+FRONTMATTER_KEY = re.compile(r'([A-Za-z_][\w-]*):(?:\s|$)')
+
+# Entry directories and the type their files default to
+TYPE_DIRECTORIES = {
+    'ideas': EntryType.IDEA,
+    'prompts': EntryType.PROMPT,
+    'todos': EntryType.TODO,
+    'journal': EntryType.JOURNAL,
+    'workflows': EntryType.WORKFLOW
+}
+
+
+# Shard for rows whose created_date does not start with YYYY-MM
+UNDATED_SHARD = 'undated'
+
+SHARD_MONTH = re.compile(r'\d{4}-\d{2}')
+
+SHARD_MANIFEST_VERSION = 1
+
+# When entry files and the ID counters are flushed to disk (the fsync setting):
+# never (left to the OS), batch (before each index commit) or always (as each
+# file is written)
+FSYNC_POLICIES = ('never', 'batch', 'always')
+
+
+def shard_month(created_date: str) -> str:
+    """Creation month ('YYYY-MM') an index row is sharded under."""
+    return created_date[:7] if SHARD_MONTH.match(created_date or '') else UNDATED_SHARD
+
+
+def split_frontmatter(text: str) -> tuple[Dict, str]:
+    """Split markdown text into its YAML frontmatter dict and body."""
+    if text.startswith('---\n'):
+        end = text.find('\n---\n', 4)
+        if end != -1:
+            return load_frontmatter(text[4:end + 1]), text[end + 5:]
+    return {}, text
+
+
+def body_span(data: bytes) -> Tuple[int, int]:
+    """Byte range of an entry's body: after the frontmatter block and title heading, to the end."""
+    start = 0
+    if data.startswith(b'---\n'):
+        end = data.find(b'\n---\n', 4)
+        if end != -1:
+            start = end + 5
+    heading = BODY_HEADING.match(data, start)
+    if heading:
+        start = heading.end()
+    return start, len(data)
+
+
+def set_body_fields(row: Dict, data: bytes) -> None:
+    """Store the body offsets and snippet of an entry file's bytes in its index row."""
+    start, end = body_span(data)
+    row['body_start'], row['body_end'] = start, end
+    row['snippet'] = make_snippet(data[start:end].decode('utf-8', errors='replace'))
+
+
+def make_snippet(body: str, length: int = SNIPPET_LENGTH) -> str:
+    """Short single-line preview of an entry body, without the Context/Tags sections."""
+    for section in ('\n## Context\n', '\n## Tags\n'):
+        cut = body.find(section)
+        if cut != -1:
+            body = body[:cut]
+    text = ' '.join(body.split())
+    return text if len(text) <= length else text[:length - 1].rstrip() + '…'
+
+
+@lru_cache(maxsize=256)
+def _dump_frontmatter_key(key: str, value) -> str:
+    """YAML for a single frontmatter key; lists are passed as tuples so they can be cached."""
+    return dump_frontmatter({key: list(value) if isinstance(value, tuple) else value})
+
+
+def patch_frontmatter(text: str, values: Dict) -> str:
+    """Set top-level frontmatter keys in markdown text, leaving every other byte as is.
+    
+    Each key's YAML is replaced in place (or inserted in sorted position, as
+    yaml.dump would order it); the body is never parsed or re-rendered.
+    """
+    end = text.find('\n---\n', 4) if text.startswith('---\n') else -1
+    if end == -1:
+        raise ValueError("No frontmatter block")
+    
+    # Split the block into one chunk per top-level key; indented and "- "
+    # lines continue the previous key
+    keys: List[Optional[str]] = []
+    chunks: List[str] = []
+    for line in text[4:end + 1].splitlines(keepends=True):
+        match = FRONTMATTER_KEY.match(line)
+        if match or not chunks:
+            keys.append(match.group(1) if match else None)
+            chunks.append(line)
+        else:
+            chunks[-1] += line
+    
+    for key, value in values.items():
+        # Bulk updates set the same values on every entry; render them once
+        rendered = _dump_frontmatter_key(key, tuple(value) if isinstance(value, list) else value)
+        if key in keys:
+            chunks[keys.index(key)] = rendered
+        else:
+            at = next((i for i, k in enumerate(keys) if k is not None and k > key), len(keys))
+            keys.insert(at, key)
+            chunks.insert(at, rendered)
+    
+    return '---\n' + ''.join(chunks) + text[end + 1:]
+
+
+class WriteBatch:
+    """Entries written by a batch or write-behind queue whose index updates are pending."""
+    
+    def __init__(self, max_entries: int, max_delay_ms: float):
+        """Initialize an empty queue that falls due at `max_entries` entries or `max_delay_ms`."""
+        self.max_entries = max(1, max_entries)
+        self.max_delay = max_delay_ms / 1000
+        self.pending: List[Tuple[ScrapEntry, Path, str]] = []
+        self.oldest: Optional[float] = None
+        # Reserved IDs not handed out yet, per type, highest first
+        self.ids: Dict[EntryType, List[str]] = {}
+    
+    def add(self, entry: ScrapEntry, file_path: Path, content: str) -> None:
+        """Queue an entry whose file has been written."""
+        if not self.pending:
+            self.oldest = time.monotonic()
+        self.pending.append((entry, file_path, content))
+    
+    def due(self) -> bool:
+        """Whether the queue is full or its oldest entry has waited long enough."""
+        return bool(self.pending) and (len(self.pending) >= self.max_entries or
+                                       time.monotonic() - self.oldest >= self.max_delay)
+    
+    def take(self) -> List[Tuple[ScrapEntry, Path, str]]:
+        """Remove and return the queued entries."""
+        pending, self.pending = self.pending, []
+        self.oldest = None
+        return pending
 
 
 class StorageManager:
     """Manages file storage for scrapbook entries."""
     
+    @traced('storage.init')
     def __init__(self, config: Config):
         """Initialize storage manager."""
         self.config = config
         self.data_dir = config.get_data_dir()
         self.scrap_dir = self.data_dir / '.scrap'
         self.index_file = self.scrap_dir / 'index.json'
+        self.index_db_file = self.scrap_dir / 'index.db'
+        self.index_bin_file = self.scrap_dir / 'index.bin'
+        self.index_state_file = self.scrap_dir / 'index_state.json'
         self.counters_file = self.scrap_dir / 'counters.json'
+        self.search_db_file = self.scrap_dir / 'search.db'
+        self.tags_db_file = self.scrap_dir / 'tags.db'
+        self.stats_db_file = self.scrap_dir / 'stats.db'
+        self.fuzzy_db_file = self.scrap_dir / 'fuzzy.db'
+        self.counters_lock = FileLock(self.scrap_dir / 'counters.lock')
+        self._slugs = None
+        self._fulltext = None
+        self._tags = None
+        self._stats = None
+        self._fuzzy = None
+        self._index = None
+        self._batch: Optional[WriteBatch] = None
+        self.fsync_policy = config.get('fsync', 'never')
+        if self.fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {self.fsync_policy} "
+                             f"(expected one of: {', '.join(FSYNC_POLICIES)})")
+        
+        # Create directory structure on first use only; counters are read
+        # under the counters lock when IDs are reserved
+        if not self.scrap_dir.exists():
+            self._init_directories()
+    
+    @property
+    def index(self) -> 'IndexBackend':
+        """Index backend, opened on first use."""
+        if self._index is None:
+            self._index = self._open_index_backend()
+        return self._index
+    
+    @traced('index.open')
+    def _open_index_backend(self) -> 'IndexBackend':
+        """Open the index backend selected by the index_backend setting.
+        
+        The backend last written through, which the tag, stats, trigram and
+        full-text databases follow, is recorded in index_state.json. When the
+        setting has changed since, the new backend's files are stale (or
+        missing), so they are first replaced with the rows of that backend.
+        """
+        backend = self.config.get('index_backend', 'sqlite')
+        if backend not in INDEX_BACKENDS:
+            raise ValueError(f"Unknown index backend: {backend} (expected one of: {', '.join(INDEX_BACKENDS)})")
+        lock = FileLock(self.scrap_dir / 'index.lock')
+        if self._recorded_index_backend() == backend:
+            return self._index_backend(backend, lock)
         
-        # Create directory structure
-        self._init_directories()
-        self._load_counters()
+        with lock:
+            previous = self._recorded_index_backend() or self._newest_index_backend()
+            index = self._index_backend(backend, lock)
+            if previous is not None and previous != backend:
+                with phase('index.migrate'):
+                    self._migrate_index(self._index_backend(previous, lock), index)
+            try:
+                atomic_write_text(self.index_state_file, json.dumps({'backend': backend}))
+            except OSError as e:
+                print(f"Warning: Could not record the index backend: {e}")
+        return index
+    
+    def _index_backend(self, backend: str, lock: FileLock) -> 'IndexBackend':
+        """Open one index backend's files under .scrap/."""
+        if backend == 'json':
+            return JsonIndexBackend(self.index_file, lock)
+        if backend == 'sharded':
+            return ShardedIndexBackend(self.scrap_dir / 'shards', lock)
+        if backend == 'binary':
+            return BinaryIndexBackend(self.index_bin_file, lock)
+        return SqliteIndexBackend(self.index_db_file)
+    
+    def _index_backend_files(self) -> Dict[str, List[Path]]:
+        """Files each backend rewrites on every index write."""
+        return {
+            'json': [self.index_file],
+            'sharded': [self.scrap_dir / 'shards' / 'manifest.json'],
+            'binary': [self.index_bin_file],
+            'sqlite': [self.index_db_file, self.scrap_dir / 'index.db-wal']
+        }
+    
+    def _recorded_index_backend(self) -> Optional[str]:
+        """Backend recorded as last written through, or None."""
+        try:
+            with open(self.index_state_file, 'r') as f:
+                backend = json.load(f).get('backend')
+        except (OSError, ValueError, AttributeError):
+            return None
+        return backend if backend in INDEX_BACKENDS else None
+    
+    def _newest_index_backend(self) -> Optional[str]:
+        """Backend whose files were written last, for scrapbooks from before index_state.json."""
+        newest, newest_mtime = None, None
+        for backend, paths in self._index_backend_files().items():
+            for path in paths:
+                try:
+                    mtime = path.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if newest_mtime is None or mtime > newest_mtime:
+                    newest, newest_mtime = backend, mtime
+        return newest
+    
+    def _migrate_index(self, source: 'IndexBackend', target: 'IndexBackend') -> None:
+        """Make `target` hold exactly the rows of `source`, and check the derived databases against them."""
+        rows = source.all()
+        source.close()
+        target.replace_all(rows)
+        if not self.stats_db_file.exists():
+            return
+        # The derived databases should already match the source; if the
+        # counts say otherwise, rebuild what can be rebuilt from the index
+        if not self.stats.verify(rows.values()):
+            for db_file in (self.tags_db_file, self.fuzzy_db_file):
+                for path in (db_file, Path(f"{db_file}-wal"), Path(f"{db_file}-shm")):
+                    path.unlink(missing_ok=True)
+            print("Warning: Tag, trigram and statistics indexes did not match the index and were rebuilt; "
+                  "run `scrap reindex --full` to rebuild full-text search")
     
     def _init_directories(self) -> None:
         """Initialize directory structure."""
@@ -78,17 +375,57 @@ class StorageManager:
     def _save_counters(self) -> None:
         """Save ID counters to file."""
         try:
-            with open(self.counters_file, 'w') as f:
-                json.dump(self.counters, f, indent=2)
+            atomic_write_text(self.counters_file, json.dumps(self.counters, indent=2),
+                              sync=self.fsync_policy != 'never')
         except Exception as e:
             print(f"Warning: Could not save counters: {e}")
     
     def _get_next_id(self, entry_type: EntryType) -> str:
         """Get next available ID for entry type."""
-        type_name = entry_type.value
-        self.counters[type_name] += 1
-        self._save_counters()
-        return f"{type_name}-{self.counters[type_name]:03d}"
+        return self.reserve_ids({entry_type: 1})[entry_type][0]
+    
+    def reserve_ids(self, counts: Dict[EntryType, int]) -> Dict[EntryType, List[str]]:
+        """Reserve consecutive IDs for several entry types with one counter write.
+        
+        Counters are re-read under the counters lock, so concurrent scrap
+        processes never hand out the same ID.
+        """
+        reserved = {}
+        with self.counters_lock:
+            self._load_counters()
+            for entry_type, count in counts.items():
+                type_name = entry_type.value
+                start = self.counters[type_name] + 1
+                self.counters[type_name] += count
+                reserved[entry_type] = [f"{type_name}-{n:03d}" for n in range(start, start + count)]
+            self._save_counters()
+        return reserved
+    
+    def _release_ids(self, unused: Dict[EntryType, List[str]]) -> None:
+        """Hand back reserved IDs that were never used, unless IDs were reserved after them.
+        
+        Each list holds the unused end of one consecutive reservation.
+        """
+        unused = {entry_type: ids for entry_type, ids in unused.items() if ids}
+        if not unused:
+            return
+        with self.counters_lock:
+            self._load_counters()
+            released = False
+            for entry_type, ids in unused.items():
+                numbers = sorted(int(entry_id.rsplit('-', 1)[1]) for entry_id in ids)
+                if self.counters[entry_type.value] == numbers[-1]:
+                    self.counters[entry_type.value] = numbers[0] - 1
+                    released = True
+            if released:
+                self._save_counters()
+    
+    @property
+    def slugs(self) -> SlugRegistry:
+        """Filename slug registry, opened on first use."""
+        if self._slugs is None:
+            self._slugs = SlugRegistry(self.scrap_dir / 'slugs.db')
+        return self._slugs
     
     def _title_to_snake_case(self, title: str) -> str:
         """Convert title to snake_case filename."""
@@ -114,10 +451,6 @@ class StorageManager:
         if not filename:
             filename = entry.id
         
-        # Handle potential filename conflicts by appending ID if needed
-        base_filename = filename
-        counter = 1
-        
         if entry.entry_type == EntryType.IDEA:
             dir_path = self.data_dir / 'ideas'
         elif entry.entry_type == EntryType.PROMPT:
@@ -134,29 +467,274 @@ class StorageManager:
         
         dir_path.mkdir(parents=True, exist_ok=True)
         
-        # Check for filename conflicts and append counter if needed
-        file_path = dir_path / f"{filename}.md"
-        while file_path.exists():
-            filename = f"{base_filename}_{counter}"
-            file_path = dir_path / f"{filename}.md"
-            counter += 1
-        
-        return file_path
+        # Claim the next free name; conflicts get a _1, _2, ... suffix
+        return self.slugs.claim(dir_path, filename)
     
+    @traced('storage.save')
     def save_entry(self, entry: ScrapEntry) -> tuple[str, Path]:
-        """Save entry to file and return the assigned ID and file path."""
+        """Save entry to file and return the assigned ID and file path.
+        
+        Inside batch() or after write_behind(), only the file is written here;
+        the counter and index updates are queued (see batch()).
+        """
+        batch = self._batch
+        
         # Assign ID if not present
         if not entry.id:
-            entry.id = self._get_next_id(entry.entry_type)
+            if batch is not None:
+                entry.id = self._next_batch_id(entry.entry_type)
+            else:
+                entry.id = self._get_next_id(entry.entry_type)
         
         # Get file path
         file_path = self._get_file_path(entry)
         
+        # Write file atomically
+        content = self._render_entry(entry)
+        self._write_entry_file(file_path, content)
+        
+        if batch is not None:
+            batch.add(entry, file_path, content)
+            if batch.due():
+                self.flush()
+            return entry.id, file_path
+        
+        if self.fsync_policy == 'batch':
+            fsync_paths([file_path])
+        # Postings first: a new full-text index backfills from the entry index,
+        # which must not list this entry yet
+        self._update_fulltext(entry)
+        self._update_index(entry, file_path, content)
+        
+        return entry.id, file_path
+    
+    @traced('storage.save_many')
+    def save_entries(self, entries: List[ScrapEntry], workers: int = 8) -> List[tuple[str, Path]]:
+        """Save a batch of entries with one counter write and one index commit.
+        
+        Markdown files are written in parallel by a thread pool; the index and
+        full-text postings are only updated once all files are on disk.
+        """
+        counts = {}
+        for entry in entries:
+            if not entry.id:
+                counts[entry.entry_type] = counts.get(entry.entry_type, 0) + 1
+        if counts:
+            reserved = {t: iter(ids) for t, ids in self.reserve_ids(counts).items()}
+            for entry in entries:
+                if not entry.id:
+                    entry.id = next(reserved[entry.entry_type])
+        
+        paths = [self._get_file_path(entry) for entry in entries]
+        
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            contents = list(pool.map(self._render_entry, entries))
+            list(pool.map(self._write_entry_file, paths, contents))
+        
+        self._commit_entries(entries, paths, contents)
+        return [(entry.id, path) for entry, path in zip(entries, paths)]
+    
+    def _commit_entries(self, entries: List[ScrapEntry], paths: List[Path], contents: List[str]) -> None:
+        """Add entries whose files are written to the full-text postings and the index."""
+        if self.fsync_policy == 'batch':
+            fsync_paths(paths)
+        # Postings first, as in save_entry
+        try:
+            self.fulltext.add_many((e.id, self._entry_search_fields(e)) for e in entries)
+        except Exception as e:
+            print(f"Warning: Could not update full-text index: {e}")
+        self.upsert_index_rows([self._entry_to_index_row(e, p, c) for e, p, c in zip(entries, paths, contents)])
+    
+    def _new_batch(self, max_entries: Optional[int], max_delay_ms: Optional[float]) -> WriteBatch:
+        """Queue with the given limits, or those of the batch_max_* settings."""
+        if max_entries is None:
+            max_entries = int(self.config.get('batch_max_entries', 100))
+        if max_delay_ms is None:
+            max_delay_ms = float(self.config.get('batch_max_delay_ms', 1000))
+        return WriteBatch(max_entries, max_delay_ms)
+    
+    def _next_batch_id(self, entry_type: EntryType) -> str:
+        """Next ID from the batch's reserved block, reserving a block of max_entries IDs when empty."""
+        ids = self._batch.ids.get(entry_type)
+        if not ids:
+            reserved = self.reserve_ids({entry_type: self._batch.max_entries})[entry_type]
+            ids = self._batch.ids[entry_type] = reserved[::-1]
+        return ids.pop()
+    
+    @contextmanager
+    def batch(self, max_entries: Optional[int] = None,
+              max_delay_ms: Optional[float] = None) -> Iterator['StorageManager']:
+        """Group the counter and index writes of the entries saved inside the block.
+        
+        save_entry still writes each markdown file before returning, but takes
+        its ID from a block reserved with one counter write and queues the
+        index and full-text updates. The queue is committed in one go once it
+        holds `max_entries` entries, when a save finds its oldest entry
+        `max_delay_ms` old, and when the block exits, even on an error; IDs
+        left in the block are then handed back. Until then queued entries are
+        only on disk as files: a crash loses no entries, only index rows that
+        `scrap reindex` restores. Limits default to the batch_max_entries and
+        batch_max_delay_ms settings. Inside another batch, or after
+        write_behind(), the outer queue is used.
+        """
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = self._new_batch(max_entries, max_delay_ms)
+        try:
+            yield self
+        finally:
+            self._close_batch()
+    
+    def write_behind(self, max_entries: Optional[int] = None, max_delay_ms: Optional[float] = None) -> None:
+        """Queue the index updates of every later save_entry as in batch(), until the process exits."""
+        if self._batch is None:
+            self._batch = self._new_batch(max_entries, max_delay_ms)
+            atexit.register(self._close_batch)
+    
+    def flush(self) -> None:
+        """Commit the index updates queued by batch() or write_behind()."""
+        if self._batch is None or not self._batch.pending:
+            return
+        with phase('storage.flush'):
+            entries, paths, contents = zip(*self._batch.take())
+            self._commit_entries(list(entries), list(paths), list(contents))
+    
+    def _close_batch(self) -> None:
+        """Flush and end the current batch, handing back its unused IDs."""
+        batch = self._batch
+        if batch is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._batch = None
+            self._release_ids(batch.ids)
+    
+    @traced('storage.update')
+    def update_entries(self, entry_ids: List[str], values: Dict,
+                       add_tags: Optional[List[str]] = None,
+                       remove_tags: Optional[List[str]] = None) -> List[str]:
+        """Change frontmatter fields of existing entries and return the IDs updated.
+        
+        `values` maps status, priority (None to clear), category or tags to
+        their new values. Only the frontmatter block of each file is
+        rewritten, atomically, and the index gets one delta per entry.
+        Unknown IDs are skipped.
+        """
+        self.flush()
+        rows = self.index.get_many(entry_ids)
+        new_rows = []
+        documents = []
+        for entry_id in dict.fromkeys(entry_ids):
+            row = rows.get(entry_id)
+            if row is None:
+                continue
+            
+            changes = dict(values)
+            if add_tags or remove_tags:
+                tags = [tag for tag in changes.get('tags', row.get('tags', [])) if tag not in (remove_tags or [])]
+                changes['tags'] = tags + [tag for tag in dict.fromkeys(add_tags or []) if tag not in tags]
+            
+            file_path = self.data_dir / row['file_path']
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    text = patch_frontmatter(f.read(), changes)
+                atomic_write_text(file_path, text)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not update {row['file_path']}: {e}")
+                continue
+            
+            new_row = dict(row)
+            for key, value in changes.items():
+                if value is None:
+                    new_row.pop(key, None)
+                else:
+                    new_row[key] = value
+            # The body moves with the size of the frontmatter
+            set_body_fields(new_row, text.encode('utf-8'))
+            new_rows.append(new_row)
+            
+            # Status and priority are not full-text indexed
+            if 'tags' in changes or 'category' in changes:
+                frontmatter, body = split_frontmatter(text)
+                documents.append((entry_id, {
+                    'title': new_row['title'],
+                    'content': body,
+                    'context': frontmatter.get('context') or '',
+                    'tags': new_row.get('tags', []),
+                    'category': new_row.get('category') or ''
+                }))
+        
+        self.upsert_index_rows(new_rows)
+        if documents:
+            try:
+                self.fulltext.add_many(documents)
+            except Exception as e:
+                print(f"Warning: Could not update full-text index: {e}")
+        return [row['id'] for row in new_rows]
+    
+    @traced('storage.delete')
+    def delete_entries(self, entry_ids: List[str]) -> List[str]:
+        """Delete entry files and their index rows; returns the IDs deleted."""
+        self.flush()
+        rows = self.index.get_many(entry_ids)
+        for row in rows.values():
+            try:
+                (self.data_dir / row['file_path']).unlink()
+            except FileNotFoundError:
+                pass
+        
+        deleted = list(rows)
+        self.delete_index_rows(deleted)
+        try:
+            self.fulltext.remove_many(deleted)
+        except Exception as e:
+            print(f"Warning: Could not update full-text index: {e}")
+        return deleted
+    
+    @traced('storage.read_body')
+    def read_body(self, row: Dict, limit: Optional[int] = None) -> str:
+        """Body text of an entry (after the frontmatter and title), or its first `limit` bytes.
+        
+        Only the byte range recorded in the index row is read, through mmap.
+        Rows without offsets, or whose file no longer matches them (e.g. edited
+        by hand), fall back to scanning the file for the body.
+        """
+        with open(self.data_dir / row['file_path'], 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            start, end = row.get('body_start'), row.get('body_end')
+            if start is None or end != size or not 0 <= start <= end:
+                start, end = body_span(f.read())
+            if limit is not None:
+                end = min(end, start + limit)
+            if start >= end:
+                return ''
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # A recorded start must follow a line break; otherwise rescan
+                if start and mapped[start - 1] != ord('\n'):
+                    start, end = body_span(mapped[:])
+                    end = min(end, start + limit) if limit is not None else end
+                return mapped[start:end].decode('utf-8', errors='ignore')
+    
+    @traced('storage.snippet')
+    def snippet(self, row: Dict) -> str:
+        """Stored snippet of an entry, or one made from the start of its body."""
+        if row.get('snippet') is not None:
+            return row['snippet']
+        try:
+            return make_snippet(self.read_body(row, limit=SNIPPET_LENGTH * 4))
+        except OSError:
+            return ''
+    
+    def _render_entry(self, entry: ScrapEntry) -> str:
+        """Render an entry as markdown with YAML frontmatter."""
         # Create frontmatter
         frontmatter = entry.to_dict()
         
         # Create markdown content
-        content = f"---\n{yaml.dump(frontmatter, default_flow_style=False)}---\n\n"
+        content = f"---\n{dump_frontmatter(frontmatter)}---\n\n"
         content += f"# {entry.title}\n\n{entry.content}\n"
         
         if entry.context:
@@ -165,7 +743,10 @@ class StorageManager:
         if entry.tags:
             content += f"\n## Tags\n" + "\n".join(f"- {tag}" for tag in entry.tags) + "\n"
         
-        # Write file atomically
+        return content
+    
+    def _write_entry_file(self, file_path: Path, content: str) -> None:
+        """Write an entry file atomically."""
         temp_path = file_path.with_suffix('.tmp')
         try:
             with open(temp_path, 'w', encoding='utf-8') as f:
@@ -175,91 +756,1112 @@ class StorageManager:
             if temp_path.exists():
                 temp_path.unlink()
             raise e
-        
-        # Update search index
-        self._update_index(entry, file_path)
-        
-        return entry.id, file_path
+        if self.fsync_policy == 'always':
+            fsync_paths([file_path])
+    
+    @property
+    def fulltext(self) -> FullTextIndex:
+        """Full-text index, opened on first use and backfilled if new."""
+        if self._fulltext is None:
+            with phase('fulltext.open'):
+                self._fulltext = FullTextIndex(self.search_db_file)
+                if self._fulltext.is_new:
+                    self._backfill_fulltext()
+        return self._fulltext
+    
+    def _entry_search_fields(self, entry: ScrapEntry) -> Dict:
+        """Get the text fields of an entry that are full-text indexed."""
+        return {
+            'title': entry.title,
+            'content': entry.content,
+            'context': entry.context,
+            'tags': entry.tags,
+            'category': entry.category or ''
+        }
+    
+    def _update_fulltext(self, entry: ScrapEntry) -> None:
+        """Update full-text postings for an entry."""
+        try:
+            self.fulltext.add(entry.id, self._entry_search_fields(entry))
+        except Exception as e:
+            print(f"Warning: Could not update full-text index: {e}")
+    
+    def _read_entry_file(self, file_path: Path) -> tuple[Dict, str]:
+        """Read a markdown entry and split it into frontmatter and body."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return split_frontmatter(f.read())
     
-    def _update_index(self, entry: ScrapEntry, file_path: Path) -> None:
+    @traced('fulltext.backfill')
+    def _backfill_fulltext(self) -> None:
+        """Index existing entries when the full-text index is first created."""
+        documents = []
+        for entry_id, row in self._load_index().items():
+            try:
+                frontmatter, body = self._read_entry_file(self.data_dir / row['file_path'])
+            except Exception:
+                continue
+            documents.append((entry_id, {
+                'title': row.get('title', ''),
+                'content': body,
+                'context': frontmatter.get('context') or '',
+                'tags': row.get('tags', []),
+                'category': frontmatter.get('category') or ''
+            }))
+        self._fulltext.add_many(documents)
+    
+    @property
+    def tags(self) -> TagIndex:
+        """Tag posting lists, opened on first use and backfilled if new."""
+        if self._tags is None:
+            with phase('tags.open'):
+                self._tags = TagIndex(self.tags_db_file)
+                if self._tags.is_new:
+                    self._tags.update_many((entry_id, row.get('tags', []))
+                                           for entry_id, row in self._load_index().items())
+        return self._tags
+    
+    @property
+    def stats(self) -> StatsAggregates:
+        """Materialized entry counts, opened on first use and backfilled if new."""
+        if self._stats is None:
+            with phase('stats.open'):
+                self._stats = StatsAggregates(self.stats_db_file)
+                if self._stats.is_new:
+                    self._stats.rebuild(self._load_index().values())
+        return self._stats
+    
+    @property
+    def fuzzy(self) -> FuzzyIndex:
+        """Trigram index over titles and tags, opened on first use and backfilled if new."""
+        if self._fuzzy is None:
+            with phase('fuzzy.open'):
+                self._fuzzy = FuzzyIndex(self.fuzzy_db_file)
+                if self._fuzzy.is_new:
+                    self._fuzzy.update_many((entry_id, row.get('title', ''), row.get('tags', []))
+                                            for entry_id, row in self._load_index().items())
+        return self._fuzzy
+    
+    @traced('index.upsert')
+    def upsert_index_rows(self, rows: List[Dict]) -> None:
+        """Write index rows and keep the tag postings, trigrams and stats in step."""
+        # Open (and backfill) the aggregates before the rows change underneath them
+        stats = self.stats
+        previous = self.index.get_many([row['id'] for row in rows])
+        self.index.upsert_many(rows)
+        # Rows whose title and tags are unchanged (e.g. status moves) keep their postings
+        retagged = [row for row in rows if row['id'] not in previous or
+                    (row['title'], row.get('tags', [])) !=
+                    (previous[row['id']]['title'], previous[row['id']].get('tags', []))]
+        try:
+            self.tags.update_many((row['id'], row.get('tags', [])) for row in retagged)
+        except Exception as e:
+            print(f"Warning: Could not update tag index: {e}")
+        try:
+            stats.apply(previous.values(), rows)
+        except Exception as e:
+            print(f"Warning: Could not update statistics: {e}")
+        try:
+            self.fuzzy.update_many((row['id'], row['title'], row.get('tags', [])) for row in retagged)
+        except Exception as e:
+            print(f"Warning: Could not update trigram index: {e}")
+    
+    @traced('index.delete')
+    def delete_index_rows(self, entry_ids: List[str]) -> None:
+        """Remove index rows with their tag postings, trigrams and stats."""
+        stats = self.stats
+        previous = list(self.index.get_many(entry_ids).values())
+        self.index.delete_many(entry_ids)
+        try:
+            self.tags.remove_many(entry_ids)
+        except Exception as e:
+            print(f"Warning: Could not update tag index: {e}")
+        try:
+            stats.apply(previous, [])
+        except Exception as e:
+            print(f"Warning: Could not update statistics: {e}")
+        try:
+            self.fuzzy.remove_many(entry_ids)
+        except Exception as e:
+            print(f"Warning: Could not update trigram index: {e}")
+    
+    def _update_index(self, entry: ScrapEntry, file_path: Path, content: Optional[str] = None) -> None:
         """Update search index with new entry."""
-        index = self._load_index()
-        
-        index[entry.id] = {
+        self.upsert_index_rows([self._entry_to_index_row(entry, file_path, content)])
+    
+    def _entry_to_index_row(self, entry: ScrapEntry, file_path: Path, content: Optional[str] = None) -> Dict:
+        """Build the index row stored for an entry; `content` is the rendered file, for body offsets."""
+        row = {
             'id': entry.id,
             'title': entry.title,
             'type': entry.entry_type.value,
             'file_path': str(file_path.relative_to(self.data_dir)),
             'tags': entry.tags,
             'created_date': entry.created_date.isoformat(),
-            'status': entry.status.value
+            'status': entry.status.value,
+            'context': entry.context or ''
         }
         if entry.priority:
-            index[entry.id]['priority'] = entry.priority.value
-        
-        self._save_index(index)
+            row['priority'] = entry.priority.value
+        if entry.category:
+            row['category'] = entry.category
+        if content is not None:
+            set_body_fields(row, content.encode('utf-8'))
+        return row
     
+    @traced('index.load_all')
     def _load_index(self) -> Dict:
         """Load search index."""
-        if self.index_file.exists():
-            try:
-                with open(self.index_file, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                pass
+        return self.index.all()
+    
+    @traced('storage.list')
+    def list_entries(self, entry_type: Optional[EntryType] = None, 
+                    limit: int = 50, since: Optional[str] = None,
+                    until: Optional[str] = None) -> List[Dict]:
+        """List entries from index, newest first, created in [since, until) if given."""
+        self.flush()
+        if self.index.columns_loaded():
+            return self.index.columns().list(entry_type, limit, since, until)
+        return self.index.list(entry_type, limit, since, until)
+    
+    def iter_entries(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, after: Optional[Tuple[str, str]] = None) -> Iterator[Dict]:
+        """Stream entries newest first, resuming after a (created_date, id) key."""
+        self.flush()
+        return self.index.iter_newest(entry_type, since, until, after)
+    
+    @traced('storage.search')
+    def search_entries(self, query: str, entry_type: Optional[EntryType] = None,
+                      tags: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Search entries by query, type, or tags."""
+        self.flush()
+        if self.index.columns_loaded():
+            return self.index.columns().search(query, entry_type, tags, limit)
+        return self.index.search(query, entry_type, tags)[:limit]
+
+
+def _ids_where(rows: Iterable[Dict], column: str, values: Optional[Set] = None,
+               low: Optional[str] = None, high: Optional[str] = None,
+               entry_type: Optional[EntryType] = None) -> Set[str]:
+    """IDs of the rows (of `entry_type`, if given) whose column is one of `values` and/or within [low, high)."""
+    default = FILTER_COLUMNS[column]
+    matches = set()
+    for row in rows:
+        if entry_type and row['type'] != entry_type.value:
+            continue
+        value = row.get(column) or default
+        if values is not None and value not in values:
+            continue
+        if (low is not None and (value is None or value < low)) or \
+                (high is not None and (value is None or value >= high)):
+            continue
+        matches.add(row['id'])
+    return matches
+
+
+def _substring_search(rows: Iterable[Dict], query: str, entry_type: Optional[EntryType] = None,
+                      tags: Optional[List[str]] = None) -> List[Dict]:
+    """Rows whose title or a tag contains the query, with type/tag filters, title matches first."""
+    results = []
+    
+    query_lower = query.lower() if query else ""
+    
+    for entry in rows:
+        # Type filter
+        if entry_type and entry['type'] != entry_type.value:
+            continue
+        
+        # Tag filter
+        if tags and not any(tag in entry['tags'] for tag in tags):
+            continue
+        
+        # Query search
+        if query_lower:
+            if (query_lower in entry['title'].lower() or
+                any(query_lower in tag.lower() for tag in entry['tags'])):
+                results.append(entry)
+        else:
+            results.append(entry)
+    
+    # Title matches first, newest first within each group
+    results.sort(key=lambda x: x['created_date'], reverse=True)
+    if query_lower:
+        results.sort(key=lambda x: query_lower not in x['title'].lower())
+    
+    return results
+
+
+class IndexBackend:
+    """Interface for the entry index stored under .scrap/."""
+    
+    name = None
+    
+    _columns = None
+    _columns_token = None
+    
+    def columns(self) -> ColumnarIndex:
+        """Columnar in-memory copy of the index, built on first use.
+        
+        Writes through this backend are applied to the copy as deltas; it is
+        rebuilt only when another process has changed the stored index.
+        """
+        token = self._change_token()
+        if self._columns is None or token != self._columns_token:
+            with phase('index.columns'):
+                self._columns = ColumnarIndex(self.all().values())
+            self._columns_token = token
+        return self._columns
+    
+    def columns_loaded(self) -> bool:
+        """Whether a columnar copy is being kept in memory."""
+        return self._columns is not None
+    
+    def _change_token(self) -> object:
+        """Value that changes whenever the stored index changes."""
+        return None
+    
+    def _apply_to_columns(self, upserted: List[Dict] = (), deleted: List[str] = ()) -> None:
+        """Apply this backend's own writes to the columnar copy, if loaded."""
+        if self._columns is None:
+            return
+        self._columns.delete_many(deleted)
+        self._columns.upsert_many(upserted)
+        self._columns_token = self._change_token()
+    
+    def get(self, entry_id: str) -> Optional[Dict]:
+        """Get a single index row."""
+        return self.get_many([entry_id]).get(entry_id)
+    
+    def get_many(self, entry_ids: List[str]) -> Dict[str, Dict]:
+        """Get index rows for several IDs; unknown IDs are skipped."""
+        raise NotImplementedError
+    
+    def all(self) -> Dict[str, Dict]:
+        """Get every index row keyed by ID."""
+        raise NotImplementedError
+    
+    def upsert(self, row: Dict) -> None:
+        """Insert or replace a single index row."""
+        self.upsert_many([row])
+    
+    def upsert_many(self, rows: List[Dict]) -> None:
+        """Insert or replace several index rows in one commit."""
+        raise NotImplementedError
+    
+    def delete(self, entry_id: str) -> None:
+        """Remove an index row."""
+        self.delete_many([entry_id])
+    
+    def delete_many(self, entry_ids: List[str]) -> None:
+        """Remove several index rows in one commit."""
+        raise NotImplementedError
+
+    def replace_all(self, rows: Dict[str, Dict]) -> None:
+        """Make the index hold exactly `rows` (keyed by ID), e.g. when migrating from another backend."""
+        stale = [entry_id for entry_id in self.all() if entry_id not in rows]
+        if stale:
+            self.delete_many(stale)
+        self.upsert_many(list(rows.values()))
+
+    def list(self, entry_type: Optional[EntryType] = None, limit: int = 50,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        """List rows newest first, optionally filtered by type and ISO date range [since, until)."""
+        raise NotImplementedError
+    
+    def iter_newest(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+                    until: Optional[str] = None, after: Optional[Tuple[str, str]] = None) -> Iterator[Dict]:
+        """Rows newest first (created date, then ID, both descending), optionally filtered.
+        
+        `after` is the (created_date, id) of the last row already returned;
+        only rows that follow it in this order are produced.
+        """
+        rows = [row for row in self.all().values()
+                if (not entry_type or row['type'] == entry_type.value)
+                and (not since or row['created_date'] >= since)
+                and (not until or row['created_date'] < until)
+                and (after is None or (row['created_date'], row['id']) < tuple(after))]
+        rows.sort(key=lambda row: (row['created_date'], row['id']), reverse=True)
+        return iter(rows)
+    
+    def revision(self) -> Optional[str]:
+        """Opaque token for the index's current state, or None if changes are not tracked."""
+        return None
+    
+    def changes_since(self, revision: str,
+                      entry_type: Optional[EntryType] = None) -> Optional[Tuple[List[Dict], List[str]]]:
+        """Rows written and IDs deleted after `revision` (a token from revision()).
+        
+        Returns None when the changes cannot be told apart, e.g. the token
+        belongs to another index, so the caller falls back to all().
+        """
+        return None
+    
+    def search(self, query: str, entry_type: Optional[EntryType] = None,
+               tags: Optional[List[str]] = None) -> List[Dict]:
+        """Substring search over titles and tags with type/tag filters."""
+        raise NotImplementedError
+    
+    def ids_where(self, column: str, values: Optional[Set] = None,
+                  low: Optional[str] = None, high: Optional[str] = None,
+                  entry_type: Optional[EntryType] = None) -> Set[str]:
+        """IDs of rows whose column is one of `values` and/or within [low, high).
+        
+        `column` is one of FILTER_COLUMNS; a None in `values` matches rows
+        without a value (e.g. no priority). `entry_type` limits the rows to
+        one type.
+        """
+        return _ids_where(self.all().values(), column, values, low, high, entry_type)
+    
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class JsonIndexBackend(IndexBackend):
+    """Index stored as a single JSON document (.scrap/index.json)."""
+    
+    name = 'json'
+    
+    def __init__(self, index_file: Path, lock: Optional[FileLock] = None):
+        """Initialize JSON index backend."""
+        self.index_file = index_file
+        self.lock = lock or FileLock(index_file.with_suffix('.lock'))
+        self._cache = None
+        self._cache_stamp = None
+    
+    def _stamp(self) -> Optional[tuple]:
+        """Modification stamp of the index file, or None if it is missing."""
+        try:
+            st = self.index_file.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _load(self) -> Dict:
+        """Load search index, reusing the parsed copy while the file is unchanged.
+        
+        The cached dict is shared between calls, so callers must not modify it
+        outside of upsert/delete.
+        """
+        stamp = self._stamp()
+        if stamp is None:
+            return {}
+        if self._cache is not None and stamp == self._cache_stamp:
+            return self._cache
+        try:
+            with open(self.index_file, 'r') as f:
+                self._cache = json.load(f)
+            self._cache_stamp = stamp
+            return self._cache
+        except Exception:
+            self._cache = None
         return {}
     
-    def _save_index(self, index: Dict) -> None:
+    def _save(self, index: Dict) -> None:
         """Save search index."""
         try:
-            with open(self.index_file, 'w') as f:
-                json.dump(index, f, indent=2)
+            atomic_write_text(self.index_file, json.dumps(index, indent=2))
+            self._cache, self._cache_stamp = index, self._stamp()
         except Exception as e:
+            self._cache = None
             print(f"Warning: Could not save index: {e}")
     
-    def list_entries(self, entry_type: Optional[EntryType] = None, 
-                    limit: int = 50) -> List[Dict]:
-        """List entries from index."""
-        index = self._load_index()
+    def get_many(self, entry_ids: List[str]) -> Dict[str, Dict]:
+        index = self._load()
+        return {entry_id: index[entry_id] for entry_id in entry_ids if entry_id in index}
+    
+    def all(self) -> Dict[str, Dict]:
+        return self._load()
+    
+    def _change_token(self) -> object:
+        return self._stamp()
+    
+    def upsert_many(self, rows: List[Dict]) -> None:
+        # Read-modify-write under the index lock so concurrent writers don't drop rows
+        with self.lock:
+            index = self._load()
+            for row in rows:
+                index[row['id']] = row
+            self._save(index)
+            self._apply_to_columns(upserted=rows)
+    
+    def delete_many(self, entry_ids: List[str]) -> None:
+        with self.lock:
+            index = self._load()
+            removed = [index.pop(entry_id, None) for entry_id in entry_ids]
+            if any(row is not None for row in removed):
+                self._save(index)
+                self._apply_to_columns(deleted=entry_ids)
+    
+    def list(self, entry_type: Optional[EntryType] = None, limit: int = 50,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        index = self._load()
         entries = list(index.values())
         
         if entry_type:
             entries = [e for e in entries if e['type'] == entry_type.value]
         
+        if since or until:
+            entries = [e for e in entries if (not since or e['created_date'] >= since)
+                       and (not until or e['created_date'] < until)]
+        
         # Sort by creation date (newest first)
         entries.sort(key=lambda x: x['created_date'], reverse=True)
         
         return entries[:limit]
     
-    def search_entries(self, query: str, entry_type: Optional[EntryType] = None,
-                      tags: Optional[List[str]] = None) -> List[Dict]:
-        """Search entries by query, type, or tags."""
-        index = self._load_index()
-        results = []
+    def search(self, query: str, entry_type: Optional[EntryType] = None,
+               tags: Optional[List[str]] = None) -> List[Dict]:
+        return _substring_search(self._load().values(), query, entry_type, tags)
+
+
+class ShardedIndexBackend(IndexBackend):
+    """JSON index split into one file per entry type and creation month.
+    
+    Layout under .scrap/shards/:
+    
+        manifest.json          {"version": 1, "shards": {"todo/2026-09": {"count", "first", "last"}}}
+        <type>/<YYYY-MM>.json  rows of one type created in one month, keyed by ID
+        ids/<prefix>.json      ID -> shard, one map per ID prefix ("todo-012" -> ids/todo.json)
+    
+    Type- and date-scoped reads open only the shards whose range overlaps the
+    filter (newest first, stopping once a listing is full), and a write
+    rewrites only the shards its rows live in, plus the manifest and ID maps.
+    """
+    
+    name = 'sharded'
+    
+    def __init__(self, root: Path, lock: Optional[FileLock] = None):
+        """Open the shard directory."""
+        self.root = root
+        self.manifest_file = root / 'manifest.json'
+        self.lock = lock or FileLock(root.parent / 'index.lock')
+        # path -> (stamp, parsed JSON), reused while the file is unchanged
+        self._files: Dict[Path, tuple] = {}
+    
+    @staticmethod
+    def _stamp(path: Path) -> Optional[tuple]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        # Files are replaced by rename, so the inode changes on every write
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def _read(self, path: Path) -> Dict:
+        """Parsed JSON object of a shard, ID map or the manifest; empty if missing.
+        
+        The parsed copy is shared between calls, so callers must not modify it
+        outside of upsert/delete.
+        """
+        stamp = self._stamp(path)
+        if stamp is None:
+            return {}
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self._files.pop(path, None)
+            return {}
+        self._files[path] = (stamp, data)
+        return data
+    
+    def _write(self, path: Path, data: Dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+        self._files[path] = (self._stamp(path), data)
+    
+    def _shards(self) -> Dict[str, Dict]:
+        """Shard key ("type/YYYY-MM") -> {"count", "first", "last"} from the manifest."""
+        return self._read(self.manifest_file).get('shards', {})
+    
+    def _shard_file(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+    
+    def _ids_file(self, entry_id: str) -> Path:
+        return self.root / 'ids' / f"{entry_id.split('-', 1)[0]}.json"
+    
+    def _keys(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+              until: Optional[str] = None, through: Optional[str] = None) -> List[str]:
+        """Shards that can hold rows of `entry_type` created in [since, until) and no later than `through`."""
+        return [key for key, info in self._shards().items()
+                if (not entry_type or key.split('/', 1)[0] == entry_type.value)
+                and (not since or info['last'] >= since)
+                and (not until or info['first'] < until)
+                and (not through or info['first'] <= through)]
+    
+    def _months(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+                until: Optional[str] = None, through: Optional[str] = None) -> List[List[str]]:
+        """Shard keys from _keys() grouped by month, newest month first."""
+        groups = {}
+        for key in self._keys(entry_type, since, until, through):
+            groups.setdefault(key.split('/', 1)[1], []).append(key)
+        return [groups[month] for month in sorted(groups, key=lambda month: (month != UNDATED_SHARD, month),
+                                                  reverse=True)]
+    
+    def _rows(self, keys: Iterable[str]) -> Iterator[Dict]:
+        for key in keys:
+            yield from self._read(self._shard_file(key)).values()
+    
+    def _locate(self, entry_ids: Iterable[str]) -> Dict[str, str]:
+        """Shard key of each ID that is in the index."""
+        located = {}
+        for entry_id in entry_ids:
+            key = self._read(self._ids_file(entry_id)).get(entry_id)
+            if key is not None:
+                located[entry_id] = key
+        return located
+    
+    def get_many(self, entry_ids: List[str]) -> Dict[str, Dict]:
+        found = {}
+        for entry_id, key in self._locate(entry_ids).items():
+            row = self._read(self._shard_file(key)).get(entry_id)
+            if row is not None:
+                found[entry_id] = row
+        return found
+    
+    def all(self) -> Dict[str, Dict]:
+        return {row['id']: row for row in self._rows(self._shards())}
+    
+    def _change_token(self) -> object:
+        # Every write rewrites the manifest
+        return self._stamp(self.manifest_file)
+    
+    def _commit(self, shards: Dict[str, Dict], id_maps: Dict[Path, Dict]) -> None:
+        """Write changed shards and ID maps, then the manifest with their new ranges."""
+        manifest = dict(self._read(self.manifest_file))
+        manifest['version'] = SHARD_MANIFEST_VERSION
+        manifest['shards'] = dict(manifest.get('shards', {}))
+        for key, rows in shards.items():
+            if rows:
+                self._write(self._shard_file(key), rows)
+                dates = [row['created_date'] for row in rows.values()]
+                manifest['shards'][key] = {'count': len(rows), 'first': min(dates), 'last': max(dates)}
+            else:
+                self._shard_file(key).unlink(missing_ok=True)
+                self._files.pop(self._shard_file(key), None)
+                manifest['shards'].pop(key, None)
+        for path, id_map in id_maps.items():
+            self._write(path, id_map)
+        manifest['shards'] = dict(sorted(manifest['shards'].items()))
+        self._write(self.manifest_file, manifest)
+    
+    def _edit(self, shards: Dict[str, Dict], key: str) -> Dict:
+        """Writable copy of a shard's rows, shared within one write."""
+        if key not in shards:
+            shards[key] = dict(self._read(self._shard_file(key)))
+        return shards[key]
+    
+    def _edit_ids(self, id_maps: Dict[Path, Dict], entry_id: str) -> Dict:
+        path = self._ids_file(entry_id)
+        if path not in id_maps:
+            id_maps[path] = dict(self._read(path))
+        return id_maps[path]
+    
+    def upsert_many(self, rows: List[Dict]) -> None:
+        # Read-modify-write under the index lock so concurrent writers don't drop rows
+        with self.lock:
+            located = self._locate(row['id'] for row in rows)
+            shards, id_maps = {}, {}
+            for row in rows:
+                key = f"{row['type']}/{shard_month(row['created_date'])}"
+                previous = located.get(row['id'])
+                if previous != key:
+                    # New row, or its type or creation month was edited
+                    if previous is not None:
+                        self._edit(shards, previous).pop(row['id'], None)
+                    self._edit_ids(id_maps, row['id'])[row['id']] = key
+                    located[row['id']] = key
+                self._edit(shards, key)[row['id']] = row
+            self._commit(shards, id_maps)
+            self._apply_to_columns(upserted=rows)
+    
+    def delete_many(self, entry_ids: List[str]) -> None:
+        with self.lock:
+            located = self._locate(entry_ids)
+            if not located:
+                return
+            shards, id_maps = {}, {}
+            for entry_id, key in located.items():
+                self._edit(shards, key).pop(entry_id, None)
+                self._edit_ids(id_maps, entry_id).pop(entry_id, None)
+            self._commit(shards, id_maps)
+            self._apply_to_columns(deleted=list(located))
+    
+    def list(self, entry_type: Optional[EntryType] = None, limit: int = 50,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        entries = []
+        for keys in self._months(entry_type, since, until):
+            entries.extend(row for row in self._rows(keys)
+                           if (not since or row['created_date'] >= since)
+                           and (not until or row['created_date'] < until))
+            # Older months cannot hold anything newer than what is already here
+            if len(entries) >= limit:
+                break
+        entries.sort(key=lambda x: x['created_date'], reverse=True)
+        return entries[:limit]
+    
+    def iter_newest(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+                    until: Optional[str] = None, after: Optional[Tuple[str, str]] = None) -> Iterator[Dict]:
+        after = tuple(after) if after is not None else None
+        # The cursor's own date may be a shard's first; the row filter below skips rows already returned
+        for keys in self._months(entry_type, since, until, after[0] if after else None):
+            rows = [row for row in self._rows(keys)
+                    if (not since or row['created_date'] >= since)
+                    and (not until or row['created_date'] < until)
+                    and (after is None or (row['created_date'], row['id']) < after)]
+            rows.sort(key=lambda row: (row['created_date'], row['id']), reverse=True)
+            yield from rows
+    
+    def search(self, query: str, entry_type: Optional[EntryType] = None,
+               tags: Optional[List[str]] = None) -> List[Dict]:
+        return _substring_search(self._rows(self._keys(entry_type)), query, entry_type, tags)
+    
+    def ids_where(self, column: str, values: Optional[Set] = None,
+                  low: Optional[str] = None, high: Optional[str] = None,
+                  entry_type: Optional[EntryType] = None) -> Set[str]:
+        if column == 'type' and values is not None and low is None and high is None:
+            keys = [key for key in self._keys(entry_type) if key.split('/', 1)[0] in values]
+        elif column == 'created_date':
+            keys = self._keys(entry_type, since=low, until=high)
+        else:
+            keys = self._keys(entry_type)
+        return _ids_where(self._rows(keys), column, values, low, high, entry_type)
+
+
+class BinaryIndexBackend(IndexBackend):
+    """Index stored in the versioned binary format of binindex (.scrap/index.bin).
+    
+    The file is mapped rather than parsed, so opening it costs the same at any
+    size; listings decode only the rows they return. Writes rewrite the file,
+    copying the encoded bytes of untouched rows.
+    """
+    
+    name = 'binary'
+    
+    def __init__(self, index_file: Path, lock: Optional[FileLock] = None):
+        """Open the index file."""
+        self.index_file = index_file
+        self.lock = lock or FileLock(index_file.with_suffix('.lock'))
+        self._reader = None
+        self._reader_stamp = None
+    
+    def _stamp(self) -> Optional[tuple]:
+        try:
+            st = self.index_file.stat()
+        except FileNotFoundError:
+            return None
+        # The file is replaced by rename, so the inode changes on every write
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def _open(self) -> Optional[BinaryIndex]:
+        """Reader for the current file, reused while it is unchanged; None if missing or unreadable."""
+        stamp = self._stamp()
+        if stamp is None:
+            return None
+        if stamp != self._reader_stamp:
+            try:
+                with phase('index.map'):
+                    self._reader = BinaryIndex(self.index_file)
+            except (OSError, BinaryIndexError) as e:
+                print(f"Warning: Could not read index ({e}); run `scrap reindex` to rebuild it")
+                self._reader = None
+            self._reader_stamp = stamp
+        return self._reader
+    
+    def get_many(self, entry_ids: List[str]) -> Dict[str, Dict]:
+        reader = self._open()
+        found = {}
+        if reader is None:
+            return found
+        for entry_id in entry_ids:
+            n = reader.find(entry_id)
+            if n is not None:
+                found[entry_id] = reader.row(n)
+        return found
+    
+    def all(self) -> Dict[str, Dict]:
+        reader = self._open()
+        if reader is None:
+            return {}
+        return reader.rows()
+    
+    def _change_token(self) -> object:
+        return self._stamp()
+    
+    def upsert_many(self, rows: List[Dict]) -> None:
+        # Read-modify-write under the index lock so concurrent writers don't drop rows
+        with self.lock:
+            write_index(self.index_file, updated_rows(self._open(), upserted=rows))
+            self._apply_to_columns(upserted=rows)
+    
+    def delete_many(self, entry_ids: List[str]) -> None:
+        with self.lock:
+            deleted = list(self.get_many(entry_ids))
+            if deleted:
+                write_index(self.index_file, updated_rows(self._open(), deleted=deleted))
+                self._apply_to_columns(deleted=deleted)
+    
+    def list(self, entry_type: Optional[EntryType] = None, limit: int = 50,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        return list(islice(self.iter_newest(entry_type, since, until), limit))
+    
+    def iter_newest(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+                    until: Optional[str] = None, after: Optional[Tuple[str, str]] = None) -> Iterator[Dict]:
+        reader = self._open()
+        if reader is None:
+            return iter(())
+        return map(reader.row, reader.newest(entry_type, since, until, after))
+    
+    def search(self, query: str, entry_type: Optional[EntryType] = None,
+               tags: Optional[List[str]] = None) -> List[Dict]:
+        return _substring_search(self.iter_newest(entry_type), query, entry_type, tags)
+    
+    def ids_where(self, column: str, values: Optional[Set] = None,
+                  low: Optional[str] = None, high: Optional[str] = None,
+                  entry_type: Optional[EntryType] = None) -> Set[str]:
+        reader = self._open()
+        if reader is None:
+            return set()
+        if entry_type:
+            return _ids_where(self.iter_newest(entry_type), column, values, low, high)
+        if column == 'created_date' and values is None:
+            start = reader.seek((low,)) if low else 0
+            stop = reader.seek((high,)) if high else reader.count
+            return {reader.entry_id(n) for n in range(start, stop)}
+        if column == 'type' and low is None and high is None:
+            return {reader.entry_id(n) for entry_type in EntryType if entry_type.value in values
+                    for n in reader.newest(entry_type)}
+        return _ids_where(self.iter_newest(), column, values, low, high)
+    
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT,
+    created_date TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    category TEXT,
+    body_start INTEGER,
+    body_end INTEGER,
+    snippet TEXT,
+    context TEXT,
+    revision INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_type_order ON entries (type, created_date, id);
+CREATE INDEX IF NOT EXISTS entries_status ON entries (status);
+CREATE INDEX IF NOT EXISTS entries_priority ON entries (priority);
+CREATE INDEX IF NOT EXISTS entries_order ON entries (created_date, id);
+CREATE TABLE IF NOT EXISTS entry_tags (
+    entry_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (entry_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_tags_tag ON entry_tags (tag, entry_id);
+CREATE TABLE IF NOT EXISTS deleted_entries (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    revision INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns added after the first release, created in place on older databases
+ADDED_COLUMNS = [
+    ('category', 'TEXT'),
+    ('body_start', 'INTEGER'),
+    ('body_end', 'INTEGER'),
+    ('snippet', 'TEXT'),
+    ('context', 'TEXT'),
+    ('revision', 'INTEGER')
+]
+
+# Indexes on added columns, created once the columns exist
+ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS entries_revision ON entries (revision);
+CREATE INDEX IF NOT EXISTS deleted_entries_revision ON deleted_entries (revision);
+"""
+
+ENTRY_COLUMNS = ('id, title, type, status, priority, created_date, file_path, category, '
+                 'body_start, body_end, snippet, context')
+
+# Indexes replaced by later versions, dropped from older databases
+RETIRED_INDEXES = ('entries_type', 'entries_created')
+
+# Keep IN (...) lists below SQLite's default host parameter limit
+SQLITE_BATCH_SIZE = 500
+
+# Rows fetched (and their tags loaded) at a time while streaming
+STREAM_BATCH_SIZE = 200
+
+
+class SqliteIndexBackend(IndexBackend):
+    """Index stored in SQLite (WAL) with indexed columns and a tag table."""
+    
+    name = 'sqlite'
+    
+    def __init__(self, db_file: Path):
+        """Open the index database."""
+        self.db_file = db_file
+        self.conn = connect(db_file)
+        self.conn.executescript(SQLITE_SCHEMA)
+        
+        # Databases created by older versions lack the later columns
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(entries)')}
+        for name, sql_type in ADDED_COLUMNS:
+            if name not in columns:
+                self.conn.execute(f'ALTER TABLE entries ADD COLUMN {name} {sql_type}')
+        self.conn.executescript(ADDED_INDEXES)
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('index_id', ?)", (uuid.uuid4().hex,))
+        indexes = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name in RETIRED_INDEXES:
+            if name in indexes:
+                self.conn.execute(f'DROP INDEX {name}')
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def _change_token(self) -> object:
+        # data_version changes when another connection commits to the database
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def _rows_to_entries(self, rows: List[tuple]) -> List[Dict]:
+        """Convert entry rows to index dicts, attaching their tags."""
+        tags_by_id = {row[0]: [] for row in rows}
+        ids = list(tags_by_id)
+        for start in range(0, len(ids), SQLITE_BATCH_SIZE):
+            chunk = ids[start:start + SQLITE_BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            for entry_id, tag in self.conn.execute(
+                f'SELECT entry_id, tag FROM entry_tags WHERE entry_id IN ({placeholders}) '
+                'ORDER BY entry_id, position', chunk
+            ):
+                tags_by_id[entry_id].append(tag)
+        
+        entries = []
+        for (entry_id, title, entry_type, status, priority, created_date, file_path, category,
+             body_start, body_end, snippet, context) in rows:
+            entry = {
+                'id': entry_id,
+                'title': title,
+                'type': entry_type,
+                'file_path': file_path,
+                'tags': tags_by_id[entry_id],
+                'created_date': created_date,
+                'status': status
+            }
+            if priority:
+                entry['priority'] = priority
+            if category:
+                entry['category'] = category
+            if body_start is not None:
+                entry['body_start'], entry['body_end'] = body_start, body_end
+            if snippet is not None:
+                entry['snippet'] = snippet
+            if context is not None:
+                entry['context'] = context
+            entries.append(entry)
+        return entries
+    
+    def get_many(self, entry_ids: List[str]) -> Dict[str, Dict]:
+        rows = []
+        entry_ids = list(entry_ids)
+        for start in range(0, len(entry_ids), SQLITE_BATCH_SIZE):
+            chunk = entry_ids[start:start + SQLITE_BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(self.conn.execute(
+                f'SELECT {ENTRY_COLUMNS} FROM entries WHERE id IN ({placeholders})', chunk
+            ))
+        return {entry['id']: entry for entry in self._rows_to_entries(rows)}
+    
+    def all(self) -> Dict[str, Dict]:
+        rows = self.conn.execute(f'SELECT {ENTRY_COLUMNS} FROM entries').fetchall()
+        return {entry['id']: entry for entry in self._rows_to_entries(rows)}
+    
+    def _next_revision(self) -> int:
+        """Revision for the write in progress: one above any recorded change."""
+        return 1 + max(self.conn.execute('SELECT MAX(revision) FROM entries').fetchone()[0] or 0,
+                       self.conn.execute('SELECT MAX(revision) FROM deleted_entries').fetchone()[0] or 0)
+    
+    def upsert_many(self, rows: List[Dict]) -> None:
+        with transaction(self.conn):
+            revision = self._next_revision()
+            for row in rows:
+                self.conn.execute(
+                    f'INSERT OR REPLACE INTO entries ({ENTRY_COLUMNS}, revision) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (row['id'], row['title'], row['type'], row.get('status', 'active'),
+                     row.get('priority'), row['created_date'], row['file_path'], row.get('category'),
+                     row.get('body_start'), row.get('body_end'), row.get('snippet'), row.get('context'),
+                     revision)
+                )
+                self.conn.execute('DELETE FROM deleted_entries WHERE id = ?', (row['id'],))
+                self.conn.execute('DELETE FROM entry_tags WHERE entry_id = ?', (row['id'],))
+                self.conn.executemany(
+                    'INSERT INTO entry_tags (entry_id, position, tag) VALUES (?, ?, ?)',
+                    ((row['id'], position, tag) for position, tag in enumerate(row.get('tags', [])))
+                )
+        self._apply_to_columns(upserted=rows)
+    
+    def delete_many(self, entry_ids: List[str]) -> None:
+        with transaction(self.conn):
+            revision = self._next_revision()
+            for entry_id in entry_ids:
+                self.conn.execute('INSERT OR REPLACE INTO deleted_entries (id, type, revision) '
+                                  'SELECT id, type, ? FROM entries WHERE id = ?', (revision, entry_id))
+                self.conn.execute('DELETE FROM entries WHERE id = ?', (entry_id,))
+                self.conn.execute('DELETE FROM entry_tags WHERE entry_id = ?', (entry_id,))
+        self._apply_to_columns(deleted=entry_ids)
+    
+    def revision(self) -> Optional[str]:
+        index_id = self.conn.execute("SELECT value FROM meta WHERE key = 'index_id'").fetchone()[0]
+        return f"{index_id}:{self._next_revision() - 1}"
+    
+    def changes_since(self, revision: str,
+                      entry_type: Optional[EntryType] = None) -> Optional[Tuple[List[Dict], List[str]]]:
+        index_id, _, number = (revision or '').partition(':')
+        current_id, _, current = self.revision().partition(':')
+        if index_id != current_id or not number.isdigit() or int(number) > int(current):
+            return None
+        type_filter, params = ('AND type = ?', [entry_type.value]) if entry_type else ('', [])
+        rows = self.conn.execute(
+            f'SELECT {ENTRY_COLUMNS} FROM entries WHERE revision > ? {type_filter}', [int(number)] + params
+        ).fetchall()
+        deleted = [entry_id for entry_id, in self.conn.execute(
+            f'SELECT id FROM deleted_entries WHERE revision > ? {type_filter}', [int(number)] + params
+        )]
+        return self._rows_to_entries(rows), deleted
+    
+    def list(self, entry_type: Optional[EntryType] = None, limit: int = 50,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        # (type, created_date) and (created_date) indexes serve these as range scans
+        clauses = []
+        params = []
+        if entry_type:
+            clauses.append('type = ?')
+            params.append(entry_type.value)
+        if since:
+            clauses.append('created_date >= ?')
+            params.append(since)
+        if until:
+            clauses.append('created_date < ?')
+            params.append(until)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.conn.execute(
+            f'SELECT {ENTRY_COLUMNS} FROM entries {where} ORDER BY created_date DESC LIMIT ?',
+            params + [limit]
+        ).fetchall()
+        return self._rows_to_entries(rows)
+    
+    def iter_newest(self, entry_type: Optional[EntryType] = None, since: Optional[str] = None,
+                    until: Optional[str] = None, after: Optional[Tuple[str, str]] = None) -> Iterator[Dict]:
+        # The (created_date, id) and (type, created_date, id) indexes return rows in
+        # order, so each page is a range scan resumed at `after` with no sort
+        clauses = []
+        params = []
+        if entry_type:
+            clauses.append('type = ?')
+            params.append(entry_type.value)
+        if since:
+            clauses.append('created_date >= ?')
+            params.append(since)
+        if until:
+            clauses.append('created_date < ?')
+            params.append(until)
+        if after:
+            clauses.append('(created_date, id) < (?, ?)')
+            params.extend(after)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor = self.conn.execute(
+            f'SELECT {ENTRY_COLUMNS} FROM entries {where} ORDER BY created_date DESC, id DESC', params
+        )
+        while True:
+            rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+            if not rows:
+                return
+            yield from self._rows_to_entries(rows)
+    
+    def search(self, query: str, entry_type: Optional[EntryType] = None,
+               tags: Optional[List[str]] = None) -> List[Dict]:
+        clauses = []
+        params = []
+        
+        if entry_type:
+            clauses.append('type = ?')
+            params.append(entry_type.value)
+        
+        if tags:
+            placeholders = ','.join('?' * len(tags))
+            clauses.append(f'id IN (SELECT entry_id FROM entry_tags WHERE tag IN ({placeholders}))')
+            params.extend(tags)
         
         query_lower = query.lower() if query else ""
+        if query_lower:
+            clauses.append(
+                '(instr(lower(title), ?) > 0 OR EXISTS (SELECT 1 FROM entry_tags t '
+                'WHERE t.entry_id = entries.id AND instr(lower(t.tag), ?) > 0))'
+            )
+            params.extend([query_lower, query_lower])
         
-        for entry in index.values():
-            # Type filter
-            if entry_type and entry['type'] != entry_type.value:
-                continue
-            
-            # Tag filter
-            if tags and not any(tag in entry['tags'] for tag in tags):
-                continue
-            
-            # Query search
-            if query_lower:
-                if (query_lower in entry['title'].lower() or
-                    any(query_lower in tag.lower() for tag in entry['tags'])):
-                    results.append(entry)
-            else:
-                results.append(entry)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.conn.execute(
+            f'SELECT {ENTRY_COLUMNS} FROM entries {where} ORDER BY created_date DESC', params
+        ).fetchall()
+        results = self._rows_to_entries(rows)
         
-        # Sort by relevance (title matches first, then tag matches)
-        results.sort(key=lambda x: (
-            query_lower not in x['title'].lower() if query_lower else False,
-            x['created_date']
-        ), reverse=True)
+        # Title matches first, newest first within each group
+        if query_lower:
+            results.sort(key=lambda x: query_lower not in x['title'].lower())
         
-        return results
\ No newline at end of file
+        return results
+    
+    def ids_where(self, column: str, values: Optional[Set] = None,
+                  low: Optional[str] = None, high: Optional[str] = None,
+                  entry_type: Optional[EntryType] = None) -> Set[str]:
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter on column: {column}")
+        # status is NOT NULL here, so plain comparisons can use the column indexes
+        clauses = []
+        params = []
+        if entry_type:
+            clauses.append('type = ?')
+            params.append(entry_type.value)
+        if values is not None:
+            known = [v for v in values if v is not None]
+            options = [f"{column} IN ({','.join('?' * len(known))})"] if known else []
+            if None in values:
+                options.append(f'{column} IS NULL')
+            clauses.append(f"({' OR '.join(options) or '0'})")
+            params.extend(known)
+        if low is not None:
+            clauses.append(f'{column} >= ?')
+            params.append(low)
+        if high is not None:
+            clauses.append(f'{column} < ?')
+            params.append(high)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return {row[0] for row in self.conn.execute(f'SELECT id FROM entries {where}', params)}
+
+
+INDEX_BACKENDS = {
+    JsonIndexBackend.name: JsonIndexBackend,
+    ShardedIndexBackend.name: ShardedIndexBackend,
+    BinaryIndexBackend.name: BinaryIndexBackend,
+    SqliteIndexBackend.name: SqliteIndexBackend
+}
@@ -0,0 +1,174 @@
+"""
+Tag posting lists with bitmap set operations for tag filters and counts.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+try:
+    from .db import connect, transaction
+except ImportError:
+    from db import connect, transaction
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    docnum INTEGER PRIMARY KEY,
+    entry_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    tag TEXT NOT NULL,
+    docnum INTEGER NOT NULL,
+    PRIMARY KEY (tag, docnum)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (docnum);
+CREATE TABLE IF NOT EXISTS tag_counts (
+    tag TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Keep IN (...) lists below SQLite's default host parameter limit
+BATCH_SIZE = 500
+
+
+def to_bitmap(docnums: List[int]) -> int:
+    """Build a bitmap (bit n set for document n) from document numbers."""
+    if not docnums:
+        return 0
+    bits = bytearray(max(docnums) // 8 + 1)
+    for docnum in docnums:
+        bits[docnum >> 3] |= 1 << (docnum & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def from_bitmap(bitmap: int) -> List[int]:
+    """Document numbers whose bits are set, in ascending order."""
+    # bin() reversed puts bit 0 first; str.find skips runs of zeros in C
+    digits = bin(bitmap)[:1:-1]
+    docnums = []
+    found = digits.find('1')
+    while found != -1:
+        docnums.append(found)
+        found = digits.find('1', found + 1)
+    return docnums
+
+
+class TagIndex:
+    """Persistent tag -> entry posting lists with per-tag counts.
+
+    Each entry gets a small integer document number; a tag's posting list is
+    the sorted run of document numbers under that tag in the clustered
+    primary key. Queries load posting lists as integer bitmaps, so AND, OR
+    and NOT are single big-integer operations. Per-tag counts are kept up to
+    date on every write, so tag statistics never scan the index.
+    """
+
+    def __init__(self, db_path: Path):
+        """Open (or create) the tag index database."""
+        self.db_path = db_path
+        self.is_new = not db_path.exists()
+        self.conn = connect(db_path)
+        self.conn.executescript(SCHEMA)
+        self._bitmaps: Dict[Optional[str], int] = {}
+        self._bitmaps_version = None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def _docnum(self, entry_id: str) -> int:
+        """Document number of an entry, assigning one if needed (inside a transaction)."""
+        self.conn.execute('INSERT OR IGNORE INTO docs (entry_id) VALUES (?)', (entry_id,))
+        return self.conn.execute('SELECT docnum FROM docs WHERE entry_id = ?', (entry_id,)).fetchone()[0]
+
+    def _add_count(self, tags: Iterable[str], delta: int) -> None:
+        """Apply a delta to the counts of several tags (inside a transaction)."""
+        self.conn.executemany(
+            'INSERT INTO tag_counts (tag, count) VALUES (?, ?) '
+            'ON CONFLICT(tag) DO UPDATE SET count = count + excluded.count',
+            ((tag, delta) for tag in tags)
+        )
+
+    def update_many(self, items: Iterable[Tuple[str, List[str]]]) -> None:
+        """Set the tags of several entries, given as (entry_id, tags) pairs."""
+        with transaction(self.conn):
+            for entry_id, tags in items:
+                docnum = self._docnum(entry_id)
+                old = {row[0] for row in self.conn.execute(
+                    'SELECT tag FROM postings INDEXED BY postings_doc WHERE docnum = ?', (docnum,)
+                )}
+                new = set(tags)
+                removed, added = old - new, new - old
+                self.conn.executemany('DELETE FROM postings WHERE tag = ? AND docnum = ?',
+                                      ((tag, docnum) for tag in removed))
+                self.conn.executemany('INSERT INTO postings (tag, docnum) VALUES (?, ?)',
+                                      ((tag, docnum) for tag in added))
+                self._add_count(removed, -1)
+                self._add_count(added, 1)
+            self.conn.execute('DELETE FROM tag_counts WHERE count <= 0')
+        self._bitmaps.clear()
+
+    def remove_many(self, entry_ids: Iterable[str]) -> None:
+        """Drop several entries and their postings."""
+        with transaction(self.conn):
+            for entry_id in entry_ids:
+                row = self.conn.execute('SELECT docnum FROM docs WHERE entry_id = ?', (entry_id,)).fetchone()
+                if row is None:
+                    continue
+                tags = [r[0] for r in self.conn.execute(
+                    'SELECT tag FROM postings INDEXED BY postings_doc WHERE docnum = ?', row
+                )]
+                self._add_count(tags, -1)
+                self.conn.execute('DELETE FROM postings WHERE docnum = ?', row)
+                self.conn.execute('DELETE FROM docs WHERE docnum = ?', row)
+            self.conn.execute('DELETE FROM tag_counts WHERE count <= 0')
+        self._bitmaps.clear()
+
+    def counts(self) -> Dict[str, int]:
+        """Entries per tag, most used first."""
+        return dict(self.conn.execute('SELECT tag, count FROM tag_counts ORDER BY count DESC, tag'))
+
+    def _bitmap(self, tag: Optional[str]) -> int:
+        """Bitmap of entries with a tag; None gives every indexed entry."""
+        # data_version changes when another process commits to the database
+        version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if version != self._bitmaps_version:
+            self._bitmaps.clear()
+            self._bitmaps_version = version
+
+        bitmap = self._bitmaps.get(tag)
+        if bitmap is None:
+            if tag is None:
+                rows = self.conn.execute('SELECT docnum FROM docs')
+            else:
+                rows = self.conn.execute('SELECT docnum FROM postings WHERE tag = ?', (tag,))
+            bitmap = self._bitmaps[tag] = to_bitmap([row[0] for row in rows])
+        return bitmap
+
+    def match_bitmap(self, any_of: Optional[List[str]] = None, all_of: Optional[List[str]] = None,
+                     none_of: Optional[List[str]] = None) -> int:
+        """Bitmap of entries having any of `any_of`, all of `all_of` and none of `none_of`."""
+        if any_of:
+            bitmap = 0
+            for tag in any_of:
+                bitmap |= self._bitmap(tag)
+        else:
+            bitmap = self._bitmap(None)
+        for tag in all_of or []:
+            bitmap &= self._bitmap(tag)
+        for tag in none_of or []:
+            bitmap &= ~self._bitmap(tag)
+        return bitmap
+
+    def match(self, any_of: Optional[List[str]] = None, all_of: Optional[List[str]] = None,
+              none_of: Optional[List[str]] = None) -> Set[str]:
+        """IDs of entries matching a tag query (see match_bitmap)."""
+        docnums = from_bitmap(self.match_bitmap(any_of, all_of, none_of))
+        entry_ids = set()
+        for start in range(0, len(docnums), BATCH_SIZE):
+            chunk = docnums[start:start + BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            entry_ids.update(row[0] for row in self.conn.execute(
+                f'SELECT entry_id FROM docs WHERE docnum IN ({placeholders})', chunk
+            ))
+        return entry_ids
@@ -0,0 +1,264 @@
+"""
+File watching for `scrap watch`: keeps the index in step with markdown files
+edited outside the CLI (the Kanban board, editors, git checkouts).
+
+Only the entry type directories are watched, never individual files, so the
+cost does not grow with the number of entries:
+
+    inotify  (Linux) the process sleeps in select() until the kernel reports
+             a write, rename or delete in one of the directories
+    polling  (elsewhere, or --poll) directory mtimes are checked every
+             interval to catch creates, renames and deletes; a full stat of
+             every file, for in-place edits, runs at most as often as keeps
+             it under MAX_SCAN_DUTY of wall time
+
+Events are debounced: a burst is collected until it has been quiet for the
+debounce delay (or MAX_DELAY has passed) and then applied with one
+Reindexer.sync() call for just the changed paths.
+"""
+
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Tuple
+try:
+    from .reindex import Reindexer, ReindexResult, is_entry_path
+    from .storage import TYPE_DIRECTORIES
+except ImportError:
+    from reindex import Reindexer, ReindexResult, is_entry_path
+    from storage import TYPE_DIRECTORIES
+
+
+DEBOUNCE = 0.2
+
+# A steady stream of events is still applied at least this often (seconds)
+MAX_DELAY = 2.0
+
+POLL_INTERVAL = 1.0
+
+# Largest share of wall time the polling watcher spends stat-ing every file
+MAX_SCAN_DUTY = 0.01
+
+# inotify event bits (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Writes are reported once the writer closes the file, not on every write(2)
+FILE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+ROOT_EVENTS = IN_CREATE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Directory watches through the Linux inotify API (via ctypes)."""
+
+    def __init__(self, data_dir: Path):
+        """Initialize watcher; raises OSError where inotify is unavailable."""
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+        except AttributeError:
+            raise OSError("inotify is not available") from None
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._get_errno = ctypes.get_errno
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.data_dir = data_dir
+        self.watches: Dict[int, Optional[str]] = {}
+        self._watch(data_dir, None, ROOT_EVENTS)
+        for dir_name in TYPE_DIRECTORIES:
+            if (data_dir / dir_name).is_dir():
+                self._watch(data_dir / dir_name, dir_name, FILE_EVENTS)
+
+    def _watch(self, path: Path, dir_name: Optional[str], mask: int) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        self.watches[wd] = dir_name
+
+    def wait(self, timeout: Optional[float]) -> Tuple[Set[str], bool]:
+        """Block up to `timeout` seconds (None: indefinitely) for events.
+
+        Returns the changed entry paths and whether a full rescan is needed
+        (a type directory appeared or went away, or the kernel queue overflowed).
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set(), False
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return set(), False
+
+        changed, rescan = set(), False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                rescan = True
+            elif wd not in self.watches:
+                continue
+            elif mask & IN_IGNORED:
+                del self.watches[wd]
+            elif self.watches[wd] is None:
+                # The data directory itself: a type directory was created, moved or removed
+                if mask & IN_ISDIR and name in TYPE_DIRECTORIES:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._watch(self.data_dir / name, name, FILE_EVENTS)
+                    rescan = True
+                elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    rescan = True
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                rescan = True
+            else:
+                rel_path = f"{self.watches[wd]}/{name}"
+                if is_entry_path(rel_path):
+                    changed.add(rel_path)
+        return changed, rescan
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Stat-based fallback that checks directory mtimes and periodically every file."""
+
+    def __init__(self, data_dir: Path, interval: float = POLL_INTERVAL):
+        """Initialize watcher with a snapshot of the type directories."""
+        self.data_dir = data_dir
+        self.interval = interval
+        self.dirs: Dict[str, Optional[tuple]] = {}
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.scan_period = interval
+        self.next_tick = time.monotonic() + interval
+        self.next_scan = self.next_tick
+        for dir_name in TYPE_DIRECTORIES:
+            self.dirs[dir_name] = self._dir_state(dir_name)
+            self.files.update(self._list(dir_name))
+
+    def _dir_state(self, dir_name: str) -> Optional[tuple]:
+        try:
+            st = os.stat(self.data_dir / dir_name)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _list(self, dir_name: str) -> Dict[str, Tuple[int, int]]:
+        """Entry files in a directory with their (mtime_ns, size)."""
+        listing = {}
+        try:
+            with os.scandir(self.data_dir / dir_name) as it:
+                for item in it:
+                    rel_path = f"{dir_name}/{item.name}"
+                    if not is_entry_path(rel_path):
+                        continue
+                    try:
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    listing[rel_path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return listing
+
+    def wait(self, timeout: Optional[float]) -> Tuple[Set[str], bool]:
+        """Sleep until the next poll (or `timeout`) and return the paths changed since the last one."""
+        now = time.monotonic()
+        if timeout is not None and now + timeout < self.next_tick:
+            time.sleep(timeout)
+            return set(), False
+        time.sleep(max(0.0, self.next_tick - now))
+        self.next_tick = time.monotonic() + self.interval
+
+        changed = set()
+        for dir_name in TYPE_DIRECTORIES:
+            state = self._dir_state(dir_name)
+            if state == self.dirs[dir_name]:
+                continue
+            # Names were added, removed or replaced (e.g. an editor's atomic save): diff the listing
+            self.dirs[dir_name] = state
+            prefix = f"{dir_name}/"
+            before = {path: value for path, value in self.files.items() if path.startswith(prefix)}
+            after = self._list(dir_name)
+            changed.update(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+            for path in before.keys() - after.keys():
+                del self.files[path]
+            self.files.update(after)
+
+        if time.monotonic() >= self.next_scan:
+            started = time.monotonic()
+            for dir_name in TYPE_DIRECTORIES:
+                for path, value in self._list(dir_name).items():
+                    if self.files.get(path) != value:
+                        changed.add(path)
+                        self.files[path] = value
+            elapsed = time.monotonic() - started
+            self.scan_period = max(self.interval, elapsed / MAX_SCAN_DUTY)
+            self.next_scan = started + self.scan_period
+        return changed, False
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def open_watcher(data_dir: Path, poll: bool = False, interval: float = POLL_INTERVAL):
+    """An inotify watcher where available, otherwise the polling fallback."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(data_dir)
+        except OSError as e:
+            print(f"Warning: Could not use inotify ({e}); polling every {interval:g}s instead")
+    return PollingWatcher(data_dir, interval)
+
+
+def watch(reindexer: Reindexer, watcher, report: Callable[[ReindexResult, int], None],
+          debounce: float = DEBOUNCE, max_delay: float = MAX_DELAY) -> None:
+    """Apply debounced batches of changes to the index until interrupted.
+
+    `report` is called with each batch's result and the number of paths it covered.
+    """
+    pending: Set[str] = set()
+    rescan = False
+    first = deadline = None
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        changed, full = watcher.wait(timeout)
+        now = time.monotonic()
+        if changed or full:
+            pending |= changed
+            rescan = rescan or full
+            first = first or now
+            deadline = min(now + debounce, first + max_delay)
+        if deadline is None or now < deadline:
+            continue
+
+        result = reindexer.run() if rescan else reindexer.sync(pending)
+        report(result, result.scanned if rescan else len(pending))
+        pending, rescan = set(), False
+        first = deadline = None
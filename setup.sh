@@ -40,7 +40,7 @@ if [ ! -d "venv" ]; then
 fi
 
 source venv/bin/activate
-exec python -m cli.cli "$@"
+exec python -m cli "$@"
 EOF
 
 # Make the wrapper script executable
@@ -47,6 +47,9 @@ try {
 
 // Debounced full regeneration timer id
 let regenTimer = null;
+// The `scrap` wrapper (needs the venv created by setup.sh)
+const scrapPath = path.join(__dirname, '..', 'scrap');
+const hasScrap = fs.existsSync(scrapPath) && fs.existsSync(path.join(__dirname, '..', 'venv'));
 const scheduleFullRegen = (delayMs = 10000) => {
   // In development we avoid triggering the full generator to prevent the
   // Docusaurus dev server from rebuilding and re-baking the manifest into the
@@ -62,7 +65,13 @@ const scheduleFullRegen = (delayMs = 10000) => {
   regenTimer = setTimeout(() => {
     try {
       const { spawn } = require('child_process');
-      const child = spawn(process.execPath, ['scripts/generate-todo-manifest.js'], {
+      // Prefer the Python CLI, which applies only the changed todos from its
+      // index; fall back to the Node generator where it isn't installed
+      // (e.g. the website-only Docker image).
+      const [command, args] = hasScrap
+        ? [scrapPath, ['export-manifest', '--incremental', '--reindex']]
+        : [process.execPath, ['scripts/generate-todo-manifest.js']];
+      const child = spawn(command, args, {
         cwd: __dirname,
         stdio: 'ignore',
         detached: true